@@ -6,4 +6,10 @@ class BackendConfig(AppConfig):
     name = 'backend'
     
     def ready(self):
+        from backend.layout import ensure_single_backend
+        ensure_single_backend()
         import backend.signals
+        from django.conf import settings
+        if getattr(settings, 'TEMPLATE_WARMUP', False):
+            from backend.template_cache import warm_templates
+            warm_templates()
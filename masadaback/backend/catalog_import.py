@@ -0,0 +1,295 @@
+# Vendor catalog import: stream CSV/XLSX rows, validate them in chunks, upsert Product + Inventory by vendor SKU
+#
+# Each chunk costs a fixed number of queries whatever its size. It looks up existing SKUs once, then
+# bulk_creates new products and their inventory, bulk_updates changed ones, and bulk_creates the stock
+# movement logs. A bad row lands in the error report and never stops the rest of the file.
+import csv
+import io
+import uuid
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Inventory, InventoryLog, Product, ProductImport
+from .stock import stock_rows
+
+CHUNK_SIZE = 2000
+
+
+class ImportFileError(Exception):
+    """The file as a whole can't be read (format, encoding, missing sku column)"""
+
+
+def _text(max_length):
+    def parse(value):
+        value = str(value).strip()
+        if len(value) > max_length:
+            raise ValueError(f"longer than {max_length} characters")
+        return value
+    return parse
+
+
+def _price(value):
+    try:
+        price = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError("not a number")
+    if not price.is_finite() or price < 0 or price >= Decimal('1e8'):
+        raise ValueError("must be between 0 and 99999999.99")
+    return price.quantize(Decimal('0.01'))
+
+
+def _count(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    try:
+        count = int(str(value).strip())
+    except ValueError:
+        raise ValueError("not a whole number")
+    if count < 0:
+        raise ValueError("must not be negative")
+    return count
+
+
+# column -> (model, field, parser); an empty cell leaves an existing product's value alone
+COLUMNS = {
+    'name': (Product, 'ProductName', _text(120)),
+    'price': (Product, 'Price_per_unit', _price),
+    'grade': (Product, 'grade', _text(50)),
+    'type': (Product, 'ProductType', _text(120)),
+    'category': (Product, 'Category', _text(120)),
+    'dimensions': (Product, 'Dimensions', _text(120)),
+    'description': (Product, 'description', _text(250)),
+    'quantity': (Inventory, 'quantity_available', _count),
+    'uom': (Inventory, 'uom', _text(50)),
+    'reorder_level': (Inventory, 'reorder_level', _count),
+    'reorder_quantity': (Inventory, 'reorder_quantity', _count),
+    'warehouse_location': (Inventory, 'warehouse_location', _text(255)),
+}
+FIELDS = {model: [field for m, field, _ in COLUMNS.values() if m is model] for model in (Product, Inventory)}
+REQUIRED_FOR_NEW = ('name', 'price', 'type', 'category')
+NEW_PRODUCT_DEFAULTS = {'grade': 'Standard', 'Dimensions': '', 'description': '', 'stock_quantity': 0}
+
+
+def _sku(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():  # numeric SKUs come out of XLSX as floats
+        value = int(value)
+    return _text(64)(value)
+
+
+def _header(cells):
+    return [str(cell or '').strip().lower().replace(' ', '_') for cell in cells]
+
+
+def read_rows(fh, name):
+    """Yield (row number, {column: raw value}) from a CSV or XLSX file object, one row at a time"""
+    suffix = Path(name).suffix.lower()
+    if suffix == '.csv':
+        text = io.TextIOWrapper(fh, encoding='utf-8-sig', newline='')
+        rows = csv.reader(text)
+    elif suffix == '.xlsx':
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("XLSX imports need openpyxl installed; upload a CSV instead")
+        try:
+            # read_only streams rows from the zip instead of building the whole sheet in memory
+            workbook = load_workbook(fh, read_only=True, data_only=True)
+        except Exception as exc:
+            raise ImportFileError(f"Not a readable XLSX file: {exc}")
+        rows = workbook.active.iter_rows(values_only=True)
+    else:
+        raise ImportFileError(f"Unsupported file type {suffix or name!r}; use .csv or .xlsx")
+
+    try:
+        header = _header(next(rows, []))
+        if 'sku' not in header:
+            raise ImportFileError("The first row must be a header with a 'sku' column")
+        for number, cells in enumerate(rows, start=2):
+            if any(cell not in (None, '') for cell in cells):
+                yield number, dict(zip(header, cells))
+    except UnicodeDecodeError:
+        raise ImportFileError("CSV files must be UTF-8 encoded")
+
+
+def validate(raw, is_new):
+    """({model: {field: value}}, {column: message}) for one row"""
+    values = {Product: {}, Inventory: {}}
+    errors = {}
+    for column, (model, field, parse) in COLUMNS.items():
+        value = raw.get(column)
+        if value is None or str(value).strip() == '':
+            if is_new and column in REQUIRED_FOR_NEW:
+                errors[column] = "required for a new SKU"
+            continue
+        try:
+            values[model][field] = parse(value)
+        except ValueError as exc:
+            errors[column] = str(exc)
+    return values, errors
+
+
+def _changes(current, values):
+    return {field: value for field, value in values.items() if current[field] != value}
+
+
+def _bulk_update(model, pk_and_changes, batch_size=500):
+    """bulk_update each (pk, changes), grouped by the set of changed fields"""
+    groups = {}
+    for pk, changes in pk_and_changes:
+        groups.setdefault(tuple(sorted(changes)), []).append(model(pk=pk, **changes))
+    # bounded batches: each one is a CASE over its rows, and SQLite evaluates it per row
+    for fields, objs in groups.items():
+        model.objects.bulk_update(objs, fields, batch_size=batch_size)
+
+
+@transaction.atomic
+def import_chunk(vendor, chunk, seen, note):
+    """Upsert one chunk of (row number, raw) pairs; returns (created, updated, errors)
+
+    updated counts only the existing products whose row changed something. seen maps each SKU to the
+    row that imported it, so a SKU is taken by its first valid row, not by a rejected one.
+    """
+    errors = []
+    rows = []
+    for number, raw in chunk:
+        try:
+            sku = _sku(raw.get('sku'))
+        except ValueError as exc:
+            errors.append({'row': number, 'sku': str(raw.get('sku')), 'errors': {'sku': str(exc)}})
+            continue
+        if not sku:
+            errors.append({'row': number, 'sku': '', 'errors': {'sku': "required"}})
+        else:
+            rows.append((number, sku, raw))
+
+    existing = {row['vendor_sku']: row for row in Product.objects
+                .filter(vendor=vendor, vendor_sku__in=[sku for _, sku, _ in rows])
+                .values('vendor_sku', 'product_id', *FIELDS[Product])}
+    # each product's stock row, locked so a concurrent checkout can't slip between reading the old
+    # quantity and writing the new one
+    stock = {row['product_id']: row for row in stock_rows(Inventory.objects.select_for_update())
+             .filter(product_id__in=[row['product_id'] for row in existing.values()])
+             .order_by('pk').values('pk', 'product_id', *FIELDS[Inventory])}
+
+    new_products, new_inventory, logs = [], [], []
+    product_updates, inventory_updates = [], []
+    updated = 0
+    for number, sku, raw in rows:
+        if sku in seen:
+            errors.append({'row': number, 'sku': sku, 'errors': {'sku': f"duplicate of row {seen[sku]}"}})
+            continue
+        current = existing.get(sku)
+        values, row_errors = validate(raw, is_new=current is None)
+        if row_errors:
+            errors.append({'row': number, 'sku': sku, 'errors': row_errors})
+            continue
+        seen[sku] = number
+        product_values, inventory_values = values[Product], values[Inventory]
+        quantity = inventory_values.get('quantity_available')
+
+        if current is None:
+            product_id = uuid.uuid4()
+            new_products.append(Product(product_id=product_id, vendor=vendor, vendor_sku=sku,
+                                        **{**NEW_PRODUCT_DEFAULTS, **product_values}))
+            new_inventory.append(Inventory(product_id=product_id, **{'uom': 'pcs', **inventory_values}))
+            if quantity:
+                logs.append(InventoryLog(product_id=product_id, action='IN', quantity=quantity, note=note,
+                                         updated_by=vendor))
+            continue
+
+        # unchanged rows (the bulk of a re-sent catalog) cost no writes at all and don't count as updated
+        product_id = current['product_id']
+        product_changes = _changes(current, product_values)
+        if product_changes:
+            product_updates.append((product_id, product_changes))
+        inventory = stock.get(product_id)
+        if inventory is None:
+            new_inventory.append(Inventory(product_id=product_id, **{'uom': 'pcs', **inventory_values}))
+            inventory_changes = True
+            before = 0
+        else:
+            inventory_changes = _changes(inventory, inventory_values)
+            if inventory_changes:
+                inventory_updates.append((inventory['pk'], inventory_changes))
+            before = inventory['quantity_available']
+        updated += bool(product_changes or inventory_changes)
+        if quantity is not None and quantity != before:
+            logs.append(InventoryLog(product_id=product_id, action='IN' if quantity > before else 'OUT',
+                                     quantity=abs(quantity - before), note=note, updated_by=vendor))
+
+    Product.objects.bulk_create(new_products)
+    # bulk_create: quantities are set directly, so sync_inventory_from_log must not apply the logs again
+    Inventory.objects.bulk_create(new_inventory)
+    _bulk_update(Product, product_updates)
+    _bulk_update(Inventory, inventory_updates)
+    InventoryLog.objects.bulk_create(logs)
+    return len(new_products), updated, sorted(errors, key=lambda error: error['row'])
+
+
+def import_rows(vendor, rows, note='Catalog import', chunk_size=CHUNK_SIZE, progress=None):
+    """Import every (row number, raw) from rows for vendor; returns {'total', 'created', 'updated', 'errors'}"""
+    result = {'total': 0, 'created': 0, 'updated': 0, 'errors': []}
+    seen = {}
+    chunk = []
+
+    def flush():
+        created, updated, errors = import_chunk(vendor, chunk, seen, note)
+        result['total'] += len(chunk)
+        result['created'] += created
+        result['updated'] += updated
+        result['errors'].extend(errors)
+        chunk.clear()
+        if progress is not None:
+            progress(result)
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return result
+
+
+def claim_next():
+    """Mark the oldest QUEUED import RUNNING and return it; None when the queue is empty"""
+    with transaction.atomic():
+        # skip_locked: several workers can drain the queue without taking the same file twice
+        job = (ProductImport.objects.select_for_update(skip_locked=True)
+               .filter(status='QUEUED').order_by('created_at').first())
+        if job is None:
+            return None
+        job.status, job.started_at = 'RUNNING', timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_import(job, chunk_size=CHUNK_SIZE):
+    """Process a claimed ProductImport, saving progress after every chunk; chunks already done stay imported"""
+    latest = {'errors': []}
+
+    def progress(result):
+        latest.update(result)
+        ProductImport.objects.filter(pk=job.pk).update(
+            rows_total=result['total'], rows_created=result['created'], rows_updated=result['updated'],
+            rows_failed=len(result['errors']),
+        )
+
+    status = 'DONE'
+    errors = latest['errors']
+    try:
+        with job.file.open('rb') as fh:
+            errors = import_rows(job.vendor, read_rows(fh, job.file.name), note=f"Catalog import {job.import_id}",
+                                 chunk_size=chunk_size, progress=progress)['errors']
+    except Exception as exc:  # a broken file must not leave the job RUNNING or stop the worker
+        status = 'FAILED'
+        message = str(exc) if isinstance(exc, ImportFileError) else f"{type(exc).__name__}: {exc}"
+        errors = latest['errors'] + [{'row': None, 'sku': None, 'errors': {'file': message}}]
+    ProductImport.objects.filter(pk=job.pk).update(status=status, errors=errors, finished_at=timezone.now())
+    job.refresh_from_db()
+    return job
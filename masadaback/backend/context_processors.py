@@ -0,0 +1,14 @@
+# Template context processors for WoodHop Website
+
+
+def get_session_cart_count(session):
+    """Total quantity of items in the session cart"""
+    cart = session.get('cart', {})
+    return sum(int(item.get('quantity', 0)) for item in cart.values())
+
+
+def cart_count(request):
+    """Expose the cart count to every template so base.html renders it without an extra request"""
+    if not hasattr(request, 'session'):
+        return {'cart_count': 0}
+    return {'cart_count': get_session_cart_count(request.session)}
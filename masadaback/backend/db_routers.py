@@ -0,0 +1,97 @@
+# Primary/replica routing: catalog and reporting reads opt in to the replica, everything else stays on primary
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# only these apps are read from the replica; sessions/auth always see the primary so logins take effect at once
+REPLICA_APPS = {'backend'}
+PIN_COOKIE = 'masada_pin_primary'
+
+_read_target = contextvars.ContextVar('read_target', default=None)  # 'replica' / 'primary' / None (Django's default)
+_pin_state = contextvars.ContextVar('pin_state', default=None)  # per-request {'pinned', 'wrote'}, see pin_scope
+
+
+def replica_alias():
+    """The configured replica alias, or None when DATABASES has no replica"""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def use_replica():
+    """Reads of REPLICA_APPS models inside the block go to the replica (unless the request is pinned)"""
+    token = _read_target.set('replica')
+    try:
+        yield
+    finally:
+        _read_target.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Reads inside the block go to primary even within an outer use_replica()"""
+    token = _read_target.set('primary')
+    try:
+        yield
+    finally:
+        _read_target.reset(token)
+
+
+@contextmanager
+def pin_scope(pinned=False):
+    """Track writes for one request: after the first write every later read goes to primary"""
+    state = {'pinned': pinned, 'wrote': False}
+    token = _pin_state.set(state)
+    try:
+        yield state
+    finally:
+        _pin_state.reset(token)
+
+
+def replica_reads(view):
+    """View decorator: serve the view's reads from the replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def primary_only(view):
+    """View decorator for read-after-write paths that must never see replication lag"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """DATABASE_ROUTERS entry: writes always go to primary, opted-in reads to REPLICA_DATABASE"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICA_APPS:
+            return None
+        target = _read_target.get()
+        state = _pin_state.get()
+        if target == 'primary' or (state is not None and state['pinned']):
+            return PRIMARY
+        if target == 'replica':
+            return replica_alias() or PRIMARY
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _pin_state.get()
+        if state is not None and model._meta.app_label in REPLICA_APPS:
+            state['pinned'] = state['wrote'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as primary, so objects loaded from either may be related
+        aliases = {PRIMARY, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,213 @@
+# Delivery planning: batch a day's undelivered orders by area into capacity-limited routes, give them drivers, cost them
+#
+# An area is a customer location. Distances come from a locally supplied square matrix of km between areas and
+# the depot; its diagonal is the hop between two drops in the same area. Each area's drops are packed first-fit
+# decreasing into vehicle loads, then the Clarke-Wright savings heuristic joins loads from different areas
+# into routes while the vehicle capacity allows. Savings are computed for every pair of loads at once with
+# numpy, so a day of a few thousand drops (a few hundred loads) plans in well under a second. Drivers take
+# routes longest first, each going to the driver with the fewest km so far.
+#
+#   route km   = depot -> stop -> ... -> stop -> depot
+#   route cost = cost_per_route + cost_per_km * km, split across its orders by units carried
+import csv
+import heapq
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .models import Delivery, Order
+
+DEFAULTS = {
+    'capacity': 1000,  # order units per vehicle load
+    'cost_per_km': Decimal('1.50'),
+    'cost_per_route': Decimal('20.00'),  # loading, driver call-out
+    'depot': 'Depot',  # the matrix row/column for the yard
+}
+PLANNABLE = ('scheduled', 'pending')  # delivery statuses a re-plan may still move
+CLOSED_ORDERS = ('delivered', 'cancelled')
+CENT = Decimal('0.01')
+
+
+class DistanceMatrixError(Exception):
+    """The distance file is missing areas, isn't square or holds something other than distances"""
+
+
+def area_key(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+def load_distances(path):
+    """({area: index}, km matrix) from a CSV whose header row and first column name the same areas"""
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as fh:
+            rows = [row for row in csv.reader(fh) if any(cell.strip() for cell in row)]
+    except OSError as exc:
+        raise DistanceMatrixError(f"Can't read {path}: {exc}")
+    if not rows:
+        raise DistanceMatrixError(f"{path} is empty")
+    index = {area_key(cell): i for i, cell in enumerate(rows[0][1:])}
+    km = np.full((len(index), len(index)), np.nan)
+    for row in rows[1:]:
+        if area_key(row[0]) not in index or len(row) - 1 != len(index):
+            raise DistanceMatrixError(f"Row {row[0]!r} doesn't match the header")
+        try:
+            km[index[area_key(row[0])]] = [float(cell) for cell in row[1:]]
+        except ValueError:
+            raise DistanceMatrixError(f"Row {row[0]!r} has a value that isn't a number")
+    if np.isnan(km).any() or (km < 0).any():
+        raise DistanceMatrixError("Every area needs a row, and distances can't be negative")
+    return index, km
+
+
+def load_drops(day):
+    """[{'order', 'delivery', 'area', 'address', 'units'}] for delivery orders still to go out on day
+
+    Deliveries already booked for the day and not yet on the road, plus paid delivery orders nobody has
+    booked yet: they join the first day planned.
+    """
+    drops = [
+        {'order': order_id, 'delivery': pk, 'area': area, 'address': address, 'units': units}
+        for order_id, pk, area, address, units in Delivery.objects
+        .filter(delivery_date=day, delivery_status__in=PLANNABLE)
+        .exclude(order__order_status__in=CLOSED_ORDERS)
+        .values_list('order_id', 'pk', 'order__customer__location', 'delivery_address', 'order__total_quantity')
+    ]
+    drops += [
+        {'order': order_id, 'delivery': None, 'area': area, 'address': area, 'units': units}
+        for order_id, area, units in Order.objects
+        .filter(delivery_option='delivery', payment_status='paid', delivery__isnull=True)
+        .exclude(order_status__in=CLOSED_ORDERS)
+        .values_list('order_id', 'customer__location', 'total_quantity')
+    ]
+    return drops
+
+
+def pack(drops, capacity):
+    """First-fit decreasing: lists of drops whose units fit a vehicle (an oversize order travels alone)"""
+    loads = []
+    for drop in sorted(drops, key=lambda drop: -drop['units']):
+        for load in loads:
+            if load[0] + drop['units'] <= capacity:
+                load[0] += drop['units']
+                load[1].append(drop)
+                break
+        else:
+            loads.append([drop['units'], [drop]])
+    return [drops for _, drops in loads]
+
+
+def savings_routes(nodes, units, km, depot, capacity):
+    """Clarke-Wright: node indexes grouped into routes in visit order; nodes[i] is the area of load i"""
+    nodes = np.asarray(nodes, dtype=np.int64)
+    out, back = km[nodes, depot], km[depot, nodes]
+    saving = out[:, None] + back[None, :] - km[np.ix_(nodes, nodes)]
+    first, second = np.triu_indices(len(nodes), k=1)
+    saving = saving[first, second]
+    keep = saving > 0
+    order = np.argsort(-saving[keep], kind='stable')
+    pairs = zip(first[keep][order].tolist(), second[keep][order].tolist())
+
+    route_of = list(range(len(nodes)))
+    routes = {i: [i] for i in range(len(nodes))}
+    load = {i: units[i] for i in range(len(nodes))}
+    for i, j in pairs:
+        a, b = route_of[i], route_of[j]
+        if a == b or load[a] + load[b] > capacity:
+            continue
+        head, tail = routes[a], routes[b]
+        # joins only happen at route ends: i must finish one route and j start the other
+        if head[-1] != i:
+            if head[0] != i:
+                continue
+            head.reverse()
+        if tail[0] != j:
+            if tail[-1] != j:
+                continue
+            tail.reverse()
+        head.extend(tail)
+        load[a] += load.pop(b)
+        for node in routes.pop(b):
+            route_of[node] = a
+    return list(routes.values())
+
+
+def route_km(areas, km, depot):
+    """km for depot -> areas (one entry per drop, in order) -> depot"""
+    path = [depot, *areas, depot]
+    return float(sum(km[a, b] for a, b in zip(path, path[1:])))
+
+
+def split_cost(cost, units):
+    """cost shared by units carried, in cents; rounding leftovers go to the first share"""
+    total = sum(units)
+    shares = [(cost * (u / total if total else Decimal(1) / len(units))).quantize(CENT, ROUND_DOWN) for u in units]
+    shares[0] += cost - sum(shares)
+    return shares
+
+
+def assign_drivers(routes, drivers):
+    """Set route['driver']: longest route first, to whoever has driven the fewest km so far"""
+    queue = [(0.0, i, driver) for i, driver in enumerate(drivers)]
+    heapq.heapify(queue)
+    for route in sorted(routes, key=lambda route: -route['km']):
+        driven, i, driver = heapq.heappop(queue)
+        route['driver'] = driver
+        heapq.heappush(queue, (driven + route['km'], i, driver))
+
+
+def plan(day, distances, drivers, capacity=DEFAULTS['capacity'], cost_per_km=DEFAULTS['cost_per_km'],
+         cost_per_route=DEFAULTS['cost_per_route'], depot=DEFAULTS['depot'], drops=None):
+    """{'routes': [{'driver', 'km', 'units', 'cost', 'drops'}], 'unplanned': [drops whose area has no distances]}
+
+    distances is the (index, km) pair from load_distances; every drop gets a 'cost' share of its route.
+    """
+    if not drivers:
+        raise ValueError("No drivers to plan for")
+    index, km = distances
+    if area_key(depot) not in index:
+        raise DistanceMatrixError(f"The distance matrix has no {depot!r} row for the depot")
+    depot = index[area_key(depot)]
+    drops = load_drops(day) if drops is None else drops
+
+    by_area, unplanned = defaultdict(list), []
+    for drop in drops:
+        area = index.get(area_key(drop['area'] or ''))
+        (unplanned if area is None else by_area[area]).append(drop)
+
+    loads, nodes = [], []
+    for area, area_drops in by_area.items():
+        for load in pack(area_drops, capacity):
+            loads.append(load)
+            nodes.append(area)
+    units = [sum(drop['units'] for drop in load) for load in loads]
+
+    routes = []
+    for members in (savings_routes(nodes, units, km, depot, capacity) if loads else []):
+        stops = [drop for node in members for drop in loads[node]]
+        distance = route_km([nodes[node] for node in members for _ in loads[node]], km, depot)
+        cost = (cost_per_route + cost_per_km * Decimal(str(round(distance, 2)))).quantize(CENT)
+        for drop, share in zip(stops, split_cost(cost, [Decimal(drop['units']) for drop in stops])):
+            drop['cost'] = share
+        routes.append({'driver': None, 'km': round(distance, 2), 'units': sum(units[node] for node in members),
+                       'cost': cost, 'drops': stops})
+    assign_drivers(routes, drivers)
+    return {'routes': routes, 'unplanned': unplanned}
+
+
+@transaction.atomic
+def save(day, result, batch_size=500):
+    """Write a plan: booked deliveries get their driver and cost, unbooked orders get a Delivery for day"""
+    booked, new = [], []
+    for route in result['routes']:
+        for drop in route['drops']:
+            fields = {'driver_name': route['driver'], 'transport_cost': drop['cost'], 'delivery_status': 'scheduled'}
+            if drop['delivery'] is None:
+                new.append(Delivery(order_id=drop['order'], delivery_date=day, delivery_address=drop['address'], **fields))
+            else:
+                booked.append(Delivery(pk=drop['delivery'], **fields))
+    Delivery.objects.bulk_update(booked, ['driver_name', 'transport_cost', 'delivery_status'], batch_size=batch_size)
+    # an order booked by someone else since the plan was read keeps that booking
+    Delivery.objects.bulk_create(new, batch_size=batch_size, ignore_conflicts=True)
+    return len(booked), len(new)
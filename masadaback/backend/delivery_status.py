@@ -0,0 +1,59 @@
+# Delivery status changes in bulk, and the per-driver manifest they are made from
+#
+# A driver closing a route sends every stop at once. The whole batch is one guarded UPDATE on Delivery
+# (only rows in a status the transition may leave), one count to check nothing was refused, and one UPDATE
+# on Order for the orders the transition finishes, all in one transaction: any refused row rolls it back.
+# The manifest is a single read on delivery_manifest_idx (delivery_date, driver_name, delivery_status).
+from django.db import transaction
+
+from .models import Delivery, Order
+
+# new status -> the statuses it may follow; a row already in the new status is left as it is (retries)
+TRANSITIONS = {
+    'out_for_delivery': ('pending', 'scheduled'),
+    'delivered': ('pending', 'scheduled', 'out_for_delivery'),
+    'failed': ('scheduled', 'out_for_delivery'),
+    'scheduled': ('pending', 'failed'),  # rebooked after a failed attempt
+}
+ORDER_STATUS = {'delivered': 'delivered'}  # delivery status -> the Order.order_status it settles
+MAX_BATCH = 500
+MANIFEST_FIELDS = {
+    'delivery': 'pk',
+    'order': 'order_id',
+    'customer': 'order__customer__fullname',
+    'address': 'delivery_address',
+    'units': 'order__total_quantity',
+    'status': 'delivery_status',
+}
+
+
+class InvalidTransition(Exception):
+    """Some deliveries in a batch don't exist or can't move to the new status; none of the batch was applied"""
+
+    def __init__(self, status, refused):
+        self.refused = refused  # [{'delivery', 'status'}], status None for an unknown delivery
+        super().__init__(f"{len(refused)} deliveries can't be marked {status}")
+
+
+@transaction.atomic
+def transition(delivery_ids, status):
+    """Move every delivery in delivery_ids to status and settle their orders; returns the rows changed"""
+    delivery_ids = set(delivery_ids)
+    deliveries = Delivery.objects.filter(pk__in=delivery_ids)
+    changed = deliveries.filter(delivery_status__in=TRANSITIONS[status]).update(delivery_status=status)
+    if deliveries.filter(delivery_status=status).count() != len(delivery_ids):
+        found = dict(deliveries.values_list('pk', 'delivery_status'))
+        refused = [{'delivery': pk, 'status': found.get(pk)} for pk in sorted(delivery_ids) if found.get(pk) != status]
+        raise InvalidTransition(status, refused)
+    if status in ORDER_STATUS:
+        Order.objects.filter(delivery__in=delivery_ids).update(order_status=ORDER_STATUS[status])
+    return changed
+
+
+def manifest(driver, day, status=None):
+    """[{'delivery', 'order', 'customer', 'address', 'units', 'status'}] for driver's stops on day"""
+    deliveries = Delivery.objects.filter(delivery_date=day, driver_name=driver)
+    if status:
+        deliveries = deliveries.filter(delivery_status=status)
+    rows = deliveries.order_by('delivery_status', 'pk').values_list(*MANIFEST_FIELDS.values())
+    return [dict(zip(MANIFEST_FIELDS, row)) for row in rows]
@@ -0,0 +1,59 @@
+# Per-process JSON dumps, so stats held in each worker's memory can be merged by whichever process is asked
+#
+# Every process writes <prefix>-<pid>-<token>.json. The token is new in each process, so a recycled pid
+# never overwrites a dead worker's file with smaller numbers. Readers delete, unread, the dumps nobody has
+# rewritten within max_age seconds: workers killed before they could clean up, or idle that long.
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+_process = (None, None)  # (pid, token)
+
+
+def _name(prefix):
+    global _process
+    pid = os.getpid()
+    if _process[0] != pid:  # a forked worker must not share its parent's token
+        _process = (pid, uuid.uuid4().hex[:12])
+    return f"{prefix}-{pid}-{_process[1]}.json"
+
+
+def write(dump_dir, prefix, data):
+    """Replace this process's dump"""
+    path = Path(dump_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    target = path / _name(prefix)
+    tmp = target.with_suffix('.tmp')
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, target)
+
+
+def remove(dump_dir, prefix):
+    """Delete this process's dump, e.g. on exit, so its numbers stop counting"""
+    if dump_dir:
+        (Path(dump_dir) / _name(prefix)).unlink(missing_ok=True)
+
+
+def read(dump_dir, prefix, max_age=None):
+    """The parsed dumps of every process; unreadable ones are skipped, stale ones deleted"""
+    if not dump_dir or not Path(dump_dir).is_dir():
+        return []
+    now, loaded = time.time(), []
+    for dump in Path(dump_dir).glob(f'{prefix}-*.json'):
+        try:
+            if max_age is not None and now - dump.stat().st_mtime > max_age:
+                dump.unlink(missing_ok=True)
+                continue
+            loaded.append(json.loads(dump.read_text()))
+        except (OSError, ValueError):
+            continue
+    return loaded
+
+
+def clear(dump_dir, prefix):
+    """Delete every process's dump"""
+    if dump_dir and Path(dump_dir).is_dir():
+        for dump in Path(dump_dir).glob(f'{prefix}-*.json'):
+            dump.unlink(missing_ok=True)
@@ -0,0 +1,107 @@
+# Demand forecasting: daily OrderItem quantities per product -> reorder_level / reorder_quantity
+#
+# History is summed per (product, day) in SQL and loaded once into a products x days matrix. Simple
+# exponential smoothing then runs one vectorized step per day over every product at once (no per-product
+# Python loop), tracking the smoothed daily demand and the smoothed variance of its one-step error:
+#
+#   reorder_level    = demand * lead_time + z(service_level) * sigma * sqrt(lead_time)   (cover + safety stock)
+#   reorder_quantity = demand * review_days                                               (one ordering cycle)
+#
+# numpy is only imported by this module and the command that runs it, never on the request path.
+import math
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Inventory, OrderItem
+
+DEFAULTS = {
+    'days': 730,  # history window
+    'alpha': 0.1,  # smoothing factor: weight of the newest day
+    'lead_time': 7,  # days between ordering and receiving stock
+    'review_days': 14,  # days of demand one purchase order should cover
+    'service_level': 0.95,  # probability of not running out during the lead time
+}
+CHUNK = 5000  # products per matrix block (CHUNK x days float64)
+
+
+def load_demand(days, today=None):
+    """(product_ids, product_index, day_index, quantity) for non-cancelled order lines in the last `days` days"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    # a plain range on order_date (not __date) so order_date_idx can serve it
+    since = timezone.make_aware(datetime.combine(start, time.min))
+    until = since + timedelta(days=days)
+    rows = (OrderItem.objects
+            .filter(order__order_date__gte=since, order__order_date__lt=until)
+            .exclude(order__order_status='cancelled')
+            .annotate(day=TruncDate('order__order_date'))
+            .values_list('product_id', 'day')
+            .annotate(units=Sum('quantity'))
+            .order_by())
+
+    index = {}
+    products, offsets, units = [], [], []
+    for product_id, day, quantity in rows.iterator(chunk_size=20000):
+        products.append(index.setdefault(product_id, len(index)))
+        offsets.append((day - start).days)
+        units.append(quantity)
+    return (list(index), np.array(products, dtype=np.int64),
+            np.array(offsets, dtype=np.int64), np.array(units, dtype=np.float64))
+
+
+def smooth(demand, alpha):
+    """Exponential smoothing across the day axis of a products x days matrix -> (daily level, error std)"""
+    warmup = min(28, demand.shape[1])
+    level = demand[:, :warmup].mean(axis=1)
+    variance = demand[:, :warmup].var(axis=1)
+    for day in range(warmup, demand.shape[1]):
+        error = demand[:, day] - level
+        level += alpha * error
+        variance = (1 - alpha) * (variance + alpha * error * error)
+    return level, np.sqrt(variance)
+
+
+def forecast(days=DEFAULTS['days'], alpha=DEFAULTS['alpha'], lead_time=DEFAULTS['lead_time'],
+             review_days=DEFAULTS['review_days'], service_level=DEFAULTS['service_level'], today=None):
+    """{product_id: (reorder_level, reorder_quantity)} for every product sold in the window"""
+    product_ids, product_index, day_index, quantity = load_demand(days, today)
+    if not product_ids:
+        return {}
+    z = NormalDist().inv_cdf(service_level)
+
+    order = np.argsort(product_index, kind='stable')
+    product_index, day_index, quantity = product_index[order], day_index[order], quantity[order]
+    levels = np.empty(len(product_ids), dtype=np.int64)
+    quantities = np.empty(len(product_ids), dtype=np.int64)
+    for lo in range(0, len(product_ids), CHUNK):
+        hi = min(lo + CHUNK, len(product_ids))
+        first, last = np.searchsorted(product_index, [lo, hi])
+        demand = np.zeros((hi - lo, days))
+        np.add.at(demand, (product_index[first:last] - lo, day_index[first:last]), quantity[first:last])
+
+        daily, sigma = smooth(demand, alpha)
+        levels[lo:hi] = np.ceil(daily * lead_time + z * sigma * math.sqrt(lead_time))
+        quantities[lo:hi] = np.maximum(np.ceil(daily * review_days), 1)
+    return dict(zip(product_ids, zip(levels.tolist(), quantities.tolist())))
+
+
+@transaction.atomic
+def apply(suggestions, batch_size=900):
+    """Write suggestions to Inventory; one UPDATE per distinct (level, quantity) pair and batch of products"""
+    by_value = defaultdict(list)
+    for product_id, values in suggestions.items():
+        by_value[values].append(product_id)
+    updated = 0
+    for (level, quantity), product_ids in by_value.items():
+        for start in range(0, len(product_ids), batch_size):
+            updated += Inventory.objects.filter(product_id__in=product_ids[start:start + batch_size]).update(
+                reorder_level=level, reorder_quantity=quantity,
+            )
+    return updated
@@ -48,6 +48,8 @@ urlpatterns = [
     
     # Business Tools
     path('add-product/', frontend_views.add_product, name='add_product'),
+    path('import-products/', frontend_views.import_products, name='import_products'),
+    path('product-imports/<uuid:import_id>/', frontend_views.product_import_status, name='product_import_status'),
     path('add-staff/', frontend_views.add_staff, name='add_staff'),
     
     # User Dashboard
@@ -4,20 +4,21 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.db.models import Q, Sum, F, Count
-from .models import Product, Customer, Order, OrderItem, Inventory, Staff
-from .serializers import ProductSerializer
+from .models import Product, Customer, Order, OrderItem, Inventory, Staff, ProductImport
+from .context_processors import get_session_cart_count
+from . import margins, metrics, order_history
+from .db_routers import primary_only, replica_reads
+from .order_detail import delivery_of, load_order
 from django.utils import timezone
 from datetime import timedelta
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.encoding import force_bytes, force_str
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.contrib.sites.shortcuts import get_current_site
 import json
 
+# Mail, token, site and image-processing helpers are imported inside the few views that use them,
+# so worker boot and catalog requests don't load them (see `manage.py profile_imports`).
+
+@replica_reads
 def home(request):
     """Homepage with featured products"""
     featured_products = Product.objects.all()[:6]  # Show first 6 products
@@ -29,6 +30,7 @@ def home(request):
     }
     return render(request, 'frontend/home.html', context)
 
+@replica_reads
 def shop(request):
     """Product catalog/shop page"""
     products = Product.objects.all()
@@ -60,6 +62,7 @@ def shop(request):
     }
     return render(request, 'frontend/shop.html', context)
 
+@replica_reads
 def product_detail(request, product_id):
     """Individual product detail page"""
     product = get_object_or_404(Product, product_id=product_id)
@@ -144,6 +147,8 @@ def user_signup(request):
             # Create Customer Profile
             import uuid
             import random
+            from django.core.mail import send_mail
+            from django.template.loader import render_to_string
             verification_code = str(random.randint(100000, 999999))
             
             customer = Customer.objects.create(
@@ -178,6 +183,7 @@ def user_signup(request):
     
     return render(request, 'frontend/signup.html')
 
+@primary_only
 def verify_account(request, customer_id):
     """View to verify account using a 6-digit code"""
     customer = get_object_or_404(Customer, customer_id=customer_id)
@@ -205,6 +211,8 @@ def resend_verification(request, customer_id):
     customer = get_object_or_404(Customer, customer_id=customer_id)
     
     import random
+    from django.core.mail import send_mail
+    from django.template.loader import render_to_string
     new_code = str(random.randint(100000, 999999))
     customer.verification_code = new_code
     customer.save()
@@ -232,6 +240,7 @@ def user_logout(request):
     return redirect('home')
 
 @login_required(login_url='login')
+@replica_reads
 def dashboard(request):
     """User dashboard"""
     try:
@@ -284,6 +293,10 @@ def dashboard(request):
             # Inventory model has reorder_level.
             low_stock_count = inventory_items.filter(quantity_available__lt=F('reorder_level')).count()
             
+            # this month's margins as last built by build_margin_reports (None before the first run)
+            margin_report = margins.get(timezone.localdate())
+            margin_total = margins.rows(margin_report, 'vendor', vendor=customer).first()
+            
             context = {
                 'customer': customer,
                 'inventory_items': inventory_items,
@@ -292,6 +305,10 @@ def dashboard(request):
                 'weekly_orders_count': weekly_orders_count,
                 'total_products': total_products,
                 'low_stock_count': low_stock_count,
+                'margin_month': margins.month_start(timezone.localdate()),
+                'margin_computed_at': margin_report and margin_report.computed_at,
+                'margin_total': margin_total and margins.as_dict(margin_total),
+                'margin_products': [margins.as_dict(row) for row in margins.rows(margin_report, 'product', vendor=customer, limit=5)],
                 'graph_labels': json.dumps(graph_labels),
                 'graph_data': json.dumps(graph_data),
                 'sales_growth': 12, # Placeholder calculation
@@ -307,7 +324,7 @@ def dashboard(request):
             project_count = recent_orders.count() # Each order seen as a project for now
             
             # Dynamic Discount Tier based on total spend
-            total_spend = sum(OrderItem.objects.filter(order__customer=customer).values_list('subtotal', flat=True))
+            total_spend = recent_orders.aggregate(total=Sum('total_amount'))['total'] or 0
             if total_spend > 5000:
                 discount_tier = 'Gold (20%)'
             elif total_spend > 2000:
@@ -328,7 +345,7 @@ def dashboard(request):
         elif customer.customer_type == 'Retailer':
             recent_orders = Order.objects.filter(customer=customer).order_by('-order_date')
             # Calculate total outstanding or total spent
-            total_spent = sum(OrderItem.objects.filter(order__customer=customer).values_list('subtotal', flat=True))
+            total_spent = recent_orders.aggregate(total=Sum('total_amount'))['total'] or 0
             
             context = {
                 'customer': customer,
@@ -374,35 +391,53 @@ def bulk_order(request):
 
 @login_required(login_url='login')
 def orders(request):
-    """User orders page"""
+    """User orders page: filters and keyset pages of 25 (order_history), newest first"""
     try:
         customer = request.user.customer
-        orders = Order.objects.filter(customer=customer).order_by('-order_date')
-        
-        context = {
-            'customer': customer,
-            'orders': orders,
-        }
-        return render(request, 'frontend/orders.html', context)
     except Exception:
         return redirect('home')
+    
+    orders = Order.objects.filter(customer=customer)
+    try:
+        orders, next_cursor = order_history.keyset_page(order_history.filter_orders(orders, request.GET), request.GET)
+    except order_history.InvalidFilter as e:
+        messages.warning(request, str(e))
+        orders, next_cursor = order_history.keyset_page(orders, {})
+    
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_query = params.urlencode()
+    context = {
+        'customer': customer,
+        'orders': orders,
+        'filters': request.GET,
+        'next_query': next_query,
+        'status_choices': ['processing', 'delivered', 'cancelled'],
+        'payment_choices': ['pending', 'paid', 'failed', 'expired'],
+    }
+    return render(request, 'frontend/orders.html', context)
 
 @login_required(login_url='login')
 def order_detail(request, order_id):
     """Individual order detail"""
     try:
         customer = request.user.customer
-        order = get_object_or_404(Order, order_id=order_id, customer=customer)
-        order_items = OrderItem.objects.filter(order=order)
-        
-        context = {
-            'order': order,
-            'order_items': order_items,
-            'customer': customer,
-        }
-        return render(request, 'frontend/order_detail.html', context)
-    except Exception:
+    except Customer.DoesNotExist:
         return redirect('orders')
+    try:
+        order = load_order(order_id, customer=customer)
+    except Order.DoesNotExist:
+        raise Http404("No such order")
+    
+    context = {
+        'order': order,
+        'order_items': order.items.all(),
+        'delivery': delivery_of(order),
+        'customer': customer,
+    }
+    return render(request, 'frontend/order_detail.html', context)
 
 # AJAX Views for dynamic functionality
 def add_to_cart(request):
@@ -429,7 +464,8 @@ def add_to_cart(request):
                 }
             
             request.session['cart'] = cart
-            cart_count = sum(item['quantity'] for item in cart.values())
+            cart_count = get_session_cart_count(request.session)
+            metrics.inc('masada_cart_operations_total', operation='add')
             
             return JsonResponse({
                 'success': True,
@@ -443,6 +479,7 @@ def add_to_cart(request):
 
 def cart(request):
     """Shopping cart page"""
+    metrics.inc('masada_cart_operations_total', operation='view')
     cart = request.session.get('cart', {})
     cart_items = []
     total = 0
@@ -462,17 +499,14 @@ def cart(request):
     context = {
         'cart_items': cart_items,
         'total': total,
-        'cart_count': len(cart_items)
+        'line_count': len(cart_items),  # cart_count (the navbar badge) comes from the context processor
     }
     return render(request, 'frontend/cart.html', context)
 
 def get_cart_count(request):
-    """AJAX view to get current cart count"""
-    cart = request.session.get('cart', {})
-    if not cart:
-        return JsonResponse({'count': 0})
-    cart_count = sum(int(item.get('quantity', 0)) for item in cart.values())
-    return JsonResponse({'count': cart_count})
+    """AJAX view to get current cart count (in-page refreshes only; initial render uses the context processor)"""
+    metrics.inc('masada_cart_operations_total', operation='count')
+    return JsonResponse({'count': get_session_cart_count(request.session)})
 
 @login_required
 def add_product(request):
@@ -482,6 +516,15 @@ def add_product(request):
             customer = request.user.customer
             if customer.customer_type != 'Business':
                 return JsonResponse({'success': False, 'message': 'Unauthorized'})
+
+            from . import images
+            image = request.FILES.get('image')
+            if image is not None:
+                try:
+                    images.verify_upload(image)
+                except images.NotAnImage as e:
+                    messages.error(request, f'Error adding product: {e}')
+                    return redirect('dashboard')
                 
             import uuid
             product = Product.objects.create(
@@ -494,9 +537,14 @@ def add_product(request):
                 Dimensions=request.POST.get('dimensions'),
                 stock_quantity=0, # Initial stock logic handled by inventory usually, but model has it
                 description=request.POST.get('description'),
-                vendor=customer
+                vendor=customer,
+                image=image
             )
             
+            # Resized WebP/AVIF variants; generate_product_images retries any that fail here
+            if product.image:
+                images.try_generate_variants(product)
+            
             # Create initial inventory record
             Inventory.objects.create(
                 product=product,
@@ -513,6 +561,37 @@ def add_product(request):
             
     return redirect('dashboard')
 
+@login_required
+def import_products(request):
+    """Queue a CSV/XLSX catalog upload; the process_product_imports worker upserts it by vendor SKU"""
+    if request.method == 'POST':
+        customer = getattr(request.user, 'customer', None)
+        if customer is None or customer.customer_type != 'Business':
+            return JsonResponse({'success': False, 'message': 'Unauthorized'})
+        upload = request.FILES.get('file')
+        if upload is None or not upload.name.lower().endswith(('.csv', '.xlsx')):
+            messages.error(request, 'Upload a .csv or .xlsx catalog file.')
+            return redirect('dashboard')
+        job = ProductImport.objects.create(vendor=customer, file=upload)
+        messages.success(request, f'Catalog queued for import (job {job.import_id}).')
+    return redirect('dashboard')
+
+@login_required
+def product_import_status(request, import_id):
+    """Progress and per-row error report of one of the vendor's catalog imports"""
+    job = get_object_or_404(ProductImport, import_id=import_id, vendor__user=request.user)
+    return JsonResponse({
+        'import_id': job.import_id,
+        'status': job.status,
+        'rows_total': job.rows_total,
+        'rows_created': job.rows_created,
+        'rows_updated': job.rows_updated,
+        'rows_failed': job.rows_failed,
+        'errors': job.errors,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    })
+
 @login_required
 def add_staff(request):
     """Allow business users to add staff"""
@@ -542,6 +621,12 @@ def add_staff(request):
 def request_token_login(request):
     """View to request a passwordless login link"""
     if request.method == 'POST':
+        from django.contrib.auth.tokens import default_token_generator
+        from django.contrib.sites.shortcuts import get_current_site
+        from django.core.mail import send_mail
+        from django.template.loader import render_to_string
+        from django.utils.encoding import force_bytes
+        from django.utils.http import urlsafe_base64_encode
         email = request.POST.get('email')
         try:
             user = User.objects.get(email=email)
@@ -575,6 +660,9 @@ def request_token_login(request):
 
 def verify_token_login(request, uidb64, token):
     """View to verify the token and log the user in"""
+    from django.contrib.auth.tokens import default_token_generator
+    from django.utils.encoding import force_str
+    from django.utils.http import urlsafe_base64_decode
     try:
         uid = force_str(urlsafe_base64_decode(uidb64))
         user = User.objects.get(pk=uid)
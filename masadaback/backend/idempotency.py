@@ -0,0 +1,93 @@
+# Idempotency keys for order writes: a retried POST replays the first response instead of running again
+#
+# The view and the key insert share one transaction. When two copies of a request race, the loser's
+# insert hits the primary key and rolls back its whole transaction (order, items and stock moves),
+# then it replays the winner's response. A retry after that costs one primary-key lookup.
+#
+# Only successful (2xx) responses are kept. A rejected or failed request leaves the key free, so the client
+# can fix the payload or retry once stock is back without being replayed the old error.
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+def key_ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _fingerprint(data):
+    if hasattr(data, 'lists'):  # QueryDict from form posts
+        data = dict(data.lists())
+    return _sha256(json.dumps(data, sort_keys=True, default=str))
+
+
+def _replay(stored, fingerprint):
+    if stored.fingerprint != fingerprint:
+        return Response({"detail": f"{HEADER} was already used for a different request"}, status=422)
+    return Response(stored.response, status=stored.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def idempotent(view_method):
+    """ViewSet method decorator: honour an Idempotency-Key header on writes (requests without one run as usual)"""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None or request.method in SAFE_METHODS:
+            return view_method(self, request, *args, **kwargs)
+        if not 0 < len(key) <= 255:
+            return Response({"detail": f"{HEADER} must be 1 to 255 characters"}, status=400)
+
+        digest = _sha256(f"{request.user.pk or ''}\n{request.method}\n{request.path}\n{key}")
+        fingerprint = _fingerprint(request.data)
+        now = timezone.now()
+        stored = IdempotencyKey.objects.filter(digest=digest).first()
+        if stored is not None and stored.expires_at > now:
+            return _replay(stored, fingerprint)
+
+        try:
+            with transaction.atomic():
+                response = view_method(self, request, *args, **kwargs)
+                if not 200 <= response.status_code < 300 or not hasattr(response, 'data'):
+                    return response
+                if stored is not None:
+                    stored.delete()  # expired; the key starts over
+                IdempotencyKey.objects.create(
+                    digest=digest, fingerprint=fingerprint, status_code=response.status_code,
+                    response=response.data, expires_at=now + key_ttl(),
+                )
+        except IntegrityError:
+            expired, stored = stored, IdempotencyKey.objects.filter(digest=digest).first()
+            # a lost race leaves the winner's live key; no key, or the expired one read above, means the view's own error
+            if stored is None or stored.expires_at <= now or (
+                    expired is not None and stored.expires_at == expired.expires_at):
+                raise
+            return _replay(stored, fingerprint)
+        return response
+    return wrapper
+
+
+def purge_expired(now=None, batch_size=5000):
+    """Delete expired keys in batches; returns the number deleted"""
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        batch = list(IdempotencyKey.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
@@ -0,0 +1,145 @@
+# Product image variants: resized WebP/AVIF renditions with content-hashed filenames
+import hashlib
+import io
+import logging
+from pathlib import Path, PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+# name -> target width in px (height follows the source aspect ratio)
+IMAGE_SIZES = {
+    'thumb': 160,
+    'card': 400,
+    'detail': 800,
+}
+VARIANT_DIR = 'products/variants'
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+
+# Home page hero backgrounds: layer name -> original under backend/static/images (1.6-2MB each). The page
+# loads resized renditions from HERO_DIR instead, written by `generate_product_images --hero`.
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+HERO_IMAGES = {
+    'tree': '150779_Katana_Ai-Photo-Library-V2_Image-6_Low-Res.webp',
+    'cut': 'construction-inventory-software-lumber-1024x683.jpg',
+    'furniture': 'shutterstock_189324260-scaled.jpg',
+}
+HERO_WIDTHS = (960, 1920)  # phones/tablets, desktops
+HERO_DIR = 'images/hero'
+
+
+class NotAnImage(ValueError):
+    """An upload that Pillow can't identify as an image"""
+
+
+def avif_supported():
+    try:
+        from PIL import features
+        return bool(features.check('avif'))
+    except (ImportError, ValueError):
+        return False
+
+
+def _encode(image, fmt, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def _save_variant(stem, size_name, data, extension):
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    name = f"{VARIANT_DIR}/{stem}.{size_name}.{digest}.{extension}"
+    # content-hashed: an existing file with this name already holds these exact bytes
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def generate_variants(product, with_avif=None):
+    """Render every IMAGE_SIZES variant of product.image, store them and save product.image_variants"""
+    from PIL import Image, ImageOps
+
+    if not product.image:
+        return {}
+    if with_avif is None:
+        with_avif = avif_supported()
+
+    with product.image.open('rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+    stem = PurePosixPath(product.image.name).stem
+    variants = {'source': product.image.name}
+    for size_name, width in IMAGE_SIZES.items():
+        resized = original
+        if original.width > width:
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), Image.LANCZOS)
+
+        variant = {'width': resized.width, 'height': resized.height}
+        variant['webp'] = _save_variant(stem, size_name, _encode(resized, 'WEBP', WEBP_QUALITY), 'webp')
+        if with_avif:
+            variant['avif'] = _save_variant(stem, size_name, _encode(resized, 'AVIF', AVIF_QUALITY), 'avif')
+        variants[size_name] = variant
+
+    product.image_variants = variants
+    product.save(update_fields=['image_variants'])
+    return variants
+
+
+def try_generate_variants(product):
+    """generate_variants, logging a failure instead of raising (generate_product_images retries those)"""
+    try:
+        return generate_variants(product)
+    except (OSError, ValueError):
+        logger.exception("Image variants failed for product %s", product.product_id)
+        return {}
+
+
+def verify_upload(upload):
+    """Raise NotAnImage unless the uploaded file decodes as an image; leaves it rewound for saving"""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(upload) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError) as exc:
+        raise NotAnImage(f"{getattr(upload, 'name', 'The upload')} is not an image") from exc
+    finally:
+        upload.seek(0)
+
+
+def hero_path(layer, width, fmt):
+    """Static path of one hero rendition"""
+    return f"{HERO_DIR}/{layer}-{width}.{fmt}"
+
+
+def generate_hero_variants(with_avif=None):
+    """Write every HERO_IMAGES rendition (HERO_WIDTHS x WebP/AVIF) into STATIC_DIR; returns their paths"""
+    from PIL import Image
+
+    if with_avif is None:
+        with_avif = avif_supported()
+    written = []
+    (STATIC_DIR / HERO_DIR).mkdir(parents=True, exist_ok=True)
+    for layer, source in HERO_IMAGES.items():
+        with Image.open(STATIC_DIR / 'images' / source) as original:
+            original = original.convert('RGB')
+        for width in HERO_WIDTHS:
+            resized = original
+            if original.width > width:
+                resized = original.resize((width, round(original.height * width / original.width)), Image.LANCZOS)
+            for fmt, quality in [('webp', WEBP_QUALITY)] + ([('avif', AVIF_QUALITY)] if with_avif else []):
+                path = STATIC_DIR / hero_path(layer, width, fmt)
+                path.write_bytes(_encode(resized, fmt.upper(), quality))
+                written.append(path)
+    return written
+
+
+def variants_outdated(product):
+    return bool(product.image) and product.image_variants.get('source') != product.image.name
@@ -0,0 +1,46 @@
+# Project layout guard: exactly one importable `backend` app, the one next to manage.py
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+def _package_dir(entry, name):
+    candidate = Path(entry or '.') / name
+    if (candidate / '__init__.py').is_file() or candidate.with_suffix('.py').is_file():
+        return candidate.resolve()
+    return None
+
+
+def backend_copies():
+    """Every `backend` package/module Python could import, in sys.path order, plus nested copies in the project"""
+    import backend
+
+    project_dir = Path(settings.BASE_DIR).resolve()
+    project_package = project_dir / settings.ROOT_URLCONF.split('.')[0]
+    copies = [Path(backend.__file__).resolve().parent]
+    for entry in [*sys.path, project_package]:
+        found = _package_dir(entry, 'backend')
+        if found is not None and found not in copies:
+            copies.append(found)
+    return copies
+
+
+def ensure_single_backend():
+    """Refuse to start when the backend app is ambiguous (depends on the working directory)"""
+    project_dir = Path(settings.BASE_DIR).resolve()
+    expected = project_dir / 'backend'
+    copies = backend_copies()
+    problems = []
+    if copies[0] != expected:
+        problems.append(f"`backend` was imported from {copies[0]}, expected {expected}")
+    if len(copies) > 1:
+        problems.append("other copies: " + ', '.join(str(path) for path in copies[1:]))
+    if (project_dir / '__init__.py').exists():
+        # makes the app importable a second time as <dir>.backend, with its own model registry
+        problems.append(f"{project_dir / '__init__.py'} turns the project directory into a package")
+    if problems:
+        raise ImproperlyConfigured(
+            "Ambiguous backend app: " + '; '.join(problems) + ". Keep a single copy next to manage.py."
+        )
@@ -0,0 +1,137 @@
+import io
+import logging
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from backend.stats import percentile
+
+# name -> settings_dict overrides; "pool" only applies to PostgreSQL with psycopg_pool installed
+MODES = {
+    'no-persist': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'persistent': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True},
+    'pool': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'POOL': {'min_size': 2, 'max_size': 4}},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure request latency and connections opened with CONN_MAX_AGE=0, persistent "
+        "connections (with health checks) and psycopg3 pooling. Requests go through the real "
+        "WSGI handler so Django's per-request connection handling runs as in production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', help='URL path to request (repeatable, default /).')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--mode', action='append', choices=list(MODES), help='Limit to these modes (repeatable).')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        paths = options['path'] or ['/']
+        connection = connections[options['database']]
+        original = dict(connection.settings_dict)
+        original_options = dict(original.get('OPTIONS', {}))
+        handler = WSGIHandler()
+
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == options['database']:
+                opened.append(1)
+
+        connection_created.connect(count_connection)
+        rows = []
+        try:
+            for mode in options['mode'] or list(MODES):
+                overrides = dict(MODES[mode])
+                pool = overrides.pop('POOL', None)
+                if pool is not None and not self.pool_supported(connection):
+                    self.stdout.write(self.style.WARNING(
+                        f"Skipping {mode}: needs the postgresql backend with psycopg and psycopg_pool installed."
+                    ))
+                    continue
+
+                self.reset(connection)
+                connection.settings_dict.update(overrides)
+                connection.settings_dict['OPTIONS'] = dict(original_options)
+                if pool is not None:
+                    connection.settings_dict['OPTIONS']['pool'] = pool
+                else:
+                    connection.settings_dict['OPTIONS'].pop('pool', None)
+
+                for i in range(options['warmup']):
+                    self.request(handler, paths[i % len(paths)])
+                opened.clear()
+                timings = []
+                statuses = set()
+                for i in range(options['requests']):
+                    start = time.perf_counter()
+                    statuses.add(self.request(handler, paths[i % len(paths)]))
+                    timings.append((time.perf_counter() - start) * 1000)
+                rows.append({
+                    'mode': mode,
+                    'p50_ms': round(percentile(timings, 50), 2),
+                    'p95_ms': round(percentile(timings, 95), 2),
+                    'mean_ms': round(sum(timings) / len(timings), 2) if timings else 0,
+                    'connections_opened': len(opened),
+                    'statuses': ','.join(sorted(statuses)),
+                })
+        finally:
+            connection_created.disconnect(count_connection)
+            self.reset(connection)
+            connection.settings_dict.clear()
+            connection.settings_dict.update(original)
+
+        if not rows:
+            raise CommandError("No mode could be benchmarked.")
+        self.print_table(rows, options['requests'])
+
+    def pool_supported(self, connection):
+        if connection.vendor != 'postgresql':
+            return False
+        try:
+            import psycopg  # noqa: F401
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def reset(self, connection):
+        connection.close()
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+
+    def request(self, handler, path):
+        environ = {
+            'PATH_INFO': path,
+            'REQUEST_METHOD': 'GET',
+            'HTTP_HOST': 'localhost',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': io.StringIO(),
+        }
+        setup_testing_defaults(environ)
+        status = []
+        response = handler(environ, lambda s, headers, exc_info=None: status.append(s.split()[0]))
+        try:
+            for _ in response:
+                pass
+        finally:
+            # fires request_finished, which is where Django closes or keeps the connection
+            response.close()
+        return status[0]
+
+    def print_table(self, rows, requests):
+        self.stdout.write(f"{requests} requests per mode")
+        self.stdout.write(f"{'mode':<12} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'conns':>6}  status")
+        for row in rows:
+            self.stdout.write(
+                f"{row['mode']:<12} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['mean_ms']:>8} "
+                f"{row['connections_opened']:>6}  {row['statuses']}"
+            )
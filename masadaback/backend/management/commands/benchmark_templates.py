@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Engine
+
+from backend.stats import percentile
+from backend.template_cache import frontend_template_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what each frontend/*.html template costs to load without the cached loader "
+        "(read + parse + compile) versus a warmed cached loader. "
+        "Per-page render time is reported by run_benchmark (tpl column)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        loaders = ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader']
+        uncached = Engine(loaders=loaders, libraries=self.libraries())
+        cached = Engine(loaders=[('django.template.loaders.cached.Loader', loaders)], libraries=self.libraries())
+
+        header = f"{'template':<42} {'lines':>6} {'uncached p50 ms':>16} {'cached p50 ms':>14} {'speedup':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name in frontend_template_names():
+            cached.get_template(name)  # warm
+            cold = self.time_loads(uncached, name, iterations)
+            warm = self.time_loads(cached, name, iterations)
+            lines = uncached.get_template(name).source.count('\n') + 1
+            speedup = cold / warm if warm else 0
+            self.stdout.write(f"{name:<42} {lines:>6} {cold:>16.3f} {warm:>14.4f} {speedup:>7.0f}x")
+
+    @staticmethod
+    def time_loads(engine, name, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            engine.get_template(name)
+            timings.append((time.perf_counter() - start) * 1000)
+        return percentile(timings, 50)
+
+    @staticmethod
+    def libraries():
+        from django.template import engines
+        return engines['django'].engine.libraries
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend import margins
+from backend.models import MarginReport
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the monthly margin reports (revenue, cost and margin per product, category and vendor) "
+        "so the API and dashboards read them instead of computing on request. Months already stored after "
+        "they ended are skipped unless --rebuild is given; the current month is always recomputed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=12, help='Months to cover, ending with the current one.')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute finished months as well.')
+
+    def handle(self, *args, **options):
+        current = margins.month_start(timezone.localdate())
+        stored = {report.month: report for report in MarginReport.objects.all()}
+        for month in margins.months_back(current, options['months']):
+            report = stored.get(month)
+            if report is not None and month != current and not options['rebuild'] and margins.is_fresh(report):
+                continue
+            start = time.perf_counter()
+            report = margins.build(month)
+            self.stdout.write(
+                f"{month:%Y-%m}: {report.rows.filter(grouping='product').count()} product(s) "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Margin reports are up to date."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from backend import reservations
+
+
+class Command(BaseCommand):
+    help = (
+        "Release every held stock reservation past its deadline back to available stock and "
+        "cancel the abandoned orders. Safe to run concurrently with checkouts; schedule it every minute."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Reservations released per transaction.')
+
+    def handle(self, *args, **options):
+        expired = reservations.expire_stale(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} reservation(s)."))
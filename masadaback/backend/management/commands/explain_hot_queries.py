@@ -0,0 +1,99 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from backend.models import Customer, Inventory, Order, OrderItem, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the hot query patterns used by the frontend views and fail "
+        "if any of them falls back to a sequential scan. Run against a seeded, "
+        "analyzed dataset - planners legitimately prefer seq scans on tiny tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--analyze', action='store_true', help='Refresh planner statistics (ANALYZE) before explaining.')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan for every query.')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        failures = []
+        for label, queryset, tables in self.hot_queries(alias):
+            if queryset is None:
+                self.stdout.write(self.style.WARNING(f"SKIP  {label} (no sample data)"))
+                continue
+
+            plan = queryset.explain()
+            scanned = [table for table in tables if self.is_seq_scan(connection.vendor, plan, table)]
+            if scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"SEQ   {label} -> {', '.join(scanned)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"INDEX {label}"))
+
+            if options['verbose_plans'] or scanned:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} used a sequential scan: {', '.join(failures)}")
+
+    def hot_queries(self, alias):
+        """(label, queryset or None, tables that must be read through an index)"""
+        customer = Order.objects.using(alias).values_list('customer_id', flat=True).first()
+        vendor = Customer.objects.using(alias).filter(products__isnull=False).values_list('customer_id', flat=True).first()
+        product = Product.objects.using(alias).values('Category', 'ProductType').first()
+        last_week = timezone.now() - timedelta(days=7)
+
+        return [
+            (
+                'Order(customer, order_date)',
+                Order.objects.using(alias).filter(customer_id=customer).order_by('-order_date') if customer else None,
+                [Order._meta.db_table],
+            ),
+            (
+                'Order.order_status',
+                Order.objects.using(alias).filter(order_status='processing'),
+                [Order._meta.db_table],
+            ),
+            (
+                'OrderItem(product__vendor, order__order_date)',
+                OrderItem.objects.using(alias).filter(product__vendor_id=vendor, order__order_date__gte=last_week) if vendor else None,
+                [OrderItem._meta.db_table, Order._meta.db_table],
+            ),
+            (
+                'Product.Category',
+                Product.objects.using(alias).filter(Category=product['Category']) if product else None,
+                [Product._meta.db_table],
+            ),
+            (
+                'Product.ProductType',
+                Product.objects.using(alias).filter(ProductType=product['ProductType']) if product else None,
+                [Product._meta.db_table],
+            ),
+            (
+                'Inventory(quantity_available < reorder_level)',
+                Inventory.objects.using(alias).filter(quantity_available__lt=F('reorder_level')),
+                [Inventory._meta.db_table],
+            ),
+        ]
+
+    @staticmethod
+    def is_seq_scan(vendor, plan, table):
+        if vendor == 'postgresql':
+            return re.search(rf'Seq Scan on "?{table}"?\b', plan) is not None
+        if vendor == 'sqlite':
+            # "SCAN backend_order" is a full scan; "SCAN ... USING (COVERING) INDEX" and "SEARCH" are not
+            return re.search(rf'\bSCAN {table}\b(?! USING)', plan) is not None
+        return 'full scan' in plan.lower()
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from backend import images
+from backend.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate thumbnail/card/detail WebP (and AVIF where Pillow supports it) variants "
+        "with content-hashed filenames for every product image that needs them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are already up to date.')
+        parser.add_argument('--product', action='append', help='Only this product id (repeatable).')
+        parser.add_argument('--no-avif', action='store_true', help='Skip AVIF even if Pillow supports it.')
+        parser.add_argument('--hero', action='store_true',
+                            help='Also rewrite the home page hero renditions in backend/static/images/hero.')
+
+    def handle(self, *args, **options):
+        with_avif = not options['no_avif'] and images.avif_supported()
+        if not options['no_avif'] and not with_avif:
+            self.stdout.write(self.style.WARNING("Pillow has no AVIF support here; generating WebP only."))
+        if options['hero']:
+            written = images.generate_hero_variants(with_avif=with_avif)
+            self.stdout.write(f"Wrote {len(written)} hero rendition(s); commit them and run collectstatic.")
+
+        products = Product.objects.exclude(image='').exclude(image__isnull=True).only('product_id', 'image', 'image_variants')
+        if options['product']:
+            products = products.filter(product_id__in=options['product'])
+
+        generated = failed = 0
+        for product in products.iterator(chunk_size=200):
+            if not options['force'] and not images.variants_outdated(product):
+                continue
+            try:
+                images.generate_variants(product, with_avif=with_avif)
+                generated += 1
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"{product.product_id}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {generated} product(s), {failed} failed."))
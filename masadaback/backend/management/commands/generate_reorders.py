@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend import reorders
+
+
+class Command(BaseCommand):
+    help = (
+        "Scan inventory below its reorder level in one pass and draft a purchase order per cheapest "
+        "supplier. Quantities already on draft or sent purchase orders are not ordered again, so it is "
+        "safe to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the plan without creating purchase orders.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        by_supplier, unsourced = reorders.suggest()
+        planned = time.perf_counter() - start
+        lines = sum(len(rows) for rows in by_supplier.values())
+        self.stdout.write(
+            f"{lines} product(s) to reorder from {len(by_supplier)} supplier(s), "
+            f"{len(unsourced)} low-stock product(s) without a supplier ({planned:.2f}s)"
+        )
+        for product_id in unsourced[:20]:
+            self.stdout.write(f"  no supplier: {product_id}")
+
+        if options['dry_run'] or not by_supplier:
+            return
+        note = f"Reorder run {timezone.now():%Y-%m-%d %H:%M}"
+        orders = reorders.create_drafts(by_supplier, note=note, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Drafted {len(orders)} purchase order(s) in {time.perf_counter() - start:.2f}s."
+        ))
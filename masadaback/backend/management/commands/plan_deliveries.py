@@ -0,0 +1,72 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backend import delivery_planning
+from backend.models import Delivery
+
+
+class Command(BaseCommand):
+    help = (
+        "Batch the day's undelivered orders by area into vehicle-capacity routes (savings heuristic over a "
+        "local distance matrix CSV), assign them to drivers and write driver and transport cost to each "
+        "Delivery. Paid delivery orders with no Delivery yet are booked for the day."
+    )
+
+    def add_arguments(self, parser):
+        defaults = delivery_planning.DEFAULTS
+        parser.add_argument('--distances', required=True,
+                            help='CSV distance matrix in km; header row and first column name the areas and the depot.')
+        parser.add_argument('--date', type=date.fromisoformat, help='Delivery day (YYYY-MM-DD); default tomorrow.')
+        parser.add_argument('--drivers', help='Comma-separated driver names; default everyone who drove in the last 30 days.')
+        parser.add_argument('--capacity', type=int, default=defaults['capacity'], help='Order units per vehicle load.')
+        parser.add_argument('--cost-per-km', type=Decimal, default=defaults['cost_per_km'])
+        parser.add_argument('--cost-per-route', type=Decimal, default=defaults['cost_per_route'])
+        parser.add_argument('--depot', default=defaults['depot'], help='Name of the depot row in the matrix.')
+        parser.add_argument('--dry-run', action='store_true', help='Print the routes without saving them.')
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate() + timedelta(days=1)
+        if options['drivers']:
+            drivers = [name.strip() for name in options['drivers'].split(',') if name.strip()]
+        else:
+            drivers = sorted(set(Delivery.objects
+                                 .filter(delivery_date__gte=timezone.localdate() - timedelta(days=30))
+                                 .exclude(driver_name='').values_list('driver_name', flat=True)))
+        start = time.perf_counter()
+        try:
+            result = delivery_planning.plan(
+                day, delivery_planning.load_distances(options['distances']), drivers,
+                capacity=options['capacity'], cost_per_km=options['cost_per_km'],
+                cost_per_route=options['cost_per_route'], depot=options['depot'],
+            )
+        except (delivery_planning.DistanceMatrixError, ValueError) as exc:
+            raise CommandError(str(exc))
+        routes = result['routes']
+        drops = sum(len(route['drops']) for route in routes)
+        self.stdout.write(
+            f"{day}: {drops} drop(s) in {len(routes)} route(s) for {len(drivers)} driver(s), "
+            f"{sum(route['km'] for route in routes):.1f} km, cost {sum(route['cost'] for route in routes)} "
+            f"({time.perf_counter() - start:.2f}s)"
+        )
+        for route in sorted(routes, key=lambda route: route['driver'])[:50]:
+            areas = list(dict.fromkeys(drop['area'] for drop in route['drops']))
+            self.stdout.write(
+                f"  {route['driver']}: {len(route['drops'])} drop(s), {route['units']} unit(s), "
+                f"{route['km']} km, {route['cost']} via {', '.join(areas)}"
+            )
+        if result['unplanned']:
+            missing = sorted({str(drop['area']) for drop in result['unplanned']})
+            self.stdout.write(self.style.WARNING(
+                f"{len(result['unplanned'])} drop(s) left out, no distances for: {', '.join(missing[:20])}"
+            ))
+
+        if options['dry_run'] or not routes:
+            return
+        updated, created = delivery_planning.save(day, result)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {updated} and booked {created} deliveries in {time.perf_counter() - start:.2f}s."
+        ))
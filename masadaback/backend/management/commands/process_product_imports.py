@@ -0,0 +1,54 @@
+import time
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import catalog_import
+from backend.models import Customer, ProductImport
+
+
+class Command(BaseCommand):
+    help = (
+        "Background worker for vendor catalog imports: processes queued CSV/XLSX uploads oldest first. "
+        "Several workers can run at once. With --file it queues that file for --vendor first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Queue this CSV/XLSX file before processing.')
+        parser.add_argument('--vendor', help='customer_id of the vendor that owns --file.')
+        parser.add_argument('--chunk-size', type=int, default=catalog_import.CHUNK_SIZE, help='Rows per transaction.')
+        parser.add_argument('--poll', type=float, default=0,
+                            help='Keep running and check the queue every POLL seconds (default: exit when empty).')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            self.enqueue(options['file'], options['vendor'])
+
+        while True:
+            job = catalog_import.claim_next()
+            if job is None:
+                if not options['poll']:
+                    return
+                time.sleep(options['poll'])
+                continue
+            start = time.perf_counter()
+            job = catalog_import.run_import(job, chunk_size=options['chunk_size'])
+            style = self.style.SUCCESS if job.status == 'DONE' else self.style.ERROR
+            self.stdout.write(style(
+                f"{job.status} {job.import_id}: {job.rows_total} row(s), {job.rows_created} created, "
+                f"{job.rows_updated} updated, {job.rows_failed} failed in {time.perf_counter() - start:.2f}s"
+            ))
+            for error in job.errors[:10]:
+                self.stdout.write(f"  row {error['row']} ({error['sku']}): {error['errors']}")
+
+    def enqueue(self, path, vendor_id):
+        try:
+            vendor = Customer.objects.get(customer_id=vendor_id)
+        except (Customer.DoesNotExist, ValueError):
+            raise CommandError("--file needs --vendor set to an existing customer_id")
+        path = Path(path)
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist")
+        with path.open('rb') as fh:
+            ProductImport.objects.create(vendor=vendor, file=File(fh, name=path.name))
@@ -0,0 +1,107 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# what a fresh process imports for each target; each snippet prints its own wall time in ms
+TARGETS = {
+    'setup': "import django; django.setup()",
+    'wsgi': "import importlib; importlib.import_module({wsgi!r})",
+    # a worker's first request also loads the URLconf and every view module it references
+    'first-request': "import importlib; importlib.import_module({wsgi!r}); importlib.import_module({urlconf!r})",
+}
+SNIPPET = (
+    "import time; _start = time.perf_counter()\n"
+    "{body}\n"
+    "print(round((time.perf_counter() - _start) * 1000, 1))\n"
+)
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """{module: (self us, cumulative us, depth)} from `python -X importtime` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Import-time breakdown of a cold worker (python -X importtime in a fresh process): "
+        "slowest modules by cumulative time and self time per top-level package."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'target', nargs='?', default='first-request',
+            help=f"One of {', '.join(TARGETS)}, or a dotted module imported after django.setup().",
+        )
+        parser.add_argument('--runs', type=int, default=3, help='Fresh processes to run; medians are reported.')
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument('--prefix', default='', help='Only modules starting with this (e.g. backend).')
+        parser.add_argument('--json', dest='json_path', help='Also write the full breakdown to this file.')
+
+    def handle(self, *args, **options):
+        code = SNIPPET.format(body=self.target_body(options['target']))
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+
+        walls = []
+        samples = {}
+        for _ in range(max(1, options['runs'])):
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', code],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"Import of {options['target']!r} failed:\n{result.stderr[-2000:]}")
+            walls.append(float(result.stdout.strip().splitlines()[-1]))
+            for name, values in parse_importtime(result.stderr).items():
+                samples.setdefault(name, []).append(values)
+
+        modules = {
+            name: {
+                'self_ms': round(statistics.median(v[0] for v in values) / 1000, 2),
+                'cumulative_ms': round(statistics.median(v[1] for v in values) / 1000, 2),
+                'depth': values[0][2],
+            }
+            for name, values in samples.items()
+        }
+        packages = {}
+        for name, row in modules.items():
+            package = name.split('.')[0]
+            packages[package] = round(packages.get(package, 0) + row['self_ms'], 2)
+
+        self.print_report(options, statistics.median(walls), modules, packages)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump({'target': options['target'], 'wall_ms': walls, 'modules': modules, 'packages': packages}, fh, indent=2)
+
+    def target_body(self, target):
+        wsgi = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+        if target in TARGETS:
+            return TARGETS[target].format(wsgi=wsgi, urlconf=settings.ROOT_URLCONF)
+        return f"import django, importlib; django.setup(); importlib.import_module({target!r})"
+
+    def print_report(self, options, wall_ms, modules, packages):
+        self.stdout.write(f"{options['target']}: {wall_ms:.1f} ms wall (median of {options['runs']} fresh processes)")
+
+        rows = sorted(
+            ((name, row) for name, row in modules.items() if name.startswith(options['prefix'])),
+            key=lambda item: item[1]['cumulative_ms'], reverse=True,
+        )
+        self.stdout.write(f"\n{'module':<48} {'cumul ms':>9} {'self ms':>8}")
+        for name, row in rows[:options['top']]:
+            self.stdout.write(f"{'  ' * row['depth'] + name:<48} {row['cumulative_ms']:>9} {row['self_ms']:>8}")
+
+        self.stdout.write(f"\n{'package':<32} {'self ms':>8}")
+        for package, self_ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"{package:<32} {self_ms:>8}")
@@ -0,0 +1,49 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend import profiling
+
+
+class Command(BaseCommand):
+    help = "Dump the per-view request profile collected by ProfilingMiddleware from every worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=getattr(settings, 'PROFILING_DUMP_DIR', None), help='Worker dump directory.')
+        parser.add_argument('--max-age', type=int, default=getattr(settings, 'PROFILING_DUMP_TTL', None),
+                            help='Ignore (and delete) dumps older than this many seconds.')
+        parser.add_argument('--sort', default='total_ms', choices=sorted(profiling.METRICS) + ['requests'])
+        parser.add_argument('--json', action='store_true', help='Print the raw summary as JSON.')
+        parser.add_argument('--reset', action='store_true', help='Delete the dumps after reporting.')
+
+    def handle(self, *args, **options):
+        summaries = {name: profile.summary() for name, profile in profiling.load_profiles(options['dir'], options['max_age']).items()}
+
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+        elif not summaries:
+            self.stdout.write(self.style.WARNING(f"No profiling dumps in {options['dir']} (is PROFILING_ENABLED set?)"))
+        else:
+            self.print_table(summaries, options['sort'])
+
+        if options['reset']:
+            profiling.clear_profiles(options['dir'])
+
+    def print_table(self, summaries, sort):
+        def sort_key(item):
+            row = item[1]
+            return row['requests'] if sort == 'requests' else row[sort]['p95'] * row['requests']
+
+        header = (
+            f"{'view':<32} {'reqs':>7} {'p50 ms':>8} {'p95 ms':>8} {'sql p95':>8} "
+            f"{'tpl p95':>8} {'q mean':>7} {'q p95':>6} {'KB p50':>7}"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in sorted(summaries.items(), key=sort_key, reverse=True):
+            self.stdout.write(
+                f"{name[:32]:<32} {row['requests']:>7} {row['total_ms']['p50']:>8.1f} {row['total_ms']['p95']:>8.1f} "
+                f"{row['sql_ms']['p95']:>8.1f} {row['template_ms']['p95']:>8.1f} {row['queries']['mean']:>7.1f} "
+                f"{row['queries']['p95']:>6} {row['response_bytes']['p50'] / 1024:>7.1f}"
+            )
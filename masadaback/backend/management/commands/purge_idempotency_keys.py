@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from backend import idempotency
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys past their IDEMPOTENCY_TTL_SECONDS. Schedule it hourly or daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Keys deleted per statement.')
+
+    def handle(self, *args, **options):
+        deleted = idempotency.purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency key(s)."))
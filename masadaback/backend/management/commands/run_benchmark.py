@@ -0,0 +1,161 @@
+import json
+import logging
+import time
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import NoReverseMatch, URLResolver, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from backend import frontend_urls, profiling, urls as api_urls
+from backend.models import Customer, Order, Product, Supplier
+from backend.stats import QueryCounter, percentile
+
+# GET requests with side effects on the benchmark session or data
+SKIPPED_URL_NAMES = {'logout', 'resend_code'}
+IDENTITIES = ['anonymous', 'Individual', 'Contractor', 'Retailer', 'Business']
+
+
+def iter_url_patterns(patterns, namespace=None):
+    """Flatten (possibly nested) urlpatterns into (url name, pattern) pairs"""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            nested = ':'.join(filter(None, [namespace, pattern.namespace])) or None
+            yield from iter_url_patterns(pattern.url_patterns, nested)
+        elif pattern.name:
+            yield (f"{namespace}:{pattern.name}" if namespace else pattern.name), pattern
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every URL in backend/frontend_urls.py and backend/urls.py with the "
+        "test client and report p50/p95 latency and SQL query counts per identity. "
+        "Seed the database with seed_benchmark first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--identity', action='append', choices=IDENTITIES, help='Limit to these identities (repeatable).')
+        parser.add_argument('--filter', default='', help='Only URL names containing this substring.')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file.')
+
+    def handle(self, *args, **options):
+        # broken views show up as 5xx rows in the report rather than tracebacks
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        profiling.install_template_timer()
+
+        results = []
+        for identity in options['identity'] or IDENTITIES:
+            customer = None
+            if identity != 'anonymous':
+                customer = Customer.objects.filter(customer_type=identity, user__isnull=False).select_related('user').first()
+                if customer is None:
+                    self.stdout.write(self.style.WARNING(f"No {identity} customer with a login; skipping."))
+                    continue
+
+            for name, url in self.benchmark_urls(customer, options['filter']):
+                results.append(self.measure(name, url, identity, customer, options['iterations'], options['warmup']))
+
+        self.print_table(results)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+
+    def benchmark_urls(self, customer, name_filter):
+        seen = set()
+        patterns = list(iter_url_patterns(frontend_urls.urlpatterns)) + list(iter_url_patterns(api_urls.urlpatterns))
+        for name, pattern in patterns:
+            kwarg_names = set(pattern.pattern.regex.groupindex)
+            # DRF registers a ".json"/".api" twin for each route; the plain route is enough
+            if name in SKIPPED_URL_NAMES or 'format' in kwarg_names or name_filter not in name:
+                continue
+
+            kwargs = self.sample_kwargs(kwarg_names, pattern, customer)
+            if kwargs is None:
+                continue
+            try:
+                url = reverse(name, kwargs=kwargs)
+            except NoReverseMatch:
+                continue
+            if url not in seen:
+                seen.add(url)
+                yield name, url
+
+    def sample_kwargs(self, kwarg_names, pattern, customer):
+        """Fill URL kwargs with real ids from the database, or None if there are none"""
+        user = customer.user if customer else None
+        orders = Order.objects.filter(customer=customer) if customer else Order.objects.all()
+        samples = {
+            'product_id': lambda: Product.objects.values_list('pk', flat=True).first(),
+            'customer_id': lambda: customer.pk if customer else Customer.objects.values_list('pk', flat=True).first(),
+            'order_id': lambda: orders.values_list('pk', flat=True).first(),
+            'order_pk': lambda: orders.values_list('pk', flat=True).first(),
+            'supplier_pk': lambda: Supplier.objects.values_list('pk', flat=True).first(),
+            'uidb64': lambda: urlsafe_base64_encode(force_bytes(user.pk)) if user else None,
+            'token': lambda: default_token_generator.make_token(user) if user else None,
+            'pk': lambda: self.viewset_sample_pk(pattern),
+        }
+
+        kwargs = {}
+        for kwarg in kwarg_names:
+            value = samples[kwarg]() if kwarg in samples else None
+            if value is None:
+                return None
+            kwargs[kwarg] = str(value)
+        return kwargs
+
+    @staticmethod
+    def viewset_sample_pk(pattern):
+        viewset = getattr(pattern.callback, 'cls', None)
+        queryset = getattr(viewset, 'queryset', None)
+        if queryset is None:
+            return None
+        return queryset.model.objects.values_list('pk', flat=True).first()
+
+    def measure(self, name, url, identity, customer, iterations, warmup):
+        client = Client(raise_request_exception=False)
+        if customer:
+            client.force_login(customer.user)
+
+        timings = []
+        template_timings = []
+        query_counts = []
+        status = None
+        for i in range(warmup + iterations):
+            counter = QueryCounter()
+            template_timer = profiling.start_template_timer()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = client.get(url)
+                elapsed = (time.perf_counter() - start) * 1000
+            template_ms = profiling.stop_template_timer(template_timer) * 1000
+            status = response.status_code
+            if i >= warmup:
+                timings.append(elapsed)
+                template_timings.append(template_ms)
+                query_counts.append(counter.count)
+
+        return {
+            'name': name,
+            'url': url,
+            'identity': identity,
+            'status': status,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'template_p50_ms': round(percentile(template_timings, 50), 2),
+            'queries': max(query_counts, default=0),
+        }
+
+    def print_table(self, results):
+        header = f"{'URL name':<28} {'identity':<11} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'tpl p50':>8} {'queries':>8}  url"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in results:
+            self.stdout.write(
+                f"{row['name']:<28} {row['identity']:<11} {row['status']:>6} "
+                f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['template_p50_ms']:>8.2f} {row['queries']:>8}  {row['url']}"
+            )
@@ -0,0 +1,280 @@
+import itertools
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from backend import order_summary, supplier_catalog
+from backend.models import (
+    Customer, Delivery, Inventory, InventoryLog, Order, OrderItem, Product, ProductSupplier, Supplier,
+)
+
+BENCH_EMAIL_DOMAIN = 'bench.masada.test'
+
+CUSTOMER_TYPES = [('Individual', 60), ('Contractor', 25), ('Retailer', 15)]
+PRODUCT_TYPES = ['Hardwood', 'Softwood', 'Plywood', 'Lumber', 'MDF', 'Veneer', 'Timber Poles']
+CATEGORIES = ['Construction', 'Furniture', 'Flooring', 'Roofing', 'Decking', 'Joinery', 'Fencing', 'Panels']
+SPECIES = ['Mninga', 'Mvule', 'Pine', 'Cypress', 'Teak', 'Mahogany', 'Eucalyptus', 'Cedar', 'Oak', 'Meranti']
+GRADES = [('Standard', 60), ('Premium', 25), ('Economy', 15)]
+DIMENSIONS = ['2x4x12', '2x6x12', '1x8x10', '4x4x10', '8x4 sheet', '12mm sheet', '18mm sheet', '3x9x14']
+LOCATIONS = ['Dar es Salaam', 'Arusha', 'Mwanza', 'Dodoma', 'Mbeya', 'Morogoro', 'Tanga', 'Moshi', 'Iringa']
+DRIVERS = ['Juma', 'Neema', 'Baraka', 'Amani', 'Rehema', 'Salim', 'Zawadi', 'Hassan']
+LOG_ACTIONS = [('IN', 45), ('OUT', 40), ('DAMAGED', 5), ('RESERVED', 6), ('RELEASED', 4)]
+
+
+@contextmanager
+def backdated(model, field_name):
+    """Let bulk_create keep explicit values for an auto_now_add field"""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (customers, vendors, products, suppliers, orders, "
+        "order items, deliveries, inventory and inventory logs) for benchmarking. "
+        "Runs deterministically for a given --seed; load it into an empty database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=2000)
+        parser.add_argument('--vendors', type=int, default=50)
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--suppliers', type=int, default=40)
+        parser.add_argument('--supplier-offers', type=int, default=3, help='Maximum suppliers per product.')
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--max-items', type=int, default=8, help='Maximum order lines per order.')
+        parser.add_argument('--logs', type=int, default=20000, help='Inventory log rows.')
+        parser.add_argument('--days', type=int, default=365, help='Spread order history over this many days.')
+        parser.add_argument('--users-per-type', type=int, default=3, help='Login-capable users per customer type.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        # bulk_create bypasses the OrderItem/InventoryLog signals, so stock is seeded directly
+        with transaction.atomic():
+            vendors = self.create_customers(options['vendors'], [('Business', 1)], 'vendor', options['users_per_type'])
+            customers = self.create_customers(options['customers'], CUSTOMER_TYPES, 'customer', options['users_per_type'])
+            products = self.create_products(options['products'], vendors)
+            self.create_inventory(products)
+            self.create_suppliers(options['suppliers'], products, options['supplier_offers'])
+            orders = self.create_orders(options['orders'], customers + vendors, options['days'])
+            self.create_order_items(orders, products, options['max_items'])
+            order_summary.recalculate()  # bulk_create skipped the item signals that keep it current
+            self.create_deliveries(orders)
+            self.create_inventory_logs(options['logs'], products, vendors, options['days'])
+
+        self.stdout.write(self.style.SUCCESS("Benchmark dataset ready."))
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def weighted(self, choices, k=1):
+        values, weights = zip(*choices)
+        return self.rng.choices(values, weights=weights, k=k)
+
+    def popularity(self, n):
+        """Long-tailed (Pareto) weights so a few rows get most of the traffic"""
+        return [self.rng.paretovariate(1.2) for _ in range(n)]
+
+    def report(self, label, count):
+        self.stdout.write(f"  {label:<16} {count:>9,}")
+
+    def create_customers(self, count, types, prefix, users_per_type):
+        customer_types = self.weighted(types, k=count)
+        customers = [
+            Customer(
+                customer_id=self.uuid(),
+                fullname=f"{prefix.title()} {i:06d}",
+                email=f"{prefix}{i:06d}@{BENCH_EMAIL_DOMAIN}",
+                customer_type=customer_types[i],
+                location=self.rng.choice(LOCATIONS),
+                is_verified=True,
+            )
+            for i in range(count)
+        ]
+
+        # a few customers of each type get a User so the benchmark can log in as them
+        seen = {}
+        users = []
+        for customer in customers:
+            if seen.get(customer.customer_type, 0) < users_per_type:
+                seen[customer.customer_type] = seen.get(customer.customer_type, 0) + 1
+                user = User(username=customer.email, email=customer.email, first_name=customer.fullname.split(' ')[0])
+                user.set_unusable_password()
+                users.append((customer, user))
+        # PostgreSQL and SQLite both return primary keys from bulk_create
+        User.objects.bulk_create([user for _, user in users], batch_size=self.batch_size)
+        for customer, user in users:
+            customer.user = user
+
+        Customer.objects.bulk_create(customers, batch_size=self.batch_size)
+        self.report(f"{prefix}s", count)
+        return customers
+
+    def create_products(self, count, vendors):
+        vendor_for = self.rng.choices(vendors, weights=self.popularity(len(vendors)), k=count)
+        products = []
+        for i in range(count):
+            product_type = self.rng.choice(PRODUCT_TYPES)
+            products.append(Product(
+                product_id=self.uuid(),
+                ProductName=f"{self.rng.choice(SPECIES)} {product_type} #{i:06d}",
+                Price_per_unit=Decimal(str(round(self.rng.lognormvariate(3.5, 0.8), 2))),
+                grade=self.weighted(GRADES)[0],
+                ProductType=product_type,
+                Category=self.rng.choice(CATEGORIES),
+                Dimensions=self.rng.choice(DIMENSIONS),
+                stock_quantity=0,
+                description=f"Synthetic benchmark product {i}",
+                vendor=vendor_for[i],
+            ))
+        Product.objects.bulk_create(products, batch_size=self.batch_size)
+        self.report('products', count)
+        return products
+
+    def create_inventory(self, products):
+        inventory = []
+        for product in products:
+            reorder_level = self.rng.choice([5, 10, 10, 20, 50])
+            # roughly one SKU in ten sits below its reorder level
+            if self.rng.random() < 0.1:
+                available = self.rng.randint(0, reorder_level - 1)
+            else:
+                available = self.rng.randint(reorder_level, reorder_level * 40)
+            inventory.append(Inventory(
+                product=product,
+                quantity_available=available,
+                quantity_reserved=self.rng.choice([0, 0, 0, self.rng.randint(1, 10)]),
+                reorder_level=reorder_level,
+                reorder_quantity=reorder_level * 2,
+                uom=self.rng.choice(['pcs', 'planks', 'm3', 'bundles']),
+                warehouse_location=f"Aisle {self.rng.randint(1, 30)}",
+            ))
+        Inventory.objects.bulk_create(inventory, batch_size=self.batch_size)
+        self.report('inventory', len(inventory))
+
+    def create_suppliers(self, count, products, max_offers):
+        suppliers = [
+            Supplier(
+                supplier_id=self.uuid(),
+                name=f"{self.rng.choice(SPECIES)} Timber Supply {i:03d}",
+                contacts=f"+255 7{self.rng.randint(10000000, 99999999)}",
+                email=f"supplier{i}@{BENCH_EMAIL_DOMAIN}",
+                address=self.rng.choice(LOCATIONS),
+            )
+            for i in range(count)
+        ]
+        Supplier.objects.bulk_create(suppliers, batch_size=self.batch_size)
+        self.report('suppliers', count)
+        if not suppliers:
+            return
+
+        offers = []
+        for product in products:
+            # about one product in twenty has no supplier on file at all
+            k = 0 if self.rng.random() < 0.05 else self.rng.randint(1, min(max(max_offers, 1), count))
+            for supplier in self.rng.sample(suppliers, k):
+                discount = Decimal(str(round(self.rng.uniform(0.45, 0.8), 2)))
+                offers.append(ProductSupplier(
+                    product=product, supplier=supplier,
+                    supply_price=(product.Price_per_unit * discount).quantize(Decimal('0.01')),
+                ))
+        ProductSupplier.objects.bulk_create(offers, batch_size=self.batch_size)
+        self.report('supplier offers', len(offers))
+        supplier_catalog.refresh()  # bulk_create skipped the offer signals that keep it current
+
+    def create_orders(self, count, customers, days):
+        buyer_for = self.rng.choices(customers, weights=self.popularity(len(customers)), k=count)
+        orders = []
+        for i in range(count):
+            # order volume grows towards the present
+            age = timedelta(days=days * (1 - self.rng.random() ** 0.7), seconds=self.rng.randint(0, 86399))
+            order_date = self.now - age
+            recent = age < timedelta(days=7)
+            delivery_option = self.weighted([('delivery', 65), ('pickup', 35)])[0]
+            orders.append(Order(
+                order_id=self.uuid(),
+                customer=buyer_for[i],
+                delivery_option=delivery_option,
+                payment_status=self.weighted([('paid', 85), ('pending', 12), ('failed', 3)])[0],
+                order_status='processing' if recent and self.rng.random() < 0.8 else self.weighted([('delivered', 90), ('processing', 6), ('cancelled', 4)])[0],
+                order_date=order_date,
+                description=f"Benchmark order {i}",
+            ))
+
+        with backdated(Order, 'order_date'):
+            Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        self.report('orders', count)
+        return orders
+
+    def create_order_items(self, orders, products, max_items):
+        # cumulative weights once, not on every choices() call
+        cum_weights = list(itertools.accumulate(self.popularity(len(products))))
+        items = []
+        created = 0
+        for order in orders:
+            lines = min(max_items, 1 + int(self.rng.expovariate(0.6)))
+            bulk_buyer = order.customer.customer_type in ('Contractor', 'Retailer', 'Business')
+            for product in set(self.rng.choices(products, cum_weights=cum_weights, k=lines)):
+                quantity = self.rng.randint(10, 200) if bulk_buyer else self.rng.randint(1, 12)
+                items.append(OrderItem(
+                    order=order,
+                    product=product,
+                    quantity=quantity,
+                    unit_price=product.Price_per_unit,
+                    subtotal=product.Price_per_unit * quantity,
+                ))
+            if len(items) >= self.batch_size:
+                OrderItem.objects.bulk_create(items)
+                created += len(items)
+                items = []
+        OrderItem.objects.bulk_create(items)
+        self.report('order items', created + len(items))
+
+    def create_deliveries(self, orders):
+        deliveries = [
+            Delivery(
+                order=order,
+                delivery_date=(self.now + timedelta(days=self.rng.randint(-3, 5))).date(),
+                delivery_address=f"Plot {self.rng.randint(1, 999)}, {order.customer.location}",
+                driver_name=self.rng.choice(DRIVERS),
+                transport_cost=Decimal(self.rng.randint(10, 150)),
+                delivery_status='delivered' if order.order_status == 'delivered' else 'scheduled',
+            )
+            for order in orders if order.delivery_option == 'delivery'
+        ]
+        Delivery.objects.bulk_create(deliveries, batch_size=self.batch_size)
+        self.report('deliveries', len(deliveries))
+
+    def create_inventory_logs(self, count, products, vendors, days):
+        actions = self.weighted(LOG_ACTIONS, k=count)
+        logs = []
+        for i in range(count):
+            product = self.rng.choice(products)
+            logs.append(InventoryLog(
+                product=product,
+                action=actions[i],
+                quantity=self.rng.randint(1, 100),
+                note='Benchmark adjustment',
+                updated_by=product.vendor,
+                timestamp=self.now - timedelta(days=self.rng.uniform(0, days)),
+            ))
+
+        with backdated(InventoryLog, 'timestamp'):
+            InventoryLog.objects.bulk_create(logs, batch_size=self.batch_size)
+        self.report('inventory logs', count)
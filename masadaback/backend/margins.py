@@ -0,0 +1,167 @@
+# Margin reporting: revenue, cost and margin per product, category, vendor and month
+#
+# A month is one grouped query over its order lines (order_date range on order_date_idx, cancelled orders
+# left out) giving units and revenue per product; labels and prices are then read per product, not joined
+# per line, and category, vendor and total rows are rolled up from the product rows in Python, so the
+# lines are scanned once whatever the grouping. The result is stored as a MarginReport and read
+# back by index. Reads never compute: reports are built by `manage.py build_margin_reports`, and a
+# current-month report older than MARGIN_REPORT_TTL_SECONDS is still served, with its computed_at, as stale.
+#
+# Cost is quantity x the product's cheapest supplier price (CheapestSupplier); the unit cost paid at the
+# time isn't recorded. Revenue from products with no supplier price is reported but left out of the margin.
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import MarginReport, MarginReportRow, OrderItem, Product
+
+GROUPINGS = [grouping for grouping, _ in MarginReportRow.GROUPING_CHOICES]
+MEASURES = ('lines', 'units', 'revenue', 'costed_revenue', 'cost')
+MAX_MONTHS = 36
+CHUNK = 2000  # products per label/price lookup
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def previous_month(month):
+    return date(month.year - (month.month == 1), (month.month - 2) % 12 + 1, 1)
+
+
+def months_back(month, count):
+    """The count months ending with month, oldest first"""
+    months = [month]
+    while len(months) < count:
+        months.insert(0, previous_month(months[0]))
+    return months
+
+
+def _bounds(month):
+    since = timezone.make_aware(datetime.combine(month, time.min))
+    return since, timezone.make_aware(datetime.combine(next_month(month), time.min))
+
+
+def product_rows(month, chunk=CHUNK):
+    """One dict per product sold in month: ids, labels and MEASURES"""
+    since, until = _bounds(month)
+    sold = {row['product_id']: row for row in OrderItem.objects
+            # a plain range (not __date) so order_date_idx serves it
+            .filter(order__order_date__gte=since, order__order_date__lt=until)
+            .exclude(order__order_status='cancelled')
+            .values('product_id')
+            .annotate(lines=Count('pk'), units=Sum('quantity'), revenue=Sum('subtotal'))
+            .order_by()
+            .iterator(chunk_size=chunk)}
+    # one price per product, so cost is units x price: labels and prices per product, not joined per line
+    product_ids = list(sold)
+    for start in range(0, len(product_ids), chunk):
+        for product in (Product.objects.filter(product_id__in=product_ids[start:start + chunk])
+                        .values('product_id', 'ProductName', 'Category', 'vendor_id', 'vendor__fullname',
+                                'cheapest_supplier__supply_price')):
+            row = sold[product['product_id']]
+            price = product['cheapest_supplier__supply_price']
+            yield {**row, **product, 'costed_revenue': row['revenue'] if price is not None else 0,
+                   'cost': row['units'] * price if price is not None else 0}
+
+
+def rollup(rows):
+    """MarginReportRow field dicts for every grouping, from product_rows"""
+    groups = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+    for row in rows:
+        vendor = row['vendor_id']
+        keys = [
+            ('total', 'all', 'All products', None),
+            ('product', str(row['product_id']), row['ProductName'], vendor),
+            ('category', row['Category'], row['Category'], None),
+        ]
+        if vendor is not None:
+            keys.append(('vendor', str(vendor), row['vendor__fullname'], vendor))
+        for key in keys:
+            totals = groups[key]
+            for measure in MEASURES:
+                totals[measure] += row[measure] or 0
+    return [
+        {'grouping': grouping, 'key': key, 'label': label, 'vendor_id': vendor,
+         **totals, 'margin': Decimal(totals['costed_revenue']) - Decimal(totals['cost'])}
+        for (grouping, key, label, vendor), totals in groups.items()
+    ]
+
+
+def build(month, batch_size=2000):
+    """Compute month's report and store it in place of any older one"""
+    month = month_start(month)
+    computed_at = timezone.now()
+    rows = rollup(product_rows(month))
+    try:
+        with transaction.atomic():
+            MarginReport.objects.filter(month=month).delete()
+            report = MarginReport.objects.create(month=month, computed_at=computed_at)
+            MarginReportRow.objects.bulk_create([MarginReportRow(report=report, **row) for row in rows],
+                                                batch_size=batch_size)
+    except IntegrityError:
+        # another worker stored the same month meanwhile; theirs is as fresh as ours
+        report = MarginReport.objects.get(month=month)
+    return report
+
+
+def is_fresh(report, now=None):
+    now = now or timezone.now()
+    _, until = _bounds(report.month)
+    if report.computed_at >= until:
+        return True
+    return (now - report.computed_at).total_seconds() < getattr(settings, 'MARGIN_REPORT_TTL_SECONDS', 15 * 60)
+
+
+def get(month):
+    """month's report as last built, however old; None until build_margin_reports has covered the month"""
+    return MarginReport.objects.filter(month=month_start(month)).first()
+
+
+def rows(report, grouping, vendor=None, limit=None):
+    """report's rows for grouping, best margin first; vendor narrows product and vendor rows to one vendor"""
+    if report is None:
+        return MarginReportRow.objects.none()
+    queryset = report.rows.filter(grouping=grouping).order_by('-margin', 'key')
+    if vendor is not None:
+        queryset = queryset.filter(vendor=vendor)
+    return queryset[:limit] if limit else queryset
+
+
+def as_dict(row):
+    revenue = row.costed_revenue
+    return {
+        'key': row.key, 'label': row.label, 'lines': row.lines, 'units': row.units,
+        'revenue': row.revenue, 'cost': row.cost, 'margin': row.margin,
+        'margin_pct': round(row.margin / revenue * 100, 1) if revenue else None,
+        'uncosted_revenue': row.revenue - row.costed_revenue,
+    }
+
+
+def trend(month, count, vendor=None):
+    """[{'month', 'computed_at', **as_dict}] of the total (or one vendor's) row for the count months ending with month
+
+    Two queries whatever count is: the stored reports, then their one row each. Months never built have
+    computed_at None and no figures.
+    """
+    months = months_back(month_start(month), count)
+    reports = {report.month: report for report in MarginReport.objects.filter(month__in=months)}
+    lines = MarginReportRow.objects.filter(report_id__in=[report.pk for report in reports.values()])
+    lines = lines.filter(grouping='vendor', vendor=vendor) if vendor is not None else lines.filter(grouping='total')
+    by_report = {row.report_id: row for row in lines}
+    result = []
+    for start in months:
+        report = reports.get(start)
+        row = by_report.get(report.pk) if report else None
+        result.append({'month': f"{start:%Y-%m}", 'computed_at': report.computed_at if report else None,
+                       **(as_dict(row) if row else {})})
+    return result
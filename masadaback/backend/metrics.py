@@ -0,0 +1,153 @@
+# Prometheus text-format metrics without external services; multi-worker via per-process JSON dumps
+import atexit
+import threading
+import time
+
+from . import dumps
+from .stats import LATENCY_BUCKETS_MS, Histogram
+
+REQUEST_BUCKETS_SECONDS = tuple(bound / 1000 for bound in LATENCY_BUCKETS_MS)
+
+# name -> (type, help)
+METRICS = {
+    'masada_http_request_duration_seconds': ('histogram', 'Request latency per resolved view.'),
+    'masada_http_requests_total': ('counter', 'Requests per resolved view and status class.'),
+    'masada_db_queries_total': ('counter', 'SQL statements executed per resolved view.'),
+    'masada_inventory_signal_total': ('counter', 'Inventory signal invocations by receiver and InventoryLog action.'),
+    'masada_inventory_units_total': ('counter', 'Stock units moved by inventory signals, by InventoryLog action.'),
+    'masada_orders_created_total': ('counter', 'Orders created (checkout rate).'),
+    'masada_order_items_created_total': ('counter', 'Order lines created.'),
+    'masada_cart_operations_total': ('counter', 'Session cart operations.'),
+    'masada_reservations_total': ('counter', 'Stock reservation lines by outcome (held, committed, released, expired).'),
+    'masada_session_operations_total': ('counter', 'Session logins and logouts.'),
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """Per-process counters and histograms; values are cumulative so dumps from all workers can be summed"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = time.monotonic()
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=REQUEST_BUCKETS_SECONDS, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, dict(labels), h.to_dict()] for (name, labels), h in self.histograms.items()],
+            }
+
+    def merge_dict(self, data):
+        for name, labels, value in data['counters']:
+            self.inc(name, value, **labels)
+        for name, labels, values in data['histograms']:
+            key = _key(name, labels)
+            other = Histogram.from_dict(values)
+            with self.lock:
+                if key in self.histograms:
+                    self.histograms[key].merge(other)
+                else:
+                    self.histograms[key] = other
+
+    def maybe_flush(self, dump_dir, interval):
+        if dump_dir and time.monotonic() - self.last_flush >= interval:
+            self.flush(dump_dir)
+
+    def flush(self, dump_dir):
+        self.last_flush = time.monotonic()
+        data = self.to_dict()
+        if not data['histograms'] and not any(value for _, _, value in data['counters']):
+            return
+        dumps.write(dump_dir, 'metrics', data)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+
+        lines = []
+        for metric, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            if metric_type == 'counter':
+                for (name, labels), value in counters:
+                    if name == metric:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+            else:
+                for (name, labels), histogram in histograms:
+                    if name != metric:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+registry = MetricsRegistry()
+
+
+def inc(name, amount=1, **labels):
+    registry.inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+def collect(dump_dir, max_age=None):
+    """Registry with every live worker's numbers; this process is flushed first so its own are current"""
+    if not dump_dir:
+        return registry
+    registry.flush(dump_dir)
+    merged = MetricsRegistry()
+    for data in dumps.read(dump_dir, 'metrics', max_age):
+        try:
+            merged.merge_dict(data)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return merged
+
+
+_exit_hook_installed = False
+
+
+def install_exit_hook(dump_dir):
+    """Drop this server process's dump when it exits, so a stopped worker stops counting"""
+    global _exit_hook_installed
+    if dump_dir and not _exit_hook_installed:
+        atexit.register(dumps.remove, dump_dir, 'metrics')
+        _exit_hook_installed = True
@@ -0,0 +1,96 @@
+# Middleware for WoodHop Website
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import db_routers, metrics, profiling
+from .stats import QueryCounter
+
+
+class ProfilingMiddleware:
+    """Opt-in (PROFILING_ENABLED) per-view SQL count/time, total time, template time and response size"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.dump_dir = getattr(settings, 'PROFILING_DUMP_DIR', None)
+        self.flush_interval = getattr(settings, 'PROFILING_FLUSH_INTERVAL', 10)
+        profiling.install_template_timer()
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        template_timer = profiling.start_template_timer()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+        finally:
+            template_seconds = profiling.stop_template_timer(template_timer)
+        total_seconds = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        profiling.registry.record(
+            match.view_name if match else '<unresolved>',
+            total_ms=total_seconds * 1000,
+            sql_ms=counter.duration * 1000,
+            template_ms=template_seconds * 1000,
+            queries=counter.count,
+            response_bytes=0 if response.streaming else len(response.content),
+        )
+        profiling.registry.maybe_flush(self.dump_dir, self.flush_interval)
+        return response
+
+
+class MetricsMiddleware:
+    """Per-view request latency, status and SQL query counters for the /metrics endpoint"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.dump_dir = getattr(settings, 'METRICS_DUMP_DIR', None)
+        self.flush_interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        # only processes that serve requests dump metrics, so only they have a dump to clean up
+        metrics.install_exit_hook(self.dump_dir)
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        metrics.observe('masada_http_request_duration_seconds', elapsed, view=view)
+        metrics.inc('masada_http_requests_total', view=view, status=f"{response.status_code // 100}xx")
+        metrics.inc('masada_db_queries_total', counter.count, view=view)
+        metrics.registry.maybe_flush(self.dump_dir, self.flush_interval)
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Pin reads to primary for unsafe requests and, via a short-lived cookie, for the requests right after a write"""
+
+    def __init__(self, get_response):
+        if db_routers.replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+
+    def __call__(self, request):
+        unsafe = request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+        with db_routers.pin_scope(pinned=unsafe or db_routers.PIN_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        if state['wrote']:
+            # covers the redirect/reload that follows a write for longer than replication usually lags
+            response.set_cookie(db_routers.PIN_COOKIE, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:13
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_product_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('reservation_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('HELD', 'Held for payment'), ('COMMITTED', 'Committed (paid)'), ('RELEASED', 'Released (payment failed / cancelled)'), ('EXPIRED', 'Expired (abandoned)')], default='HELD', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='backend.inventory')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='backend.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='backend.product')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'HELD')), fields=['expires_at'], name='reservation_held_expiry_idx'), models.Index(fields=['order', 'status'], name='reservation_order_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_summaries(apps, schema_editor):
+    Order = apps.get_model('backend', 'Order')
+    OrderItem = apps.get_model('backend', 'OrderItem')
+
+    def aggregate(expression, output_field):
+        items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+        return Coalesce(Subquery(items.annotate(value=expression).values('value')), Value(0), output_field=output_field)
+
+    # one UPDATE for every order, computed in the database
+    Order.objects.update(
+        total_amount=aggregate(Sum('subtotal'), models.DecimalField(max_digits=12, decimal_places=2)),
+        line_count=aggregate(Count('pk'), models.IntegerField()),
+        total_quantity=aggregate(Sum('quantity'), models.IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_order_summaries, migrations.RunPython.noop),
+    ]
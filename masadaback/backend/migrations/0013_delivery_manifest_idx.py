@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_order_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='delivery',
+            index=models.Index(fields=['delivery_date', 'driver_name', 'delivery_status'], name='delivery_manifest_idx'),
+        ),
+    ]
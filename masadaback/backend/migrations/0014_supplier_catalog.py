@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+
+def backfill_cheapest_suppliers(apps, schema_editor):
+    """Rank every offer once: the first per product by (supply_price, supplier_id) is its cheapest"""
+    ProductSupplier = apps.get_model('backend', 'ProductSupplier')
+    CheapestSupplier = apps.get_model('backend', 'CheapestSupplier')
+    ranked = ProductSupplier.objects.annotate(
+        rank=Window(RowNumber(), partition_by=[F('product_id')], order_by=[F('supply_price').asc(), F('supplier_id').asc()]),
+        quotes=Window(Count('pk'), partition_by=[F('product_id')]),
+    ).filter(rank=1).values_list('product_id', 'supplier_id', 'supply_price', 'quotes')
+    CheapestSupplier.objects.bulk_create(
+        (CheapestSupplier(product_id=product_id, supplier_id=supplier_id, supply_price=price, offers=quotes)
+         for product_id, supplier_id, price, quotes in ranked.iterator(chunk_size=5000)),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_delivery_manifest_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productsupplier',
+            name='supply_date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.CreateModel(
+            name='CheapestSupplier',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cheapest_supplier', serialize=False, to='backend.product')),
+                ('supply_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('offers', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='cheapest_for', to='backend.supplier')),
+            ],
+        ),
+        migrations.RunPython(backfill_cheapest_suppliers, migrations.RunPython.noop),
+    ]
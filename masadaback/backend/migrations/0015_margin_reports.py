@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0014_supplier_catalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarginReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarginReportRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grouping', models.CharField(choices=[('total', 'Total'), ('product', 'Product'), ('category', 'Category'), ('vendor', 'Vendor')], max_length=20)),
+                ('key', models.CharField(max_length=120)),
+                ('label', models.CharField(max_length=255)),
+                ('lines', models.PositiveIntegerField()),
+                ('units', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('costed_revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('margin', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='backend.marginreport')),
+                ('vendor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='backend.customer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['report', 'grouping', '-margin'], name='marginrow_grouping_idx'), models.Index(fields=['report', 'vendor', 'grouping'], name='marginrow_vendor_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,8 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 from django.contrib.auth.models import User
 
@@ -36,6 +40,20 @@ class Product(models.Model):
     stock_quantity = models.PositiveIntegerField(max_length=0)
     description = models.TextField(max_length=250)
     vendor = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='products', null=True, blank=True)
+    image = models.ImageField(upload_to='products/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True) # filled by backend.images.generate_variants
+    vendor_sku = models.CharField(max_length=64, blank=True, default='') # the vendor's own code, the catalog import key
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['Category'], name='product_category_idx'),
+            models.Index(fields=['ProductType'], name='product_type_idx'),
+        ]
+        constraints = [
+            # also the lookup index for catalog upserts; products added by hand have no SKU
+            models.UniqueConstraint(fields=['vendor', 'vendor_sku'], condition=~models.Q(vendor_sku=''),
+                                    name='product_vendor_sku_uniq'),
+        ]
     
     def __str__(self):
         return self.ProductName
@@ -60,6 +78,22 @@ class Order(models.Model):
     order_status = models.CharField(max_length=50) #processing / delivered
     order_id = models.UUIDField(primary_key=True, editable=False)
     description = models.TextField(max_length=120)
+    # summary of the order's items, kept current by backend.order_summary so lists never aggregate per order
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    line_count = models.PositiveIntegerField(default=0, editable=False)
+    total_quantity = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # customer order history / dashboards: filter by customer, newest first; order_id breaks
+            # ties so keyset pages (backend.order_history) seek straight to the cursor
+            models.Index(fields=['customer', '-order_date', '-order_id'], name='order_customer_keyset_idx'),
+            models.Index(fields=['customer', 'order_status', '-order_date', '-order_id'], name='order_customer_status_idx'),
+            models.Index(fields=['customer', 'payment_status', '-order_date', '-order_id'], name='order_customer_payment_idx'),
+            # staff-wide API lists filtered by status
+            models.Index(fields=['order_status', '-order_date', '-order_id'], name='order_status_keyset_idx'),
+            models.Index(fields=['order_date'], name='order_date_idx'),
+        ]
 
     def __str__(self):
         return (f"Order #{self.OrderId}")
@@ -71,6 +105,12 @@ class OrderItem(models.Model):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     subtotal = models.DecimalField(max_digits=12, decimal_places=2)
     
+    class Meta:
+        indexes = [
+            # vendor sales: join product -> order and sum subtotal without touching the heap
+            models.Index(fields=['product', 'order'], include=['subtotal', 'quantity'], name='orderitem_product_order_idx'),
+        ]
+    
     def __str__(self):
         return (f"{self.product} X {self.quantity}")
       
@@ -85,6 +125,17 @@ class Inventory(models.Model):
     warehouse_location = models.CharField(max_length=255, blank=True)
     last_updated = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # low stock lookups only need the (small) set of rows below their reorder level
+            models.Index(
+                fields=['product'],
+                include=['quantity_available', 'reorder_level'],
+                condition=models.Q(quantity_available__lt=models.F('reorder_level')),
+                name='inventory_low_stock_idx',
+            ),
+        ]
+    
     def __str__(self):
         return (f"Inventory for {self.product.ProductName}")
     
@@ -110,6 +161,35 @@ class InventoryLog(models.Model):
     
     def __str__(self):
         return (f"{self.action} - {self.product.ProductName} ({self.quantity})")
+
+class StockReservation(models.Model):
+    """Units moved from available to reserved for a pending order until payment commits or releases them"""
+    STATUS_CHOICES = (
+        ('HELD', 'Held for payment'),
+        ('COMMITTED', 'Committed (paid)'),
+        ('RELEASED', 'Released (payment failed / cancelled)'),
+        ('EXPIRED', 'Expired (abandoned)'),
+    )
+    
+    reservation_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='HELD')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    closed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # the sweeper only ever looks at live holds, oldest deadline first
+            models.Index(fields=['expires_at'], condition=models.Q(status='HELD'), name='reservation_held_expiry_idx'),
+            models.Index(fields=['order', 'status'], name='reservation_order_status_idx'),
+        ]
+    
+    def __str__(self):
+        return (f"{self.status} {self.quantity} x {self.product_id} for order {self.order_id}")
         
 class Delivery(models.Model):
     order = models.OneToOneField(Order, on_delete=models.CASCADE)
@@ -119,6 +199,12 @@ class Delivery(models.Model):
     transport_cost = models.DecimalField(max_digits=10, decimal_places=2)
     delivery_status = models.CharField(max_length=50)
     
+    class Meta:
+        indexes = [
+            # a driver's stops for the day (backend.delivery_status.manifest)
+            models.Index(fields=['delivery_date', 'driver_name', 'delivery_status'], name='delivery_manifest_idx'),
+        ]
+    
     def __str__(self):
         return (f"Delivery for order #{self.order.OrderId}")
     
@@ -136,12 +222,142 @@ class ProductSupplier(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE)
     supply_price = models.DecimalField(max_digits=10, decimal_places=2)
-    supply_date = models.DateField
+    supply_date = models.DateField(default=timezone.localdate)  # when supply_price was last quoted
     
     class Meta:
         unique_together = ('product', 'supplier')
+        indexes = [
+            # cheapest supplier per product is the first entry of this index
+            models.Index(fields=['product', 'supply_price'], name='productsupplier_price_idx'),
+        ]
         
     def __str__(self):
         return (f"{self.product} from {self.supplier}")
+
+class CheapestSupplier(models.Model):
+    """The cheapest ProductSupplier offer per product, kept current by backend.supplier_catalog"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='cheapest_supplier')
+    # not CASCADE: deleting a supplier deletes its offers, and the supplier's post_delete refresh already
+    # replaces these rows with the next cheapest supplier (a cascade here could delete the replacements)
+    supplier = models.ForeignKey(Supplier, on_delete=models.DO_NOTHING, related_name='cheapest_for')
+    supply_price = models.DecimalField(max_digits=10, decimal_places=2)
+    offers = models.PositiveIntegerField(default=1)  # suppliers quoting this product
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return (f"{self.product_id} cheapest from {self.supplier_id} at {self.supply_price}")
+
+class PurchaseOrder(models.Model):
+    """Stock ordered from a supplier; the reorder engine drafts these, staff send and receive them"""
+    STATUS_CHOICES = (
+        ('DRAFT', 'Draft'),
+        ('SENT', 'Sent to supplier'),
+        ('RECEIVED', 'Received'),
+        ('CANCELLED', 'Cancelled'),
+    )
+    
+    purchase_order_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='purchase_orders')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='DRAFT')
+    total_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    note = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
     
-    
\ No newline at end of file
+    class Meta:
+        indexes = [
+            models.Index(fields=['supplier', 'status'], name='purchaseorder_supplier_idx'),
+        ]
+    
+    def __str__(self):
+        return (f"{self.status} PO {self.purchase_order_id} for {self.supplier}")
+    
+class PurchaseOrderLine(models.Model):
+    purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='lines')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='purchase_order_lines')
+    quantity = models.PositiveIntegerField()
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2)
+    
+    def __str__(self):
+        return (f"{self.product_id} X {self.quantity}")
+
+class ProductImport(models.Model):
+    """A vendor catalog file (CSV/XLSX) queued for the process_product_imports worker"""
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+    
+    import_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    vendor = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='product_imports')
+    file = models.FileField(upload_to='imports/')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True) # [{"row": n, "sku": ..., "errors": {column: message}}]
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], condition=models.Q(status='QUEUED'), name='productimport_queued_idx'),
+        ]
+    
+    def __str__(self):
+        return (f"{self.status} import {self.import_id} for {self.vendor}")
+
+class IdempotencyKey(models.Model):
+    """First response to a write sent with an Idempotency-Key header, replayed to retries until expires_at"""
+    digest = models.CharField(max_length=64, primary_key=True) # sha256 of user, method, path and the client's key
+    fingerprint = models.CharField(max_length=64) # sha256 of the request payload; a reused key must send the same body
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return (f"{self.digest[:12]} -> {self.status_code}")
+
+class MarginReport(models.Model):
+    """Revenue, cost and margin for one calendar month, computed by backend.margins and read back per period"""
+    month = models.DateField(unique=True) # first day of the month
+    computed_at = models.DateTimeField()
+    
+    def __str__(self):
+        return (f"Margins {self.month:%Y-%m} as of {self.computed_at:%Y-%m-%d %H:%M}")
+
+class MarginReportRow(models.Model):
+    GROUPING_CHOICES = (
+        ('total', 'Total'),
+        ('product', 'Product'),
+        ('category', 'Category'),
+        ('vendor', 'Vendor'),
+    )
+    
+    report = models.ForeignKey(MarginReport, on_delete=models.CASCADE, related_name='rows')
+    grouping = models.CharField(max_length=20, choices=GROUPING_CHOICES)
+    key = models.CharField(max_length=120) # product_id, category, vendor customer_id or 'all'
+    label = models.CharField(max_length=255)
+    vendor = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    lines = models.PositiveIntegerField()
+    units = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    costed_revenue = models.DecimalField(max_digits=14, decimal_places=2) # revenue from products with a supplier price
+    cost = models.DecimalField(max_digits=14, decimal_places=2)
+    margin = models.DecimalField(max_digits=14, decimal_places=2) # costed_revenue - cost
+    
+    class Meta:
+        indexes = [
+            # a grouping's rows, best margin first
+            models.Index(fields=['report', 'grouping', '-margin'], name='marginrow_grouping_idx'),
+            # one vendor's rows for their dashboard
+            models.Index(fields=['report', 'vendor', 'grouping'], name='marginrow_vendor_idx'),
+        ]
+    
+    def __str__(self):
+        return (f"{self.grouping} {self.label}: {self.margin}")
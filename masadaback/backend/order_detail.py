@@ -0,0 +1,39 @@
+# Order detail loader: an order with its customer, delivery, items, products and stock in two queries
+#
+# Query 1 is the order joined to its customer and (reverse one-to-one) delivery. Query 2 is the prefetch
+# of its items joined to their products, with the product's stock read by correlated subqueries on its
+# stock row (stock.stock_rows). The count doesn't grow with the number of lines.
+from django.db.models import OuterRef, Prefetch, Subquery
+
+from .models import Order, OrderItem
+from .stock import stock_rows
+
+
+def _stock(field):
+    return Subquery(stock_rows().filter(product=OuterRef('product_id')).values(field)[:1])
+
+
+def items_queryset():
+    """OrderItems with product and stock_available / stock_reserved annotated"""
+    return (OrderItem.objects.select_related('product')
+            .annotate(stock_available=_stock('quantity_available'), stock_reserved=_stock('quantity_reserved'))
+            .order_by('pk'))
+
+
+def detail_queryset():
+    """Orders ready for a detail page: order.items.all() and order.delivery cost no further queries"""
+    return (Order.objects.select_related('customer', 'delivery')
+            .prefetch_related(Prefetch('items', queryset=items_queryset())))
+
+
+def load_order(order_id, customer=None):
+    """The order (optionally only if it belongs to customer); raises Order.DoesNotExist"""
+    orders = detail_queryset()
+    if customer is not None:
+        orders = orders.filter(customer=customer)
+    return orders.get(order_id=order_id)
+
+
+def delivery_of(order):
+    """The order's Delivery or None, from the select_related cache"""
+    return getattr(order, 'delivery', None)
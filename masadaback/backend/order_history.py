@@ -0,0 +1,107 @@
+# Order history: filters shared by the orders page and the REST API, keyset pagination on (order_date, order_id)
+#
+# A page is "WHERE (order_date, order_id) < cursor ORDER BY order_date DESC, order_id DESC LIMIT n+1": one
+# index range scan on the matching (customer, [status,] -order_date, -order_id) index however deep the
+# page, where OFFSET paging re-reads every earlier row.
+import base64
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+# query parameter -> Order field, exact match
+EXACT_FILTERS = {
+    'status': 'order_status',
+    'payment_status': 'payment_status',
+    'delivery_option': 'delivery_option',
+}
+SORTS = {'newest': ('-order_date', '-order_id'), 'oldest': ('order_date', 'order_id')}
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+
+class InvalidFilter(ValueError):
+    """A filter, sort or cursor parameter could not be parsed"""
+
+
+def _day_start(value, name):
+    day = parse_date(value or '') if value else None
+    if value and day is None:
+        raise InvalidFilter(f"{name} must be a date (YYYY-MM-DD)")
+    return day and timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_orders(queryset, params):
+    """Apply status / payment_status / delivery_option / date_from / date_to (inclusive) from params"""
+    lookups = {field: params[name] for name, field in EXACT_FILTERS.items() if params.get(name)}
+    since = _day_start(params.get('date_from'), 'date_from')
+    until = _day_start(params.get('date_to'), 'date_to')
+    if since:
+        lookups['order_date__gte'] = since
+    if until:
+        # a plain range (not __date) so the composite indexes serve it
+        lookups['order_date__lt'] = until + timedelta(days=1)
+    return queryset.filter(**lookups)
+
+
+def encode_cursor(order):
+    raw = f"{order.order_date.isoformat()}|{order.order_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        stamp, order_id = raw.split('|')
+        order_date = parse_datetime(stamp)
+        if order_date is None:
+            raise ValueError
+        return order_date, uuid.UUID(order_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidFilter("Invalid cursor")
+
+
+def page_size(params, default=DEFAULT_PAGE_SIZE):
+    try:
+        size = int(params.get('limit') or default)
+    except ValueError:
+        raise InvalidFilter("limit must be a number")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_page(queryset, params, size=None):
+    """(orders on this page, cursor for the next page or None) for the sort and cursor in params"""
+    sort = params.get('sort') or 'newest'
+    if sort not in SORTS:
+        raise InvalidFilter(f"sort must be one of {', '.join(SORTS)}")
+    size = size or page_size(params)
+    queryset = queryset.order_by(*SORTS[sort])
+
+    if params.get('cursor'):
+        order_date, order_id = decode_cursor(params['cursor'])
+        # the plain bound on order_date is redundant but gives the planner a range to seek to
+        if sort == 'newest':
+            after = Q(order_date__lte=order_date) & (Q(order_date__lt=order_date) | Q(order_id__lt=order_id))
+        else:
+            after = Q(order_date__gte=order_date) & (Q(order_date__gt=order_date) | Q(order_id__gt=order_id))
+        queryset = queryset.filter(after)
+
+    rows = list(queryset[:size + 1])
+    if len(rows) > size:
+        return rows[:size], encode_cursor(rows[size - 1])
+    return rows, None
+
+
+class OrderKeysetPagination(BasePagination):
+    """DRF pagination for OrderViewSet: ?cursor=&limit=&sort=newest|oldest -> {"next": cursor, "results": [...]}"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows, self.next_cursor = keyset_page(queryset, request.query_params)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next_cursor, 'results': data})
@@ -0,0 +1,42 @@
+# Order summary projection: total_amount / line_count / total_quantity stored on Order
+#
+# Item inserts and deletes adjust the three counters with one F() UPDATE on the order row, so concurrent
+# writers never lose an increment. Edits to an existing item, and bulk_create paths that don't know the
+# totals up front, recalculate from the items with a single UPDATE ... SET col = (SELECT SUM ...).
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Order, OrderItem
+
+
+def summarize(lines):
+    """(total_amount, line_count, total_quantity) of (quantity, subtotal) pairs, for orders built in memory"""
+    lines = list(lines)
+    return sum((subtotal for _, subtotal in lines), 0), len(lines), sum(quantity for quantity, _ in lines)
+
+
+def add_item(order_id, quantity, subtotal, sign=1):
+    """Count one item in (sign=1) or out of (sign=-1) its order's summary"""
+    Order.objects.filter(pk=order_id).update(
+        total_amount=F('total_amount') + sign * subtotal,
+        line_count=F('line_count') + sign,
+        total_quantity=F('total_quantity') + sign * quantity,
+    )
+
+
+def _aggregate(expression, output_field):
+    items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    return Coalesce(Subquery(items.annotate(value=expression).values('value')), Value(0), output_field=output_field)
+
+
+def recalculate(orders=None):
+    """Rebuild the summary from the items of the given orders (a queryset or pks), or of every order"""
+    if orders is None:
+        orders = Order.objects.all()
+    elif not hasattr(orders, 'update'):
+        orders = Order.objects.filter(pk__in=list(orders))
+    return orders.update(
+        total_amount=_aggregate(Sum('subtotal'), DecimalField(max_digits=12, decimal_places=2)),
+        line_count=_aggregate(Count('pk'), IntegerField()),
+        total_quantity=_aggregate(Sum('quantity'), IntegerField()),
+    )
@@ -0,0 +1,163 @@
+# Per-view request profiling: in-memory aggregation with optional per-process JSON dumps
+import contextvars
+import threading
+import time
+
+from . import dumps
+from .stats import LATENCY_BUCKETS_MS, QUERY_COUNT_BUCKETS, SIZE_BUCKETS_BYTES, Histogram
+
+METRICS = {
+    'total_ms': LATENCY_BUCKETS_MS,
+    'sql_ms': LATENCY_BUCKETS_MS,
+    'template_ms': LATENCY_BUCKETS_MS,
+    'queries': QUERY_COUNT_BUCKETS,
+    'response_bytes': SIZE_BUCKETS_BYTES,
+}
+
+_template_seconds = contextvars.ContextVar('template_seconds', default=None)
+_template_timer_installed = False
+
+
+def install_template_timer():
+    """Wrap the Django template backend so top-level renders report their time to the current request
+
+    Each render is also recorded under "template:<name>" so per-template cost shows up in reports.
+    """
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        timer = _template_seconds.get()
+        if timer is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            elapsed = time.perf_counter() - start
+            timer[0] += elapsed
+            registry.record(f"template:{self.template.name}", total_ms=elapsed * 1000)
+
+    Template.render = timed_render
+    _template_timer_installed = True
+
+
+def start_template_timer():
+    timer = [0.0]
+    return timer, _template_seconds.set(timer)
+
+
+def stop_template_timer(handle):
+    timer, token = handle
+    _template_seconds.reset(token)
+    return timer[0]
+
+
+class ViewProfile:
+    """Histograms of every recorded metric for one resolved view name"""
+
+    def __init__(self, histograms=None):
+        self.histograms = histograms or {name: Histogram(buckets) for name, buckets in METRICS.items()}
+
+    @property
+    def requests(self):
+        return self.histograms['total_ms'].count
+
+    def observe(self, **values):
+        for name, value in values.items():
+            self.histograms[name].observe(value)
+
+    def merge(self, other):
+        for name, histogram in other.histograms.items():
+            self.histograms[name].merge(histogram)
+
+    def summary(self):
+        row = {'requests': self.requests}
+        for name, histogram in self.histograms.items():
+            row[name] = {
+                'mean': round(histogram.sum / histogram.count, 2) if histogram.count else 0,
+                'p50': round(histogram.percentile(50), 2),
+                'p95': round(histogram.percentile(95), 2),
+                'p99': round(histogram.percentile(99), 2),
+                'max': round(histogram.max, 2),
+            }
+        return row
+
+    def to_dict(self):
+        return {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({name: Histogram.from_dict(values) for name, values in data.items()})
+
+
+class ProfileRegistry:
+    """Thread-safe per-process store of ViewProfiles, periodically dumped for cross-process reports"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, view_name, **values):
+        with self.lock:
+            profile = self.views.get(view_name)
+            if profile is None:
+                profile = self.views[view_name] = ViewProfile()
+            profile.observe(**values)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: ViewProfile.from_dict(profile.to_dict()) for name, profile in self.views.items()}
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def maybe_flush(self, dump_dir, interval):
+        if dump_dir and time.monotonic() - self.last_flush >= interval:
+            self.flush(dump_dir)
+
+    def flush(self, dump_dir):
+        self.last_flush = time.monotonic()
+        data = {name: profile.to_dict() for name, profile in self.snapshot().items()}
+        if not data:
+            return
+        dumps.write(dump_dir, 'profile', data)
+
+
+registry = ProfileRegistry()
+
+
+def load_profiles(dump_dir, max_age=None):
+    """Merge every worker's dump in dump_dir into one {view name: ViewProfile} dict"""
+    merged = {}
+    for data in dumps.read(dump_dir, 'profile', max_age):
+        for name, values in data.items():
+            try:
+                profile = ViewProfile.from_dict(values)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if name in merged:
+                merged[name].merge(profile)
+            else:
+                merged[name] = profile
+    return merged
+
+
+def collect_profiles(dump_dir, max_age=None):
+    """Stats for the whole deployment: this process is flushed first so its numbers are current"""
+    if not dump_dir:
+        return registry.snapshot()
+    registry.flush(dump_dir)
+    return load_profiles(dump_dir, max_age)
+
+
+def clear_profiles(dump_dir):
+    """Drop this process's stats and all dumps (other workers re-dump what they still hold in memory)"""
+    registry.reset()
+    dumps.clear(dump_dir, 'profile')
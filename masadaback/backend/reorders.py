@@ -0,0 +1,73 @@
+# Reorder engine: one pass over low-stock inventory, cheapest supplier per product, draft purchase orders
+#
+# The scan is a single query: its WHERE is exactly the inventory_low_stock_idx condition, so only rows below
+# their reorder level are read, and the cheapest supplier is a primary-key join on CheapestSupplier (kept
+# by backend.supplier_catalog). Nothing is fetched per SKU from Python.
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import PurchaseOrder, PurchaseOrderLine
+from .stock import stock_rows
+
+# purchase orders whose stock is still on its way; their quantities count towards the reorder level
+OPEN_STATUSES = ('DRAFT', 'SENT')
+
+
+def low_stock_rows():
+    """(product_id, available, reorder_level, reorder_quantity, supplier_id, unit_cost) for each low-stock product"""
+    rows = (stock_rows()
+            .filter(quantity_available__lt=F('reorder_level'))
+            .order_by('product_id')
+            .values_list('product_id', 'quantity_available', 'reorder_level', 'reorder_quantity',
+                         'product__cheapest_supplier__supplier_id', 'product__cheapest_supplier__supply_price'))
+    yield from rows.iterator(chunk_size=5000)
+
+
+def on_order():
+    """{product_id: units} still open on draft or sent purchase orders"""
+    return dict(PurchaseOrderLine.objects
+                .filter(purchase_order__status__in=OPEN_STATUSES)
+                .values_list('product_id')
+                .annotate(units=Sum('quantity'))
+                .values_list('product_id', 'units'))
+
+
+def suggest():
+    """Plan the reorders: ({supplier_id: [(product_id, quantity, unit_cost)]}, [unsourced product_id])
+
+    Orders the larger of reorder_quantity and the shortfall to reorder_level, minus what is already on order.
+    """
+    pending = on_order()
+    by_supplier = defaultdict(list)
+    unsourced = []
+    for product_id, available, level, reorder_quantity, supplier_id, unit_cost in low_stock_rows():
+        incoming = pending.get(product_id, 0)
+        if available + incoming >= level:
+            continue
+        quantity = max(reorder_quantity, level - available) - incoming
+        if supplier_id is None:
+            unsourced.append(product_id)
+        else:
+            by_supplier[supplier_id].append((product_id, quantity, unit_cost))
+    return by_supplier, unsourced
+
+
+@transaction.atomic
+def create_drafts(by_supplier, note='', batch_size=5000):
+    """One DRAFT purchase order per supplier with a line per product; returns the orders"""
+    orders = []
+    lines = []
+    for supplier_id, rows in by_supplier.items():
+        order = PurchaseOrder(supplier_id=supplier_id, note=note, total_cost=Decimal('0'))
+        for product_id, quantity, unit_cost in rows:
+            subtotal = unit_cost * quantity
+            order.total_cost += subtotal
+            lines.append(PurchaseOrderLine(purchase_order=order, product_id=product_id, quantity=quantity,
+                                           unit_cost=unit_cost, subtotal=subtotal))
+        orders.append(order)
+    PurchaseOrder.objects.bulk_create(orders, batch_size=batch_size)
+    PurchaseOrderLine.objects.bulk_create(lines, batch_size=batch_size)
+    return orders
@@ -0,0 +1,220 @@
+# Reservation engine: hold stock for a pending order, then commit or release it on the payment outcome
+#
+# Stock moves with single conditional UPDATEs (no SELECT ... FOR UPDATE on Inventory held across the
+# payment round-trip), so a slow payment provider never blocks other checkouts of the same product.
+# InventoryLog rows are written with bulk_create: the UPDATE has already applied the change, so the
+# sync_inventory_from_log signal must not apply it a second time.
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics, order_summary
+from .models import Inventory, InventoryLog, Order, OrderItem, Product, StockReservation
+from .stock import per_row_case, stock_rows
+
+DEFAULT_TTL_SECONDS = 15 * 60
+
+
+class InsufficientStock(Exception):
+    """A line could not be reserved; nothing from the checkout was kept"""
+
+    def __init__(self, product_id, requested, available=None):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Not enough stock for product {product_id}: requested {requested}, available {available}")
+
+
+class ReservationClosed(Exception):
+    """The order has no HELD reservations left (already committed, released or expired)"""
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, 'RESERVATION_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+
+
+def _logs(rows, action, note):
+    return [
+        InventoryLog(product_id=product_id, action=action, quantity=quantity, note=note)
+        for product_id, quantity in rows
+    ]
+
+
+def reserve_lines(order, lines, ttl=None):
+    """Move each (product_id, quantity) in lines from available to reserved for order, all or nothing
+
+    Must run inside the caller's transaction so a failed line rolls back the ones before it.
+    """
+    now = timezone.now()
+    expires_at = now + (ttl or reservation_ttl())
+
+    wanted = defaultdict(int)
+    for product_id, quantity in lines:
+        wanted[str(product_id)] += int(quantity)
+
+    inventory_ids = {str(product_id): inventory_id for product_id, inventory_id in
+                     stock_rows().filter(product_id__in=wanted).values_list('product_id', 'pk')}
+
+    reservations = []
+    # fixed order so concurrent checkouts of overlapping carts can't deadlock
+    for product_id in sorted(wanted):
+        quantity = wanted[product_id]
+        inventory_id = inventory_ids.get(product_id)
+        moved = inventory_id is not None and Inventory.objects.filter(
+            pk=inventory_id, quantity_available__gte=quantity,
+        ).update(
+            quantity_available=F('quantity_available') - quantity,
+            quantity_reserved=F('quantity_reserved') + quantity,
+        )
+        if not moved:
+            available = Inventory.objects.filter(pk=inventory_id).values_list('quantity_available', flat=True).first()
+            raise InsufficientStock(product_id, quantity, available or 0)
+        reservations.append(StockReservation(
+            order=order, product_id=product_id, inventory_id=inventory_id,
+            quantity=quantity, expires_at=expires_at,
+        ))
+
+    StockReservation.objects.bulk_create(reservations)
+    InventoryLog.objects.bulk_create(_logs(
+        ((r.product_id, r.quantity) for r in reservations), 'RESERVED', f"Held for order {order.order_id}",
+    ))
+    metrics.inc('masada_reservations_total', len(reservations), outcome='held')
+    return reservations
+
+
+@transaction.atomic
+def checkout(customer, lines, delivery_option='delivery', description='', ttl=None):
+    """Create a pending order with its items and hold their stock; raises InsufficientStock
+
+    Raises ValueError, before anything is written, for no lines or a line with a quantity under 1.
+    """
+    lines = [(str(uuid.UUID(str(product_id))), int(quantity)) for product_id, quantity in lines]
+    if not lines or any(quantity < 1 for _, quantity in lines):
+        raise ValueError("Every checkout line needs a quantity of at least 1")
+    prices = dict(Product.objects.filter(product_id__in=[pid for pid, _ in lines])
+                  .values_list('product_id', 'Price_per_unit'))
+    prices = {str(pid): price for pid, price in prices.items()}
+    for product_id, quantity in lines:
+        if product_id not in prices:
+            raise InsufficientStock(product_id, quantity, 0)
+
+    items = [
+        OrderItem(product_id=product_id, quantity=quantity,
+                  unit_price=prices[product_id], subtotal=prices[product_id] * quantity)
+        for product_id, quantity in lines
+    ]
+    total_amount, line_count, total_quantity = order_summary.summarize((item.quantity, item.subtotal) for item in items)
+    order = Order.objects.create(
+        order_id=uuid.uuid4(),
+        customer=customer,
+        delivery_option=delivery_option,
+        payment_status='pending',
+        order_status='processing',
+        description=description,
+        total_amount=total_amount,
+        line_count=line_count,
+        total_quantity=total_quantity,
+    )
+    reserve_lines(order, lines, ttl)
+    # bulk_create: the stock is already held, so reduce_stock_on_order must not take it again
+    # (and the summary above is already complete)
+    for item in items:
+        item.order = order
+    OrderItem.objects.bulk_create(items)
+    metrics.inc('masada_order_items_created_total', len(lines))
+    return order
+
+
+def _close(order, status, outcome):
+    now = timezone.now()
+    with transaction.atomic():
+        # locks only this order's reservation rows; Inventory is touched by one short UPDATE in _apply
+        held = list(StockReservation.objects.select_for_update()
+                    .filter(order=order, status='HELD').values_list('pk', 'inventory_id', 'product_id', 'quantity'))
+        if not held:
+            raise ReservationClosed(f"Order {order.order_id} has no held stock")
+        StockReservation.objects.filter(pk__in=[row[0] for row in held]).update(status=status, closed_at=now)
+        _apply(held, restock=status != 'COMMITTED', note=f"{outcome.capitalize()} for order {order.order_id}")
+    metrics.inc('masada_reservations_total', len(held), outcome=outcome)
+    return len(held)
+
+
+def _apply(held, restock, note):
+    """Take closed reservations out of quantity_reserved, back into available unless they were sold"""
+    per_inventory = defaultdict(int)
+    per_product = defaultdict(int)
+    for _, inventory_id, product_id, quantity in held:
+        per_inventory[inventory_id] += quantity
+        per_product[product_id] += quantity
+
+    delta = per_row_case(per_inventory)
+    changes = {'quantity_reserved': F('quantity_reserved') - delta}
+    if restock:
+        changes['quantity_available'] = F('quantity_available') + delta
+    Inventory.objects.filter(pk__in=per_inventory).update(**changes)
+    InventoryLog.objects.bulk_create(_logs(per_product.items(), 'RELEASED' if restock else 'OUT', note))
+
+
+@transaction.atomic
+def commit(order):
+    """Payment succeeded: the held units leave stock for good"""
+    count = _close(order, 'COMMITTED', 'committed')
+    Order.objects.filter(pk=order.pk).update(payment_status='paid')
+    order.payment_status = 'paid'
+    return count
+
+
+@transaction.atomic
+def release(order, payment_status='failed'):
+    """Payment failed or the order was cancelled: the held units go back to available"""
+    count = _close(order, 'RELEASED', 'released')
+    Order.objects.filter(pk=order.pk).update(payment_status=payment_status, order_status='cancelled')
+    order.payment_status, order.order_status = payment_status, 'cancelled'
+    return count
+
+
+def expire_stale(now=None, batch_size=1000):
+    """Release every HELD reservation past its deadline in batches; returns the number expired"""
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked: holds being committed right now are left to their payment outcome
+            held = list(StockReservation.objects.select_for_update(skip_locked=True)
+                        .filter(status='HELD', expires_at__lte=now).order_by('expires_at')
+                        .values_list('pk', 'inventory_id', 'product_id', 'quantity', 'order_id')[:batch_size])
+            if not held:
+                break
+            StockReservation.objects.filter(pk__in=[row[0] for row in held]).update(status='EXPIRED', closed_at=now)
+            _apply([row[:4] for row in held], restock=True, note="Reservation expired")
+            Order.objects.filter(pk__in={row[4] for row in held}, payment_status='pending').update(
+                payment_status='expired', order_status='cancelled',
+            )
+        expired += len(held)
+        if len(held) < batch_size:
+            break
+    if expired:
+        metrics.inc('masada_reservations_total', expired, outcome='expired')
+    return expired
+
+
+def release_for_deleted_order(order):
+    """Order being deleted: drop its holds; False when its items' stock is already back in available
+
+    HELD units only leave quantity_reserved here, the OrderItem delete signal returns them to available.
+    """
+    rows = list(StockReservation.objects.filter(order=order).values_list('status', 'inventory_id', 'quantity'))
+    per_inventory = defaultdict(int)
+    for status, inventory_id, quantity in rows:
+        if status == 'HELD':
+            per_inventory[inventory_id] += quantity
+    if per_inventory:
+        Inventory.objects.filter(pk__in=per_inventory).update(
+            quantity_reserved=F('quantity_reserved') - per_row_case(per_inventory),
+        )
+    return not any(status in ('RELEASED', 'EXPIRED') for status, _, _ in rows)
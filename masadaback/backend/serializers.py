@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from . import delivery_status
 from .models import (Product, Customer, Order, OrderItem, Inventory, InventoryLog, Delivery, Supplier)
 
 #product
@@ -18,6 +19,12 @@ class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = "__all__"
+
+class OrderLineSerializer(OrderItemSerializer):
+    """An order item with its product name and current stock, for items loaded by backend.order_detail"""
+    product_name = serializers.CharField(source='product.ProductName', read_only=True)
+    stock_available = serializers.IntegerField(read_only=True)
+    stock_reserved = serializers.IntegerField(read_only=True)
                 
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
@@ -25,6 +32,8 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = "__all__"
+        # maintained from the items by backend.order_summary
+        read_only_fields = ['total_amount', 'line_count', 'total_quantity']
 
 #inventory   
 class InventorySerializer(serializers.ModelSerializer):
@@ -37,19 +46,32 @@ class InventoryLogSerializer(serializers.ModelSerializer):
         model = InventoryLog
         fields = "__all__"
 
+class StockAdjustmentSerializer(serializers.Serializer):
+    """One line of a bulk stock adjustment; products are checked for the whole batch at once in the view"""
+    product = serializers.UUIDField()
+    action = serializers.ChoiceField(choices=InventoryLog.ACTION_CHOICES)
+    quantity = serializers.IntegerField(min_value=1)
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+
 #supplier
 class SupplierSerializer(serializers.ModelSerializer):
     class Meta:
         model = Supplier
         fields = "__all__"
+
+class SupplierPriceSerializer(serializers.Serializer):
+    """One line of a supplier price list; products are checked for the whole list at once in the view"""
+    product = serializers.UUIDField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
         
 #delivery     
 class DeliverySerializer(serializers.ModelSerializer):
-    supplier = SupplierSerializer(read_only=True)
-    supplier_id = serializers.PrimaryKeyRelatedField(queryset=Supplier.objects.all(),source="supplier",write_only=True)
-    
     class Meta:
         model = Delivery
-        fields = [
-            'id', 'product', 'supplier', 'supplier_id', 'quantity_received', 'delivery_date', 'notes'
-        ]
\ No newline at end of file
+        fields = "__all__"
+
+class DeliveryStatusSerializer(serializers.Serializer):
+    """A bulk delivery status change: which deliveries, and the status they move to"""
+    deliveries = serializers.ListField(child=serializers.IntegerField(min_value=1), min_length=1,
+                                       max_length=delivery_status.MAX_BATCH)
+    status = serializers.ChoiceField(choices=list(delivery_status.TRANSITIONS))
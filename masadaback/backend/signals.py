@@ -1,7 +1,14 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from .models import OrderItem, Inventory, InventoryLog
+from .models import Order, OrderItem, InventoryLog, Product, ProductSupplier, Supplier
 from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from . import metrics, order_summary, reservations, stock, supplier_catalog
+
+# expose a zero series per action so dashboards see every InventoryLog action from the start
+for _action, _label in InventoryLog.ACTION_CHOICES:
+    metrics.inc('masada_inventory_units_total', 0, action=_action)
 
 #---------------------------------
 #Auto-update inventory item when orderitem is created
@@ -12,20 +19,15 @@ def reduce_stock_on_order(sender, instance, created, **kwargs):
     if created:
         product = instance.product
         quantity = instance.quantity
+        metrics.inc('masada_order_items_created_total')
+        metrics.inc('masada_inventory_signal_total', receiver='reduce_stock_on_order', action='OUT')
         
-        #get or create inventory
-        inventory, _ = Inventory.objects.get_or_create(product=product, defaults={'quantity_available':0})
-        
-        #reduce available stock
-        inventory.quantity_available -= quantity
-        inventory.save()
-        
-        #log the change
+        #log the change; sync_inventory_from_log reduces available stock
         InventoryLog.objects.create(
             product=product,
             action='OUT',
             quantity=quantity,
-            note=(f"Order #{instance.order.id} item purchased"),
+            note=(f"Order #{instance.order_id} item purchased"),
         )
       
 #------------------------
@@ -34,27 +36,35 @@ def reduce_stock_on_order(sender, instance, created, **kwargs):
 #-----------------------   
 @receiver(post_delete, sender=OrderItem)
 def restore_stock_on_order_delete(sender, instance, **kwargs):
+    if instance.order_id in _orders_without_restock:
+        return
     product = instance.product
     quantity = instance.quantity
+    metrics.inc('masada_inventory_signal_total', receiver='restore_stock_on_order_delete', action='IN')
     
-    #get inventory
-    inventory, _ = Inventory.objects.get_or_create(
-        product=product,
-        defaults={'quantity_available': 0}
-    )     
-    
-    #restore stock
-    inventory.quantity_available += quantity
-    inventory.save()
-    
-    #log the change
+    #log the change; sync_inventory_from_log restores available stock
     InventoryLog.objects.create(
         product=product,
         action="IN",
         quantity=quantity,
-        note=(f"Order #{instance.order.id} item removed / refunded."),
+        note=(f"Order #{instance.order_id} item removed / refunded."),
     )
     
+#---------------------------------
+#Keep the order summary (total, lines, quantity) in step with its items
+#---------------------------------
+@receiver(post_save, sender=OrderItem)
+def update_order_summary(sender, instance, created, **kwargs):
+    if created:
+        order_summary.add_item(instance.order_id, instance.quantity, instance.subtotal)
+    else:
+        #an edited line: its old values are gone, so rebuild this order from its items
+        order_summary.recalculate([instance.order_id])
+
+@receiver(post_delete, sender=OrderItem)
+def remove_from_order_summary(sender, instance, **kwargs):
+    order_summary.add_item(instance.order_id, instance.quantity, instance.subtotal, sign=-1)
+    
 #-------------------
 #Auto-update inventory when inventorylog is created
 #-------------------
@@ -63,25 +73,70 @@ def sync_inventory_from_log(sender, instance, created, **kwargs):
     if not created:
         return
     
-    product = instance.product
-    inventory, _ = Inventory.objects.get_or_create(
-        product=product,
-        defaults={'quantity_available':0}
-    )
+    metrics.inc('masada_inventory_signal_total', receiver='sync_inventory_from_log', action=instance.action)
+    metrics.inc('masada_inventory_units_total', instance.quantity, action=instance.action)
     
-    if instance.action == "IN":
-        inventory.quantity_available += instance.quantity
-        
-    elif instance.action == "OUT":
-        inventory.quantity_available -= instance.quantity
-        
-    elif instance.action == "DAMAGED":
-        inventory.quantity_available += instance.quantity
-        
-    elif instance.action == "RESERVED":
-        inventory.quantity_available += instance.quantity
-        
-    elif instance.action == "RELEASED":
-        inventory.quantity_available -=  instance.quantity
-        
-    inventory.save()
\ No newline at end of file
+    # ACTION_DELTAS says which counters each action moves (shared with the bulk adjustment API)
+    stock.apply_log(instance)
+
+#-------------------
+#Drop held stock when an order is deleted before payment
+#(its OrderItems' delete signal returns the units to available,
+#unless a release/expiry already did)
+#-------------------
+_orders_without_restock = set()
+
+@receiver(pre_delete, sender=Order)
+def release_reservations_on_order_delete(sender, instance, **kwargs):
+    if not reservations.release_for_deleted_order(instance):
+        _orders_without_restock.add(instance.pk)
+
+
+@receiver(post_delete, sender=Order)
+def forget_deleted_order(sender, instance, **kwargs):
+    _orders_without_restock.discard(instance.pk)
+
+#-------------------
+#Keep the cheapest supplier per product current when an offer changes
+#(bulk price uploads refresh once for the whole list, a supplier delete once for all its offers)
+#-------------------
+@receiver(post_save, sender=ProductSupplier)
+def refresh_cheapest_supplier(sender, instance, **kwargs):
+    supplier_catalog.refresh([instance.product_id])
+
+@receiver(post_delete, sender=ProductSupplier)
+def refresh_cheapest_supplier_on_delete(sender, instance, origin=None, **kwargs):
+    deleted = origin.model if isinstance(origin, QuerySet) else type(origin)
+    # offers cascading from their supplier are refreshed together below; from their product, the
+    # product's CheapestSupplier row cascades too and there is nothing left to refresh
+    if deleted not in (Supplier, Product):
+        supplier_catalog.refresh([instance.product_id])
+
+@receiver(pre_delete, sender=Supplier)
+def remember_supplier_products(sender, instance, **kwargs):
+    instance._offered_products = list(ProductSupplier.objects.filter(supplier=instance)
+                                      .values_list('product_id', flat=True))
+
+@receiver(post_delete, sender=Supplier)
+def refresh_after_supplier_delete(sender, instance, **kwargs):
+    # still inside the delete's transaction: CheapestSupplier.supplier is DO_NOTHING, so rows naming the
+    # deleted supplier must be replaced before the foreign keys are checked at commit
+    supplier_catalog.refresh(getattr(instance, '_offered_products', []))
+
+#-------------------
+#Business / session counters for /metrics
+#-------------------
+@receiver(post_save, sender=Order)
+def count_order_created(sender, instance, created, **kwargs):
+    if created:
+        metrics.inc('masada_orders_created_total')
+
+
+@receiver(user_logged_in)
+def count_login(sender, request, user, **kwargs):
+    metrics.inc('masada_session_operations_total', operation='login')
+
+
+@receiver(user_logged_out)
+def count_logout(sender, request, user, **kwargs):
+    metrics.inc('masada_session_operations_total', operation='logout')
@@ -0,0 +1,240 @@
+# Static asset pipeline: content-hashed names, pre-compressed siblings and a DEBUG-independent server
+import gzip
+import json
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico', '.ttf', '.otf', '.eot'}
+MIN_COMPRESS_BYTES = 256
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+SHORT_CACHE = 'public, max-age=60'
+# what collectstatic produces; a fixed table instead of mimetypes, whose first use parses the system
+# mime.types files (~30ms of every worker boot)
+CONTENT_TYPES = {
+    '.css': 'text/css', '.js': 'text/javascript', '.mjs': 'text/javascript', '.json': 'application/json',
+    '.map': 'application/json', '.svg': 'image/svg+xml', '.txt': 'text/plain', '.md': 'text/markdown',
+    '.html': 'text/html', '.xml': 'text/xml', '.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif', '.webp': 'image/webp', '.avif': 'image/avif', '.ico': 'image/vnd.microsoft.icon',
+    '.woff': 'font/woff', '.woff2': 'font/woff2', '.ttf': 'font/ttf', '.otf': 'font/otf',
+    '.eot': 'application/vnd.ms-fontobject', '.pdf': 'application/pdf', '.wasm': 'application/wasm',
+    '.mp4': 'video/mp4', '.webm': 'video/webm',
+}
+
+
+def _load_brotli():
+    try:
+        import brotli
+    except ImportError:  # optional: only .gz siblings are produced without it
+        return None
+    return brotli
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header; a coding with q=0 is refused"""
+    accepted = {}
+    for token in (header or '').lower().split(','):
+        coding, *params = [part.strip() for part in token.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def guess_content_type(name):
+    suffix = os.path.splitext(name)[1].lower()
+    content_type = CONTENT_TYPES.get(suffix, 'application/octet-stream')
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes .gz/.br siblings during collectstatic"""
+
+    # collectstatic has not run (dev, tests): fall back to the unhashed name instead of failing the render
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = []
+        for original, hashed, was_processed in super().post_process(paths, dry_run, **options):
+            processed.append(hashed)
+            yield original, hashed, was_processed
+        if dry_run:
+            return
+
+        names = set(filter(None, processed)) | set(paths)
+        for name in sorted(names):
+            if Path(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            return
+        encoders = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        brotli = _load_brotli()
+        if brotli is not None:
+            encoders.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            # not worth a sibling if it barely shrinks
+            if len(compressed) < len(data) * 0.95:
+                Path(f"{path}{suffix}").write_bytes(compressed)
+
+
+class StaticFileIndex:
+    """Snapshot of STATIC_ROOT taken at startup: url path -> file, encodings and cache policy"""
+
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, static_root, static_url):
+        self.prefix = '/' + static_url.strip('/') + '/'
+        self.files = {}
+        root = Path(static_root)
+        if not root.is_dir():
+            return
+
+        hashed = set()
+        manifest = root / 'staticfiles.json'
+        if manifest.exists():
+            hashed = set(json.loads(manifest.read_text()).get('paths', {}).values())
+
+        # one directory listing per folder: siblings are looked up in it rather than probed with exists()
+        for dirpath, _, filenames in os.walk(root):
+            present = set(filenames)
+            relative_dir = os.path.relpath(dirpath, root)
+            for filename in filenames:
+                if filename.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(dirpath, filename)
+                name = filename if relative_dir == '.' else f"{relative_dir.replace(os.sep, '/')}/{filename}"
+                stat = os.stat(path)
+                variants = {'identity': (path, stat.st_size)}
+                for encoding, suffix in self.ENCODINGS:
+                    if filename + suffix in present:
+                        variants[encoding] = (path + suffix, os.stat(path + suffix).st_size)
+                self.files[self.prefix + name] = {
+                    'variants': variants,
+                    'content_type': guess_content_type(name),
+                    'cache_control': IMMUTABLE_CACHE if name in hashed else SHORT_CACHE,
+                    'last_modified': formatdate(stat.st_mtime, usegmt=True),
+                    'etag': f'"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+                }
+
+    def lookup(self, path, accept_encoding):
+        """(headers, file path) for a static request, or None if the path isn't a collected file"""
+        entry = self.files.get(path)
+        if entry is None:
+            return None
+
+        # highest q wins, br before gzip on a tie; "*" stands for any coding not named
+        encoding, best = 'identity', 0
+        accepted = accepted_encodings(accept_encoding)
+        for candidate, _ in self.ENCODINGS:
+            q = accepted.get(candidate, accepted.get('*', 0))
+            if q > best and candidate in entry['variants']:
+                encoding, best = candidate, q
+        file_path, size = entry['variants'][encoding]
+
+        headers = [
+            ('Content-Type', entry['content_type']),
+            ('Content-Length', str(size)),
+            ('Cache-Control', entry['cache_control']),
+            ('Last-Modified', entry['last_modified']),
+            ('ETag', entry['etag'] if encoding == 'identity' else entry['etag'][:-1] + f'-{encoding}"'),
+        ]
+        if len(entry['variants']) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        return headers, file_path
+
+
+class StaticFilesMiddleware:
+    """WSGI wrapper serving collected static files (with .br/.gz negotiation) before Django sees the request"""
+
+    def __init__(self, application, static_root=None, static_url=None):
+        from django.conf import settings
+        self.application = application
+        self.index = StaticFileIndex(static_root or settings.STATIC_ROOT, static_url or settings.STATIC_URL)
+
+    def __call__(self, environ, start_response):
+        method = environ.get('REQUEST_METHOD')
+        found = None
+        if method in ('GET', 'HEAD'):
+            found = self.index.lookup(environ.get('PATH_INFO', ''), environ.get('HTTP_ACCEPT_ENCODING'))
+        if found is None:
+            return self.application(environ, start_response)
+
+        headers, file_path = found
+        etag = dict(headers)['ETag']
+        if environ.get('HTTP_IF_NONE_MATCH') == etag:
+            start_response('304 Not Modified', [h for h in headers if h[0] in ('Cache-Control', 'ETag', 'Vary')])
+            return [b'']
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return [b'']
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(open(file_path, 'rb'), 64 * 1024)
+        return _read_chunks(file_path)
+
+
+def _read_chunks(file_path, size=64 * 1024):
+    with open(file_path, 'rb') as fh:
+        while chunk := fh.read(size):
+            yield chunk
+
+
+class ASGIStaticFilesMiddleware:
+    """ASGI counterpart of StaticFilesMiddleware"""
+
+    def __init__(self, application, static_root=None, static_url=None):
+        from django.conf import settings
+        self.application = application
+        self.index = StaticFileIndex(static_root or settings.STATIC_ROOT, static_url or settings.STATIC_URL)
+
+    async def __call__(self, scope, receive, send):
+        found = None
+        request_headers = dict(scope.get('headers') or [])
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            accept_encoding = request_headers.get(b'accept-encoding', b'').decode('latin-1')
+            found = self.index.lookup(scope['path'], accept_encoding)
+        if found is None:
+            return await self.application(scope, receive, send)
+
+        headers, file_path = found
+        etag = dict(headers)['ETag']
+        status = 200
+        if request_headers.get(b'if-none-match', b'').decode('latin-1') == etag:
+            status = 304
+            headers = [h for h in headers if h[0] in ('Cache-Control', 'ETag', 'Vary')]
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in headers],
+        })
+        if status == 304 or scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        for chunk in _read_chunks(file_path):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
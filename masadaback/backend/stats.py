@@ -0,0 +1,78 @@
+# Small statistics helpers shared by the benchmark, profiling and metrics tools
+import math
+import time
+from bisect import bisect_left
+
+# Upper bounds; anything larger lands in the implicit +Inf bucket
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an iterable of numbers (0 for no data)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory, mergeable across processes"""
+
+    def __init__(self, buckets, counts=None, total=0.0, maximum=0.0):
+        self.buckets = tuple(buckets)
+        self.counts = list(counts) if counts else [0] * (len(self.buckets) + 1)
+        self.sum = total
+        self.max = maximum
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, capped at the largest value seen"""
+        total = self.count
+        if not total:
+            return 0
+        rank = max(1, math.ceil(pct / 100 * total))
+        seen = 0
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def to_dict(self):
+        return {'buckets': list(self.buckets), 'counts': self.counts, 'sum': self.sum, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['buckets'], data['counts'], data['sum'], data['max'])
+
+
+class QueryCounter:
+    """connection.execute_wrapper() hook counting SQL statements and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
@@ -0,0 +1,106 @@
+# Stock movements: how each InventoryLog action changes an Inventory row, applied one log or a batch at a time
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Value, When
+
+from . import metrics
+from .models import Inventory, InventoryLog
+
+COUNTERS = ('quantity_available', 'quantity_reserved', 'quantity_damaged')
+# action -> multiplier for each of COUNTERS
+ACTION_DELTAS = {
+    'IN': (1, 0, 0),
+    'OUT': (-1, 0, 0),
+    'DAMAGED': (-1, 0, 1),  # written off: leaves available stock, counted as damaged
+    'RESERVED': (-1, 1, 0),  # held for an order
+    'RELEASED': (1, -1, 0),  # hold dropped
+}
+MAX_BATCH = 1000
+
+
+class NegativeStock(Exception):
+    """A batch would take some counter below zero; nothing from it was applied"""
+
+    def __init__(self, shortfalls):
+        self.shortfalls = shortfalls  # [{'product', 'counter', 'current', 'change'}]
+        super().__init__("Adjustment would make stock negative for " + ', '.join(sorted({s['product'] for s in shortfalls})))
+
+
+def stock_rows(queryset=None):
+    """Only each product's stock row out of queryset (default: all Inventory)
+
+    Inventory.product isn't unique, so a product can have several rows. Its stock lives on the lowest-pk
+    one, and everything that reads or moves stock (checkout, the log signal, batch adjustments, imports,
+    reorders, order pages) picks rows through here so they all agree on which.
+    """
+    queryset = Inventory.objects.all() if queryset is None else queryset
+    first = Inventory.objects.filter(product_id=OuterRef('product_id')).order_by('pk').values('pk')[:1]
+    return queryset.filter(pk=Subquery(first))
+
+
+def per_row_case(totals):
+    """CASE pk WHEN ... THEN value: one UPDATE applies a different amount to each row"""
+    return Case(*[When(pk=pk, then=Value(amount)) for pk, amount in totals.items()],
+                default=Value(0), output_field=IntegerField())
+
+
+def apply_log(log):
+    """Apply a single saved InventoryLog to its product's inventory (the sync_inventory_from_log path)"""
+    inventory = stock_rows().filter(product_id=log.product_id).first()
+    if inventory is None:
+        inventory = Inventory(product_id=log.product_id, quantity_available=0)
+    for counter, sign in zip(COUNTERS, ACTION_DELTAS[log.action]):
+        setattr(inventory, counter, getattr(inventory, counter) + sign * log.quantity)
+    inventory.save()
+
+
+@transaction.atomic
+def adjust(adjustments, updated_by=None):
+    """Apply [{'product', 'action', 'quantity', 'note'}] as one all-or-nothing batch; returns the Inventory rows
+
+    Net change per product and counter, then a single UPDATE ... SET counter = counter + CASE pk ... for the
+    batch, and bulk-inserted logs (bulk_create skips sync_inventory_from_log, which would apply them again).
+    """
+    net = defaultdict(lambda: [0, 0, 0])
+    for adjustment in adjustments:
+        signs = ACTION_DELTAS[adjustment['action']]
+        for i, sign in enumerate(signs):
+            net[adjustment['product']][i] += sign * adjustment['quantity']
+
+    # each product's stock row, created if missing; locked in pk order so concurrent batches over the
+    # same products can't deadlock
+    Inventory.objects.bulk_create([
+        Inventory(product_id=product_id, uom='pcs')
+        for product_id in set(net) - set(Inventory.objects.filter(product_id__in=net).values_list('product_id', flat=True))
+    ])
+    rows = {row['product_id']: row for row in stock_rows(Inventory.objects.select_for_update())
+            .filter(product_id__in=net).order_by('pk').values('pk', 'product_id', *COUNTERS)}
+
+    shortfalls = []
+    totals = [{} for _ in COUNTERS]
+    for product_id, changes in net.items():
+        row = rows[product_id]
+        for i, (counter, change) in enumerate(zip(COUNTERS, changes)):
+            if row[counter] + change < 0:
+                shortfalls.append({'product': str(product_id), 'counter': counter,
+                                   'current': row[counter], 'change': change})
+            if change:
+                totals[i][row['pk']] = change
+    if shortfalls:
+        raise NegativeStock(shortfalls)
+
+    changes = {counter: F(counter) + per_row_case(amounts) for counter, amounts in zip(COUNTERS, totals) if amounts}
+    if changes:
+        Inventory.objects.filter(pk__in=[row['pk'] for row in rows.values()]).update(**changes)
+    InventoryLog.objects.bulk_create([
+        InventoryLog(product_id=a['product'], action=a['action'], quantity=a['quantity'],
+                     note=a.get('note', ''), updated_by=updated_by)
+        for a in adjustments
+    ])
+    units = defaultdict(int)
+    for adjustment in adjustments:
+        units[adjustment['action']] += adjustment['quantity']
+    for action, quantity in units.items():
+        metrics.inc('masada_inventory_units_total', quantity, action=action)
+    return list(Inventory.objects.filter(pk__in=[row['pk'] for row in rows.values()]))
@@ -0,0 +1,93 @@
+# Supplier catalog: who sells what at which price, and the cheapest offer per product kept in CheapestSupplier
+#
+# Procurement screens and the reorder engine read the cheapest supplier by primary key instead of ranking
+# every offer per request. The table is rebuilt for exactly the products whose offers changed: on save or
+# delete of a ProductSupplier, once per deleted supplier (signals) and once per uploaded price list. Each rebuild is a delete and a
+# re-insert of the rank-1 rows of a window over (product, supply_price, supplier_id), which
+# productsupplier_price_idx serves in order.
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import CheapestSupplier, ProductSupplier
+
+MAX_PRICE_LINES = 5000
+CHUNK = 900  # product ids per refresh query, so each IN list and window stays small
+
+
+def _cheapest_rows(product_ids=None):
+    offers = ProductSupplier.objects.all()
+    if product_ids is not None:
+        offers = offers.filter(product_id__in=product_ids)
+    ranked = offers.annotate(
+        rank=Window(RowNumber(), partition_by=[F('product_id')], order_by=[F('supply_price').asc(), F('supplier_id').asc()]),
+        quotes=Window(Count('pk'), partition_by=[F('product_id')]),
+    )
+    return ranked.filter(rank=1).values_list('product_id', 'supplier_id', 'supply_price', 'quotes')
+
+
+@transaction.atomic
+def refresh(product_ids=None, batch_size=5000):
+    """Rebuild CheapestSupplier for product_ids (every product when None); returns the rows written"""
+    if product_ids is None:
+        CheapestSupplier.objects.all().delete()
+        chunks = [None]
+    else:
+        product_ids = list(set(product_ids))
+        chunks = [product_ids[i:i + CHUNK] for i in range(0, len(product_ids), CHUNK)]
+    written = 0
+    for chunk in chunks:
+        if chunk is not None:
+            CheapestSupplier.objects.filter(product_id__in=chunk).delete()
+        rows, batch = _cheapest_rows(chunk).iterator(chunk_size=batch_size), []
+        for product_id, supplier_id, price, quotes in rows:
+            batch.append(CheapestSupplier(product_id=product_id, supplier_id=supplier_id, supply_price=price,
+                                          offers=quotes))
+            if len(batch) >= batch_size:
+                written += len(CheapestSupplier.objects.bulk_create(batch))
+                batch = []
+        written += len(CheapestSupplier.objects.bulk_create(batch))
+    return written
+
+
+def listings(supplier):
+    """One supplier's offers, each with the cheapest price on file for the same product"""
+    return (ProductSupplier.objects.filter(supplier=supplier)
+            .order_by('product__ProductName', 'product_id')
+            .values('product_id', 'product__ProductName', 'supply_price', 'supply_date',
+                    'product__cheapest_supplier__supplier_id', 'product__cheapest_supplier__supply_price',
+                    'product__cheapest_supplier__offers'))
+
+
+def cheapest(product_ids):
+    """{product_id: CheapestSupplier} with the supplier joined, for products that have any offer"""
+    return {row.product_id: row for row in
+            CheapestSupplier.objects.filter(product_id__in=product_ids).select_related('supplier')}
+
+
+@transaction.atomic
+def upload_prices(supplier, lines, batch_size=500):
+    """Set supplier's price for each {'product', 'price'}; returns (created, updated, unchanged)
+
+    New offers are bulk-inserted and changed ones bulk-updated (neither fires the ProductSupplier signals),
+    then CheapestSupplier is rebuilt once for the products whose price moved.
+    """
+    prices = {line['product']: Decimal(line['price']) for line in lines}  # a repeated product: the last line wins
+    existing = {offer.product_id: offer for offer in ProductSupplier.objects.select_for_update()
+                .filter(supplier=supplier, product_id__in=prices)}
+    today = timezone.localdate()
+    new, changed = [], []
+    for product_id, price in prices.items():
+        offer = existing.get(product_id)
+        if offer is None:
+            new.append(ProductSupplier(product_id=product_id, supplier=supplier, supply_price=price, supply_date=today))
+        elif offer.supply_price != price:
+            offer.supply_price, offer.supply_date = price, today
+            changed.append(offer)
+    ProductSupplier.objects.bulk_create(new, batch_size=batch_size)
+    ProductSupplier.objects.bulk_update(changed, ['supply_price', 'supply_date'], batch_size=batch_size)
+    refresh([offer.product_id for offer in new + changed])
+    return len(new), len(changed), len(prices) - len(new) - len(changed)
@@ -0,0 +1,30 @@
+# Template warm-up for the cached loader
+import logging
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.template import engines
+
+logger = logging.getLogger(__name__)
+
+
+def frontend_template_names():
+    """Every frontend/*.html template shipped with the backend app"""
+    template_dir = Path(apps.get_app_config('backend').path) / 'templates'
+    return sorted(path.relative_to(template_dir).as_posix() for path in (template_dir / 'frontend').glob('*.html'))
+
+
+def warm_templates(names=None):
+    """Compile templates into the cached loader now so the first request doesn't pay for parsing"""
+    engine = engines['django']
+    start = time.perf_counter()
+    warmed = 0
+    for name in names or frontend_template_names():
+        try:
+            engine.get_template(name)
+            warmed += 1
+        except Exception as exc:  # a broken template must not stop the worker from booting
+            logger.warning("Template warm-up failed for %s: %s", name, exc)
+    logger.info("Warmed %d templates in %.1f ms", warmed, (time.perf_counter() - start) * 1000)
+    return warmed
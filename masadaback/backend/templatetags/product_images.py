@@ -0,0 +1,79 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from backend.images import HERO_IMAGES, HERO_WIDTHS, IMAGE_SIZES, STATIC_DIR, hero_path
+
+register = template.Library()
+
+# Used until a product has an uploaded image; the CDN resizes and picks AVIF/WebP itself
+PLACEHOLDER_URL = 'https://images.unsplash.com/photo-1551698618-1dfe5d97d256?w={width}&h={height}&fit=crop&crop=center&auto=format'
+
+DEFAULT_SIZES = {
+    'thumb': '160px',
+    'card': '(max-width: 768px) 100vw, 400px',
+    'detail': '(max-width: 768px) 100vw, 50vw',
+}
+
+
+def _srcset(variants, fmt):
+    return ', '.join(
+        f"{default_storage.url(variants[name][fmt])} {variants[name]['width']}w"
+        for name in IMAGE_SIZES if fmt in variants.get(name, {})
+    )
+
+
+@register.simple_tag
+def product_picture(product, size='card', css_class='', style='', loading='lazy', sizes=None):
+    """Responsive <picture> for a product: AVIF/WebP srcsets, explicit dimensions, lazy loading"""
+    sizes = sizes or DEFAULT_SIZES.get(size, '100vw')
+    variants = product.image_variants or {}
+    attrs = {'class': css_class, 'style': style, 'alt': product.ProductName, 'loading': loading}
+
+    if size in variants:
+        sources = format_html_join(
+            '', '<source type="{}" srcset="{}" sizes="{}">',
+            ((f"image/{fmt}", _srcset(variants, fmt), sizes) for fmt in ('avif', 'webp') if fmt in variants[size]),
+        )
+        return format_html(
+            '<picture>{}<img src="{}" width="{}" height="{}" class="{class}" style="{style}" alt="{alt}" loading="{loading}" decoding="async"></picture>',
+            sources, default_storage.url(variants[size]['webp']), variants[size]['width'], variants[size]['height'], **attrs,
+        )
+
+    if product.image:
+        return format_html(
+            '<img src="{}" class="{class}" style="{style}" alt="{alt}" loading="{loading}" decoding="async">',
+            product.image.url, **attrs,
+        )
+
+    width = IMAGE_SIZES.get(size, IMAGE_SIZES['card'])
+    height = width * 3 // 4
+    srcset = ', '.join(f"{PLACEHOLDER_URL.format(width=w, height=w * 3 // 4)} {w}w" for w in IMAGE_SIZES.values())
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" class="{class}" style="{style}" alt="{alt}" loading="{loading}" decoding="async">',
+        PLACEHOLDER_URL.format(width=width, height=height), srcset, sizes, width, height, **attrs,
+    )
+
+
+def _hero_background(layer, width):
+    webp = static(hero_path(layer, width, 'webp'))
+    options = [f'url("{webp}") type("image/webp")']
+    if (STATIC_DIR / hero_path(layer, width, 'avif')).exists():
+        options.insert(0, f'url("{static(hero_path(layer, width, "avif"))}") type("image/avif")')
+    return f'background-image: url("{webp}"); background-image: image-set({", ".join(options)});'
+
+
+@register.simple_tag
+def hero_backgrounds():
+    """CSS giving each .layer-<name> hero its resized AVIF/WebP background, the larger one on wide screens"""
+    small, *larger = HERO_WIDTHS
+    rules = [f".layer-{layer} {{ {_hero_background(layer, small)} }}" for layer in HERO_IMAGES]
+    previous = small
+    for width in larger:
+        rules.append(f"@media (min-width: {previous + 1}px) {{ " + ' '.join(
+            f".layer-{layer} {{ {_hero_background(layer, width)} }}" for layer in HERO_IMAGES) + " }")
+        previous = width
+    # every value above comes from static() paths built from our own constants
+    return mark_safe('\n'.join(rules))
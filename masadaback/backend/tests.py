@@ -1,3 +1,1045 @@
-from django.test import TestCase
+import gzip
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.template import Context, Template, engines
+from django.template.loaders import cached
+from django.urls import reverse
+from django.utils import timezone
+
+from masadaback.settings import base as base_settings
+
+from . import (
+    catalog_import, delivery_planning, dumps, forecasting, images, layout, margins, metrics, profiling, reorders,
+    reservations, staticfiles, supplier_catalog, template_cache,
+)
+from .management.commands import run_benchmark
+from .staticfiles import IMMUTABLE_CACHE, SHORT_CACHE, CompressedManifestStaticFilesStorage, StaticFilesMiddleware
+from .db_routers import PIN_COOKIE, PrimaryReplicaRouter, pin_scope, use_primary, use_replica
+from .models import (
+    CheapestSupplier, Customer, Delivery, IdempotencyKey, Inventory, InventoryLog, MarginReport, Order, OrderItem,
+    Product, ProductSupplier, PurchaseOrder, Supplier,
+)
 
 # Create your tests here.
+
+
+def make_product(using, name='Oak plank', **fields):
+    return Product.objects.db_manager(using).create(
+        product_id=fields.pop('product_id', uuid.uuid4()),
+        ProductName=name,
+        Price_per_unit='12.50',
+        grade='A',
+        ProductType='Hardwood',
+        Category='Planks',
+        Dimensions='2x4',
+        stock_quantity=10,
+        description='Kiln dried',
+        **fields,
+    )
+
+
+def make_customer(name='Bo', customer_type='Individual', location='Moshi', using='default', **fields):
+    return Customer.objects.db_manager(using).create(
+        customer_id=fields.pop('customer_id', uuid.uuid4()),
+        fullname=name,
+        email=fields.pop('email', f"{name.split()[0].lower()}@example.com"),
+        customer_type=customer_type,
+        location=location,
+        **fields,
+    )
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(TestCase):
+    """Runs with masadaback.settings.test, where 'replica' is a second SQLite database"""
+
+    databases = {'default', 'replica'}
+
+    def test_router_sends_opted_in_reads_to_replica(self):
+        router = PrimaryReplicaRouter()
+        self.assertIsNone(router.db_for_read(Product))
+        with use_replica():
+            self.assertEqual(router.db_for_read(Product), 'replica')
+            # sessions and auth never come from the replica
+            self.assertIsNone(router.db_for_read(User))
+            self.assertEqual(router.db_for_write(Product), 'default')
+            with use_primary():
+                self.assertEqual(router.db_for_read(Product), 'default')
+
+    def test_write_pins_later_reads_to_primary(self):
+        router = PrimaryReplicaRouter()
+        with use_replica(), pin_scope() as state:
+            self.assertEqual(router.db_for_read(Product), 'replica')
+            router.db_for_write(Product)
+            self.assertTrue(state['wrote'])
+            self.assertEqual(router.db_for_read(Product), 'default')
+
+    def test_catalog_views_read_from_replica(self):
+        on_replica = make_product('replica', name='Replica cedar')
+        on_primary = make_product('default', name='Primary pine')
+
+        response = self.client.get(reverse('shop'))
+        self.assertContains(response, 'Replica cedar')
+        self.assertNotContains(response, 'Primary pine')
+
+        self.assertEqual(self.client.get(reverse('product_detail', args=[on_replica.product_id])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('product_detail', args=[on_primary.product_id])).status_code, 404)
+
+    def test_api_list_and_retrieve_read_from_replica(self):
+        on_replica = make_product('replica', name='Replica cedar')
+        make_product('default', name='Primary pine')
+
+        names = [row['ProductName'] for row in self.client.get('/api/products/').json()]
+        self.assertEqual(names, ['Replica cedar'])
+        response = self.client.get(f'/api/products/{on_replica.product_id}/')
+        self.assertEqual(response.json()['ProductName'], 'Replica cedar')
+
+    def test_margin_report_api_reads_from_replica(self):
+        month = margins.month_start(timezone.localdate())
+        MarginReport.objects.using('replica').create(month=month, computed_at=timezone.now())
+        self.client.force_login(User.objects.create_user('boss', is_staff=True))
+        self.assertIsNotNone(self.client.get('/api/reports/margins/').json()['computed_at'])
+
+    def test_pin_cookie_keeps_catalog_on_primary(self):
+        make_product('replica', name='Replica cedar')
+        make_product('default', name='Primary pine')
+
+        self.client.cookies[PIN_COOKIE] = '1'
+        response = self.client.get(reverse('shop'))
+        self.assertContains(response, 'Primary pine')
+        self.assertNotContains(response, 'Replica cedar')
+
+    def test_verify_account_reads_primary(self):
+        customer_id = uuid.uuid4()
+        make_customer('Ann', 'Individual', 'Arusha', customer_id=customer_id, verification_code='123456')
+        # the replica still holds the pre-signup state
+        make_customer('Ann', 'Individual', 'Arusha', using='replica', customer_id=customer_id, verification_code='000000')
+
+        response = self.client.post(reverse('verify_account', args=[customer_id]), {'code': '123456'})
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertTrue(Customer.objects.using('default').get(customer_id=customer_id).is_verified)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.customer = make_customer('Bo', 'Contractor', 'Moshi')
+        self.product = make_product('default')
+        self.inventory = Inventory.objects.create(product=self.product, quantity_available=10, uom='pcs')
+
+    def stock(self):
+        self.inventory.refresh_from_db()
+        return self.inventory.quantity_available, self.inventory.quantity_reserved
+
+    def test_checkout_holds_and_payment_commits(self):
+        order = reservations.checkout(self.customer, [(self.product.product_id, 4)])
+        self.assertEqual(self.stock(), (6, 4))
+        self.assertEqual(order.items.get().quantity, 4)
+
+        reservations.commit(order)
+        self.assertEqual(self.stock(), (6, 0))
+        self.assertEqual(Order.objects.get(pk=order.pk).payment_status, 'paid')
+        with self.assertRaises(reservations.ReservationClosed):
+            reservations.release(order)
+
+    def test_failed_payment_and_expiry_restock(self):
+        failed = reservations.checkout(self.customer, [(self.product.product_id, 3)])
+        abandoned = reservations.checkout(self.customer, [(self.product.product_id, 5)])
+        self.assertEqual(self.stock(), (2, 8))
+
+        reservations.release(failed)
+        self.assertEqual(self.stock(), (5, 5))
+        self.assertEqual(reservations.expire_stale(now=timezone.now() + timedelta(hours=1)), 1)
+        self.assertEqual(self.stock(), (10, 0))
+        self.assertEqual(Order.objects.get(pk=abandoned.pk).payment_status, 'expired')
+
+    def test_insufficient_stock_keeps_nothing(self):
+        with self.assertRaises(reservations.InsufficientStock):
+            reservations.checkout(self.customer, [(self.product.product_id, 11)])
+        self.assertEqual(self.stock(), (10, 0))
+        self.assertFalse(Order.objects.exists())
+
+    def test_lines_below_one_unit_are_rejected(self):
+        with self.assertRaises(ValueError):
+            reservations.checkout(self.customer, [(self.product.product_id, 2), (self.product.product_id, 0)])
+        clerk = User.objects.create_user('clerk')
+        clerk.user_permissions.add(Permission.objects.get(codename='add_order'))
+        self.client.force_login(clerk)
+        response = self.client.post('/api/order/checkout/', {
+            'customer': str(self.customer.customer_id), 'items': [{'product': str(self.product.product_id), 'quantity': 0}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['detail'], 'Every checkout line needs a quantity of at least 1')
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.stock(), (10, 0))
+
+    def test_deleting_orders_returns_stock_once(self):
+        held = reservations.checkout(self.customer, [(self.product.product_id, 2)])
+        released = reservations.checkout(self.customer, [(self.product.product_id, 3)])
+        reservations.release(released)
+        held.delete()
+        released.delete()
+        self.assertEqual(self.stock(), (10, 0))
+
+
+class ReorderTests(TestCase):
+    def test_drafts_from_cheapest_supplier_once(self):
+        cheap = Supplier.objects.create(supplier_id=uuid.uuid4(), name='Cheap', contacts='1', email='c@example.com', address='Tanga')
+        dear = Supplier.objects.create(supplier_id=uuid.uuid4(), name='Dear', contacts='2', email='d@example.com', address='Tanga')
+        low = make_product('default', name='Low')
+        unsourced = make_product('default', name='Unsourced')
+        stocked = make_product('default', name='Stocked')
+        Inventory.objects.create(product=low, quantity_available=2, reorder_level=30, reorder_quantity=20, uom='pcs')
+        Inventory.objects.create(product=unsourced, quantity_available=0, uom='pcs')
+        Inventory.objects.create(product=stocked, quantity_available=50, uom='pcs')
+        for product, supplier, price in [(low, cheap, '4.00'), (low, dear, '5.00'), (stocked, cheap, '1.00')]:
+            ProductSupplier.objects.create(product=product, supplier=supplier, supply_price=price)
+
+        by_supplier, missing = reorders.suggest()
+        self.assertEqual(missing, [unsourced.product_id])
+        # the shortfall to the reorder level (28) beats reorder_quantity (20)
+        self.assertEqual(dict(by_supplier), {cheap.supplier_id: [(low.product_id, 28, Decimal('4.00'))]})
+
+        (order,) = reorders.create_drafts(by_supplier)
+        self.assertEqual(PurchaseOrder.objects.get().total_cost, Decimal('112.00'))
+        self.assertEqual(order.lines.get().quantity, 28)
+        # already on order: the next run drafts nothing
+        self.assertEqual(dict(reorders.suggest()[0]), {})
+
+
+class ForecastTests(TestCase):
+    def test_steady_demand_sets_cover_and_cycle(self):
+        customer = make_customer('Cy', 'Retailer', 'Mbeya')
+        steady = make_product('default', name='Steady')
+        idle = make_product('default', name='Idle')
+        Inventory.objects.create(product=steady, uom='pcs')
+        Inventory.objects.create(product=idle, uom='pcs', reorder_level=3, reorder_quantity=4)
+        now = timezone.now()
+        for age in range(60):
+            order = Order.objects.create(order_id=uuid.uuid4(), customer=customer, delivery_option='pickup',
+                                         payment_status='paid', order_status='delivered', description='')
+            Order.objects.filter(pk=order.pk).update(order_date=now - timedelta(days=age))
+            OrderItem.objects.bulk_create([OrderItem(order=order, product=steady, quantity=2, unit_price=1, subtotal=2)])
+
+        suggestions = forecasting.forecast(days=60, lead_time=7, review_days=14)
+        # 2 a day with no variance: 7 days of cover, 14 days per order
+        self.assertEqual(suggestions, {steady.product_id: (14, 28)})
+        forecasting.apply(suggestions)
+        self.assertEqual(Inventory.objects.filter(product=steady).values_list('reorder_level', 'reorder_quantity').get(), (14, 28))
+        self.assertEqual(Inventory.objects.filter(product=idle).values_list('reorder_level', 'reorder_quantity').get(), (3, 4))
+
+
+class CatalogImportTests(TestCase):
+    def test_upserts_by_sku_and_reports_bad_rows(self):
+        vendor = make_customer('Mill', 'Business', 'Iringa')
+        existing = make_product('default', name='Old name', vendor=vendor, vendor_sku='A-1')
+        Inventory.objects.create(product=existing, quantity_available=5, uom='pcs')
+        csv_file = io.BytesIO(
+            b"SKU,Name,Price,Type,Category,Quantity\n"
+            b"A-1,New name,,,,8\n"
+            b"B-2,Cedar board,9.5,Softwood,Boards,12\n"
+            b"C-3,No price,,Softwood,Boards,1\n"
+            b"B-2,Again,1,Softwood,Boards,1\n"
+            b"C-3,Larch,4,Softwood,Boards,2\n"
+        )
+
+        result = catalog_import.import_rows(vendor, catalog_import.read_rows(csv_file, 'catalog.csv'), chunk_size=2)
+        self.assertEqual((result['total'], result['created'], result['updated']), (5, 2, 1))
+        # the rejected C-3 row doesn't claim the SKU, so the later valid one imports it
+        self.assertEqual([(e['row'], list(e['errors'])) for e in result['errors']], [(4, ['price']), (5, ['sku'])])
+        self.assertTrue(Product.objects.filter(vendor=vendor, vendor_sku='C-3', ProductName='Larch').exists())
+        resent = catalog_import.import_rows(vendor, [(2, {'sku': 'A-1', 'name': 'New name', 'quantity': '8'})])
+        self.assertEqual((resent['created'], resent['updated'], resent['errors']), (0, 0, []))
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.ProductName, existing.Price_per_unit), ('New name', Decimal('12.50')))
+        self.assertEqual(Inventory.objects.get(product=existing).quantity_available, 8)
+        created = Product.objects.get(vendor=vendor, vendor_sku='B-2')
+        self.assertEqual(Inventory.objects.get(product=created).quantity_available, 12)
+        # stock changes are logged, not applied a second time
+        self.assertEqual(sorted(InventoryLog.objects.values_list('action', 'quantity')), [('IN', 2), ('IN', 3), ('IN', 12)])
+
+    def test_missing_sku_column_is_rejected(self):
+        with self.assertRaises(catalog_import.ImportFileError):
+            list(catalog_import.read_rows(io.BytesIO(b"name,price\nx,1\n"), 'catalog.csv'))
+
+
+class StockAdjustmentTests(TestCase):
+    def setUp(self):
+        self.oak = make_product('default', name='Oak')
+        self.pine = make_product('default', name='Pine')
+        Inventory.objects.create(product=self.oak, quantity_available=10, uom='pcs')
+        clerk = User.objects.create_user('clerk')
+        clerk.user_permissions.add(Permission.objects.get(codename='add_inventorylog'))
+        self.client.force_login(clerk)
+
+    def counters(self, product):
+        return Inventory.objects.filter(product=product).values_list(
+            'quantity_available', 'quantity_reserved', 'quantity_damaged').get()
+
+    def test_batch_applies_net_deltas_and_logs_each_line(self):
+        response = self.client.post('/api/inventory-log/bulk/', [
+            {'product': str(self.oak.product_id), 'action': 'IN', 'quantity': 5},
+            {'product': str(self.oak.product_id), 'action': 'DAMAGED', 'quantity': 2},
+            {'product': str(self.pine.product_id), 'action': 'IN', 'quantity': 7, 'note': 'Receiving'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(self.oak), (13, 0, 2))
+        # no inventory row yet: created on the fly
+        self.assertEqual(self.counters(self.pine), (7, 0, 0))
+        self.assertEqual(InventoryLog.objects.count(), 3)
+
+    def test_batch_is_all_or_nothing(self):
+        response = self.client.post('/api/inventory-log/bulk/', [
+            {'product': str(self.oak.product_id), 'action': 'IN', 'quantity': 5},
+            {'product': str(self.oak.product_id), 'action': 'OUT', 'quantity': 20},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['shortfalls'][0]['change'], -15)
+        self.assertEqual(self.counters(self.oak), (10, 0, 0))
+        self.assertFalse(InventoryLog.objects.exists())
+
+        response = self.client.post('/api/inventory-log/bulk/', [{'product': str(uuid.uuid4()), 'action': 'IN', 'quantity': 1}],
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicate_rows_all_paths_use_the_lowest_pk(self):
+        Inventory.objects.create(product=self.oak, quantity_available=50, uom='pcs')
+        InventoryLog.objects.create(product=self.oak, action='IN', quantity=3)  # the log signal
+        self.client.post('/api/inventory-log/bulk/', [{'product': str(self.oak.product_id), 'action': 'OUT', 'quantity': 1}],
+                         content_type='application/json')
+        self.assertEqual(list(Inventory.objects.filter(product=self.oak).order_by('pk')
+                              .values_list('quantity_available', flat=True)), [12, 50])
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.customer = make_customer('Di', 'Contractor', 'Tanga')
+        self.product = make_product('default')
+        Inventory.objects.create(product=self.product, quantity_available=10, uom='pcs')
+        clerk = User.objects.create_user('clerk')
+        clerk.user_permissions.add(*Permission.objects.filter(codename__in=['add_order', 'add_orderitem']))
+        self.client.force_login(clerk)
+
+    def post(self, url, data, key):
+        return self.client.post(url, data, content_type='application/json', headers={'Idempotency-Key': key})
+
+    def test_retries_replay_instead_of_writing_again(self):
+        order = {'customer': str(self.customer.customer_id), 'delivery_option': 'pickup',
+                 'payment_status': 'pending', 'order_status': 'processing', 'description': 'Yard order'}
+        first = self.post('/api/order/', order, 'order-1')
+        retry = self.post('/api/order/', order, 'order-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+        order_id = first.json()['order_id']
+        item = {'order': order_id, 'product': str(self.product.product_id), 'quantity': 3, 'unit_price': '12.50', 'subtotal': '37.50'}
+        for _ in range(2):
+            self.assertEqual(self.post(f'/api/order/{order_id}/items/', item, 'item-1').status_code, 201)
+        self.assertEqual(OrderItem.objects.count(), 1)
+        self.assertEqual(Inventory.objects.get(product=self.product).quantity_available, 7)
+
+        # same key, different payload
+        self.assertEqual(self.post('/api/order/', dict(order, description='Other'), 'order-1').status_code, 422)
+
+    def test_rejected_requests_leave_the_key_free(self):
+        checkout = {'customer': str(self.customer.customer_id), 'items': [{'product': str(self.product.product_id), 'quantity': 11}]}
+        self.assertEqual(self.post('/api/order/checkout/', checkout, 'checkout-1').status_code, 409)
+        Inventory.objects.filter(product=self.product).update(quantity_available=20)
+        retry = self.post('/api/order/checkout/', checkout, 'checkout-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', retry.headers)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_the_views_own_integrity_error_never_replays_an_expired_key(self):
+        order = {'customer': str(self.customer.customer_id), 'delivery_option': 'pickup',
+                 'payment_status': 'pending', 'order_status': 'processing', 'description': 'Yard order'}
+        self.assertEqual(self.post('/api/order/', order, 'order-1').status_code, 201)
+        expired_at = timezone.now() - timedelta(seconds=1)
+        IdempotencyKey.objects.update(expires_at=expired_at)
+
+        with mock.patch('backend.views.OrderViewSet.perform_create', side_effect=IntegrityError('duplicate')):
+            with self.assertRaises(IntegrityError):
+                self.post('/api/order/', order, 'order-1')
+        self.assertEqual(IdempotencyKey.objects.get().expires_at, expired_at)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class OrderSummaryTests(TestCase):
+    def test_summary_follows_items(self):
+        customer = make_customer('Ed', 'Individual', 'Moshi')
+        product = make_product('default')
+        Inventory.objects.create(product=product, quantity_available=20, uom='pcs')
+
+        order = reservations.checkout(customer, [(product.product_id, 2)])
+        self.assertEqual((order.total_amount, order.line_count, order.total_quantity), (Decimal('25.00'), 1, 2))
+
+        extra = OrderItem.objects.create(order=order, product=product, quantity=3, unit_price='12.50', subtotal='37.50')
+        summary = lambda: Order.objects.values_list('total_amount', 'line_count', 'total_quantity').get(pk=order.pk)
+        self.assertEqual(summary(), (Decimal('62.50'), 2, 5))
+        extra.quantity, extra.subtotal = 1, Decimal('12.50')
+        extra.save()
+        self.assertEqual(summary(), (Decimal('37.50'), 2, 3))
+        extra.delete()
+        self.assertEqual(summary(), (Decimal('25.00'), 1, 2))
+
+
+@override_settings(REPLICA_DATABASE=None)  # list reads stay on the one test database
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('fay')
+        self.customer = make_customer('Fay', 'Contractor', 'Dodoma', user=self.user)
+        now = timezone.now()
+        self.orders = []
+        for age in range(5):
+            order = Order.objects.create(order_id=uuid.uuid4(), customer=self.customer, delivery_option='pickup',
+                                         payment_status='paid', order_status='delivered' if age % 2 else 'processing',
+                                         description='')
+            # two orders share a timestamp: order_id breaks the tie
+            Order.objects.filter(pk=order.pk).update(order_date=now - timedelta(days=min(age, 3)))
+            self.orders.append(order)
+
+    def test_api_pages_through_every_order_once(self):
+        seen, cursor = [], ''
+        while True:
+            body = self.client.get('/api/order/', {'limit': 2, 'cursor': cursor}).json()
+            seen += [row['order_id'] for row in body['results']]
+            cursor = body['next']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(str(order.order_id) for order in self.orders))
+        self.assertEqual(len(seen), 5)
+
+        delivered = self.client.get('/api/order/', {'status': 'delivered'}).json()['results']
+        self.assertEqual(len(delivered), 2)
+        self.assertEqual(self.client.get('/api/order/', {'date_from': 'yesterday'}).status_code, 400)
+
+    def test_orders_page_filters(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('orders'), {'status': 'processing', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['orders']), 2)
+        self.assertIn('cursor=', response.context['next_query'])
+
+
+@override_settings(REPLICA_DATABASE=None)
+class OrderDetailTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('gus')
+        self.customer = make_customer('Gus', 'Individual', 'Tanga', user=self.user)
+        self.order = Order.objects.create(order_id=uuid.uuid4(), customer=self.customer, delivery_option='delivery',
+                                          payment_status='paid', order_status='processing', description='')
+
+    def add_lines(self, count):
+        for i in range(count):
+            product = make_product('default', name=f'Plank {i}')
+            # the sale takes one off: i left in stock
+            Inventory.objects.create(product=product, quantity_available=i + 1, uom='pcs')
+            OrderItem.objects.create(order=self.order, product=product, quantity=1, unit_price=2, subtotal=2)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        self.add_lines(1)
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/order/{self.order.pk}/items/')
+        self.add_lines(4)
+        with self.assertNumQueries(2):
+            lines = self.client.get(f'/api/order/{self.order.pk}/items/').json()
+        self.assertEqual([line['product_name'] for line in lines], [f'Plank {i}' for i in (0, 0, 1, 2, 3)])
+        self.assertEqual([line['stock_available'] for line in lines], [0, 0, 1, 2, 3])
+
+        with self.assertNumQueries(2):
+            body = self.client.get(f'/api/order/{self.order.pk}/delivery_status/').json()
+        self.assertEqual(body, {'message': 'Delivery not yet assigned'})
+        Delivery.objects.create(order=self.order, delivery_date=timezone.localdate(), delivery_address='Pier 4',
+                                driver_name='Ali', transport_cost='15.00', delivery_status='scheduled')
+        body = self.client.get(f'/api/order/{self.order.pk}/delivery_status/').json()
+        self.assertEqual(body['driver_name'], 'Ali')
+
+    def test_page_shows_lines_and_hides_other_customers_orders(self):
+        self.add_lines(3)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('order_detail', args=[self.order.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Plank 2')
+        self.assertContains(response, 'Delivery not yet assigned')
+
+        stranger = User.objects.create_user('hal')
+        make_customer('Hal', 'Individual', 'Tanga', user=stranger)
+        self.client.force_login(stranger)
+        self.assertEqual(self.client.get(reverse('order_detail', args=[self.order.pk])).status_code, 404)
+
+
+class DeliveryPlanningTests(TestCase):
+    def setUp(self):
+        self.orders = {}
+        for area, units in [('Arusha', 4), ('Moshi', 3), ('Mwanza', 8), ('Nowhere', 1)]:
+            customer = make_customer(area, 'Retailer', area)
+            order = Order.objects.create(order_id=uuid.uuid4(), customer=customer, delivery_option='delivery',
+                                         payment_status='paid', order_status='processing', description='')
+            Order.objects.filter(pk=order.pk).update(total_quantity=units)
+            self.orders[area] = order
+        self.day = timezone.localdate()
+        # booked already, without a driver: re-planned with the rest
+        Delivery.objects.create(order=self.orders['Moshi'], delivery_date=self.day, delivery_address='Plot 9, Moshi',
+                                driver_name='', transport_cost=0, delivery_status='scheduled')
+
+    def distances(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fh:
+            fh.write(",Depot,Arusha,Moshi,Mwanza\n"
+                     "Depot,0,10,10,50\n"
+                     "Arusha,10,1,2,50\n"
+                     "Moshi,10,2,1,50\n"
+                     "Mwanza,50,50,50,1\n")
+        self.addCleanup(os.remove, fh.name)
+        return delivery_planning.load_distances(fh.name)
+
+    def test_routes_respect_capacity_and_share_cost(self):
+        result = delivery_planning.plan(self.day, self.distances(), ['Ana', 'Ben'], capacity=10,
+                                        cost_per_km=Decimal('1.00'), cost_per_route=Decimal('0.00'))
+        routes = sorted(result['routes'], key=lambda route: route['km'])
+        # Arusha and Moshi share a vehicle (7 units), Mwanza goes alone; the longest route is taken first
+        self.assertEqual([(route['driver'], route['units'], route['km']) for route in routes],
+                         [('Ben', 7, 22.0), ('Ana', 8, 100.0)])
+        self.assertEqual(sum(drop['cost'] for drop in routes[0]['drops']), Decimal('22.00'))
+        self.assertEqual([drop['order'] for drop in result['unplanned']], [self.orders['Nowhere'].order_id])
+
+        self.assertEqual(delivery_planning.save(self.day, result), (1, 2))
+        moshi = Delivery.objects.get(order=self.orders['Moshi'])
+        self.assertEqual((moshi.driver_name, moshi.delivery_address), ('Ben', 'Plot 9, Moshi'))
+        self.assertEqual(Delivery.objects.get(order=self.orders['Mwanza']).transport_cost, Decimal('100.00'))
+        self.assertFalse(Delivery.objects.filter(order=self.orders['Nowhere']).exists())
+
+    def test_oversize_loads_split_by_capacity(self):
+        drops = [{'order': i, 'delivery': None, 'area': 'Arusha', 'address': '', 'units': 4} for i in range(5)]
+        result = delivery_planning.plan(self.day, self.distances(), ['Ana'], capacity=10, drops=drops)
+        self.assertEqual(sorted(route['units'] for route in result['routes']), [4, 8, 8])
+
+
+@override_settings(REPLICA_DATABASE=None)
+class DeliveryStatusTests(TestCase):
+    def setUp(self):
+        customer = make_customer('Ida', 'Retailer', 'Iringa')
+        self.today = timezone.localdate()
+        self.deliveries = []
+        for driver, status in [('Juma', 'scheduled'), ('Juma', 'out_for_delivery'), ('Juma', 'delivered'),
+                               ('Neema', 'scheduled')]:
+            order = Order.objects.create(order_id=uuid.uuid4(), customer=customer, delivery_option='delivery',
+                                         payment_status='paid', order_status='processing', description='')
+            self.deliveries.append(Delivery.objects.create(
+                order=order, delivery_date=self.today, delivery_address='Plot 1, Iringa', driver_name=driver,
+                transport_cost='10.00', delivery_status=status,
+            ))
+        dispatcher = User.objects.create_user('dispatcher')
+        dispatcher.user_permissions.add(Permission.objects.get(codename='add_delivery'))
+        self.client.force_login(dispatcher)
+
+    def post(self, pks, status):
+        return self.client.post('/api/delivery/bulk_status/', {'deliveries': pks, 'status': status},
+                                content_type='application/json')
+
+    def test_bulk_delivered_settles_orders(self):
+        pks = [delivery.pk for delivery in self.deliveries[:3]]
+        response = self.post(pks, 'delivered')
+        self.assertEqual(response.json(), {'status': 'delivered', 'changed': 2})
+        self.assertEqual(set(Order.objects.filter(delivery__in=pks).values_list('order_status', flat=True)), {'delivered'})
+        self.assertEqual(Order.objects.get(delivery=self.deliveries[3]).order_status, 'processing')
+
+    def test_refused_row_rolls_back_the_batch(self):
+        response = self.post([self.deliveries[0].pk, self.deliveries[2].pk, 999], 'failed')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['refused'], [{'delivery': self.deliveries[2].pk, 'status': 'delivered'},
+                                                      {'delivery': 999, 'status': None}])
+        self.assertEqual(Delivery.objects.get(pk=self.deliveries[0].pk).delivery_status, 'scheduled')
+        self.assertEqual(self.post([], 'failed').status_code, 400)
+
+    def test_manifest_lists_one_drivers_day(self):
+        body = self.client.get('/api/delivery/manifest/', {'driver': 'Juma'}).json()
+        self.assertEqual([stop['status'] for stop in body['stops']], ['delivered', 'out_for_delivery', 'scheduled'])
+        self.assertEqual(body['stops'][0]['customer'], 'Ida')
+        stops = self.client.get('/api/delivery/manifest/', {'driver': 'Juma', 'status': 'scheduled'}).json()['stops']
+        self.assertEqual([stop['delivery'] for stop in stops], [self.deliveries[0].pk])
+        self.assertEqual(self.client.get('/api/delivery/manifest/').status_code, 400)
+
+
+@override_settings(REPLICA_DATABASE=None)
+class SupplierCatalogTests(TestCase):
+    def setUp(self):
+        self.oak = make_product('default', name='Oak')
+        self.pine = make_product('default', name='Pine')
+        self.acme, self.bolt = [
+            Supplier.objects.create(supplier_id=uuid.uuid4(), name=name, contacts='1', email=f'{name}@example.com',
+                                    address='Tanga')
+            for name in ('Acme', 'Bolt')
+        ]
+        buyer = User.objects.create_user('buyer')
+        buyer.user_permissions.add(Permission.objects.get(codename='add_supplier'))
+        self.client.force_login(buyer)
+
+    def cheapest(self, product):
+        return CheapestSupplier.objects.filter(product=product).values_list('supplier_id', 'supply_price', 'offers').first()
+
+    def test_cheapest_follows_offer_changes(self):
+        offer = ProductSupplier.objects.create(product=self.oak, supplier=self.acme, supply_price='5.00')
+        ProductSupplier.objects.create(product=self.oak, supplier=self.bolt, supply_price='6.00')
+        self.assertEqual(self.cheapest(self.oak), (self.acme.pk, Decimal('5.00'), 2))
+        offer.supply_price = Decimal('7.00')
+        offer.save()
+        self.assertEqual(self.cheapest(self.oak), (self.bolt.pk, Decimal('6.00'), 2))
+        # deleting a supplier hands its products to the next cheapest
+        self.bolt.delete()
+        self.assertEqual(self.cheapest(self.oak), (self.acme.pk, Decimal('7.00'), 1))
+        self.acme.delete()
+        self.assertIsNone(self.cheapest(self.oak))
+
+    def test_supplier_delete_refreshes_once(self):
+        for product, supplier, price in [(self.oak, self.acme, '5.00'), (self.pine, self.acme, '3.00'),
+                                         (self.pine, self.bolt, '4.00')]:
+            ProductSupplier.objects.create(product=product, supplier=supplier, supply_price=price)
+        with mock.patch.object(supplier_catalog, 'refresh', wraps=supplier_catalog.refresh) as refresh:
+            self.acme.delete()
+        refresh.assert_called_once()
+        self.assertIsNone(self.cheapest(self.oak))
+        self.assertEqual(self.cheapest(self.pine), (self.bolt.pk, Decimal('4.00'), 1))
+
+    def test_price_list_upload(self):
+        ProductSupplier.objects.create(product=self.oak, supplier=self.bolt, supply_price='6.00')
+        url = f'/api/supplier/{self.acme.pk}/prices/'
+        lines = [{'product': str(self.oak.product_id), 'price': '5.50'}, {'product': str(self.pine.product_id), 'price': '3'}]
+        self.assertEqual(self.client.post(url, lines, content_type='application/json').json(),
+                         {'created': 2, 'updated': 0, 'unchanged': 0})
+        lines[1]['price'] = '2.75'
+        self.assertEqual(self.client.post(url, lines, content_type='application/json').json(),
+                         {'created': 0, 'updated': 1, 'unchanged': 1})
+        self.assertEqual(self.cheapest(self.oak), (self.acme.pk, Decimal('5.50'), 2))
+        self.assertEqual(self.cheapest(self.pine), (self.acme.pk, Decimal('2.75'), 1))
+        unknown = [{'product': str(uuid.uuid4()), 'price': '1'}]
+        self.assertEqual(self.client.post(url, unknown, content_type='application/json').status_code, 400)
+
+        listing = self.client.get(f'/api/supplier/{self.bolt.pk}/products/').json()
+        self.assertEqual([(row['name'], row['is_cheapest'], row['cheapest_price']) for row in listing],
+                         [('Oak', False, 5.5)])
+        rows = self.client.get('/api/supplier/cheapest/', {'product': [self.oak.product_id, self.pine.product_id]}).json()
+        self.assertEqual({row['supplier_name'] for row in rows}, {'Acme'})
+        self.assertEqual(self.client.get('/api/supplier/').status_code, 200)
+
+
+@override_settings(REPLICA_DATABASE=None)
+class MarginReportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('vera')
+        self.vendor = make_customer('Vera Timber', 'Business', 'Arusha', user=self.user)
+        self.oak = make_product('default', name='Oak', vendor=self.vendor)
+        self.pine = make_product('default', name='Pine')
+        Product.objects.filter(pk=self.pine.pk).update(Category='Boards')
+        for product in (self.oak, self.pine):
+            Inventory.objects.create(product=product, quantity_available=100, uom='pcs')
+        supplier = Supplier.objects.create(supplier_id=uuid.uuid4(), name='Acme', contacts='1', email='a@example.com',
+                                           address='Tanga')
+        ProductSupplier.objects.create(product=self.oak, supplier=supplier, supply_price='5.00')
+        self.month = margins.month_start(timezone.localdate())
+        self.sell([(self.oak, 2), (self.pine, 1)])
+        self.sell([(self.oak, 10)], status='cancelled')
+        self.sell([(self.oak, 1)], when=timezone.now() - timedelta(days=timezone.localdate().day + 14))
+        call_command('build_margin_reports', months=2, stdout=io.StringIO())
+
+    def sell(self, lines, status='processing', when=None):
+        order = Order.objects.create(order_id=uuid.uuid4(), customer=self.vendor, delivery_option='pickup',
+                                     payment_status='paid', order_status=status, description='')
+        for product, quantity in lines:
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, unit_price='12.50',
+                                     subtotal=Decimal('12.50') * quantity)
+        if when:
+            Order.objects.filter(pk=order.pk).update(order_date=when)
+
+    def row(self, grouping, month=None):
+        return margins.as_dict(margins.rows(margins.get(month or self.month), grouping).first())
+
+    def test_month_totals_and_groupings(self):
+        total = self.row('total')
+        self.assertEqual((total['revenue'], total['cost'], total['margin'], total['uncosted_revenue']),
+                         (Decimal('37.50'), Decimal('10.00'), Decimal('15.00'), Decimal('12.50')))
+        self.assertEqual(total['margin_pct'], Decimal('60.0'))
+        categories = {row.key: row.revenue for row in margins.rows(margins.get(self.month), 'category')}
+        self.assertEqual(categories, {'Planks': Decimal('25.00'), 'Boards': Decimal('12.50')})
+        self.assertEqual(self.row('vendor')['label'], 'Vera Timber')
+        self.assertEqual(self.row('total', margins.previous_month(self.month))['units'], 1)
+
+    def test_reads_serve_the_stored_report_until_rebuilt(self):
+        self.sell([(self.oak, 1)])
+        self.client.force_login(User.objects.create_user('boss', is_staff=True))
+        with override_settings(MARGIN_REPORT_TTL_SECONDS=0):
+            response = self.client.get('/api/reports/margins/').json()
+        self.assertEqual((response['rows'][0]['lines'], response['stale']), (2, True))
+        self.assertEqual(self.client.get('/api/reports/margins/', {'month': '2001-01'}).json()['rows'], [])
+
+        call_command('build_margin_reports', months=1, stdout=io.StringIO())
+        response = self.client.get('/api/reports/margins/').json()
+        self.assertEqual((response['rows'][0]['lines'], response['stale']), (3, False))
+
+    def test_api_and_dashboard(self):
+        self.assertEqual(self.client.get('/api/reports/margins/').status_code, 403)
+        self.client.force_login(User.objects.create_user('boss', is_staff=True))
+        rows = self.client.get('/api/reports/margins/', {'group': 'product'}).json()['rows']
+        self.assertEqual([row['label'] for row in rows], ['Oak', 'Pine'])
+        with self.assertNumQueries(2):
+            trend = margins.trend(self.month, 36)
+        self.assertEqual([row.get('lines') for row in trend[-3:]], [None, 1, 2])
+        trend = self.client.get('/api/reports/margins/', {'group': 'period', 'months': 2}).json()['rows']
+        self.assertEqual([row['lines'] for row in trend], [1, 2])
+        self.assertEqual(self.client.get('/api/reports/margins/', {'month': 'May'}).status_code, 400)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['margin_total']['margin'], Decimal('15.00'))
+        self.assertEqual([row['label'] for row in response.context['margin_products']], ['Oak'])
+
+
+class MetricsTests(SimpleTestCase):
+    def test_scrape_sums_live_dumps_and_drops_stale_ones(self):
+        worker = metrics.MetricsRegistry()
+        worker.inc('masada_cart_operations_total', 2, operation='test-add')
+        worker.observe('masada_http_request_duration_seconds', 0.02, view='test-view')
+        metrics.inc('masada_cart_operations_total', operation='test-add')
+        with tempfile.TemporaryDirectory() as dump_dir:
+            (Path(dump_dir) / 'metrics-1-live.json').write_text(json.dumps(worker.to_dict()))
+            stale = Path(dump_dir) / 'metrics-2-dead.json'
+            stale.write_text(json.dumps(worker.to_dict()))
+            os.utime(stale, (time.time() - 120, time.time() - 120))
+
+            text = metrics.collect(dump_dir, max_age=60).render()
+            self.assertFalse(stale.exists())
+            dumps.remove(dump_dir, 'metrics')  # what the exit hook does
+            self.assertEqual([path.name for path in Path(dump_dir).iterdir()], ['metrics-1-live.json'])
+
+        self.assertIn('# TYPE masada_cart_operations_total counter', text)
+        self.assertIn('masada_cart_operations_total{operation="test-add"} 3', text)
+        self.assertIn('masada_http_request_duration_seconds_bucket{view="test-view",le="0.025"} 1', text)
+        self.assertIn('masada_http_request_duration_seconds_count{view="test-view"} 1', text)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_DUMP_DIR=None, REPLICA_DATABASE=None)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        profiling.registry.reset()
+        make_product('default')
+
+    def test_middleware_records_each_view(self):
+        self.client.get('/api/products/')
+        self.client.get('/api/products/')
+        profile = profiling.registry.snapshot()['products-list']
+        self.assertEqual(profile.requests, 2)
+        self.assertEqual(profile.histograms['queries'].count, 2)
+        self.assertGreater(profile.histograms['queries'].sum, 0)
+        self.assertGreater(profile.histograms['response_bytes'].sum, 0)
+
+    def test_report_merges_worker_dumps_and_resets(self):
+        other = profiling.ViewProfile()
+        other.observe(total_ms=5, sql_ms=1, template_ms=0, queries=2, response_bytes=100)
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        self.client.get('/api/products/')
+        with tempfile.TemporaryDirectory() as dump_dir, override_settings(PROFILING_DUMP_DIR=dump_dir):
+            (Path(dump_dir) / 'profile-1-other.json').write_text(json.dumps({'products-list': other.to_dict()}))
+            report = self.client.get(reverse('profiling-report')).json()
+            self.assertEqual(report['views']['products-list']['requests'], 2)
+
+            self.assertEqual(self.client.delete(reverse('profiling-report')).status_code, 204)
+            self.assertEqual(list(Path(dump_dir).glob('profile-*.json')), [])
+        self.assertNotIn('products-list', profiling.registry.snapshot())
+
+
+def png_upload(name='plank.png', size=(1200, 900)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (150, 110, 60)).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.user = User.objects.create_user('mill')
+        make_customer('Mill', 'Business', 'Iringa', user=self.user)
+        self.client.force_login(self.user)
+
+    def add_product(self, image):
+        return self.client.post(reverse('add_product'), {
+            'name': 'Teak board', 'price': '20.00', 'type': 'Hardwood', 'category': 'Boards', 'dimensions': '1x6',
+            'description': 'Oiled', 'quantity': 3, 'image': image,
+        })
+
+    def test_upload_gets_resized_variants_and_a_picture_tag(self):
+        self.add_product(png_upload())
+        product = Product.objects.get(ProductName='Teak board')
+        variants = product.image_variants
+        self.assertEqual(variants['source'], product.image.name)
+        self.assertEqual([(variants[name]['width'], variants[name]['height']) for name in images.IMAGE_SIZES],
+                         [(160, 120), (400, 300), (800, 600)])
+        self.assertFalse(images.variants_outdated(product))
+
+        html = Template("{% load product_images %}{% product_picture product 'card' %}").render(Context({'product': product}))
+        self.assertIn('<picture>', html)
+        self.assertIn(f"{variants['card']['webp']}", html)
+        self.assertIn('width="400" height="300"', html)
+
+    def test_non_image_upload_is_rejected_before_saving(self):
+        self.add_product(SimpleUploadedFile('plank.png', b'not really a png', content_type='image/png'))
+        self.assertFalse(Product.objects.exists())
+
+    @override_settings(REPLICA_DATABASE=None,
+                       STORAGES={'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                                 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+    def test_home_hero_uses_resized_renditions(self):
+        html = self.client.get(reverse('home')).content.decode()
+        for layer in images.HERO_IMAGES:
+            self.assertIn(f'/static/images/hero/{layer}-960.webp', html)
+            self.assertTrue((images.STATIC_DIR / images.hero_path(layer, 1920, 'webp')).exists())
+        self.assertNotIn(images.HERO_IMAGES['tree'], html)
+
+
+class StaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.css = b"body { color: #333; }\n" * 100
+        (Path(root.name) / 'app.1a2b3c4d.css').write_bytes(self.css)
+        (Path(root.name) / 'robots.txt').write_text("User-agent: *\n")  # too small to compress
+        self.root = Path(root.name)
+        (Path(root.name) / 'staticfiles.json').write_text(json.dumps({'version': '1.1', 'paths': {'app.css': 'app.1a2b3c4d.css'}}))
+        CompressedManifestStaticFilesStorage(location=root.name).compress('app.1a2b3c4d.css')
+        self.app = StaticFilesMiddleware(lambda environ, start_response: [b'django'], root.name, '/static/')
+
+    def get(self, path, **headers):
+        response = {}
+
+        def start_response(status, headers):
+            response.update(status=status, headers=dict(headers))
+        body = b''.join(self.app(RequestFactory().get(path, **headers).environ, start_response))
+        return response.get('status'), response.get('headers'), body
+
+    def test_compression_step_writes_smaller_siblings(self):
+        siblings = sorted(path.name for path in self.root.glob('app.*.css.*'))
+        # brotli is optional
+        self.assertEqual(siblings, ['app.1a2b3c4d.css.br'] * bool(staticfiles._load_brotli()) + ['app.1a2b3c4d.css.gz'])
+        status, headers, body = self.get('/static/app.1a2b3c4d.css', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual((status, headers['Content-Encoding']), ('200 OK', 'gzip'))
+        self.assertEqual(gzip.decompress(body), self.css)
+        self.assertEqual(headers['Content-Length'], str(len(body)))
+
+    def test_encoding_negotiation_honours_q(self):
+        encoding = lambda accept: self.get('/static/app.1a2b3c4d.css', HTTP_ACCEPT_ENCODING=accept)[1].get('Content-Encoding')
+        self.assertEqual(encoding('gzip, br'), 'br')
+        self.assertEqual(encoding('br;q=0, gzip'), 'gzip')
+        self.assertEqual(encoding('gzip;q=0.5, br;q=0.2'), 'gzip')
+        self.assertIsNone(encoding('br;q=0, gzip;q=0'))
+        self.assertIsNone(encoding('*;q=0'))
+        status, headers, body = self.get('/static/app.1a2b3c4d.css')
+        self.assertEqual((body, headers['Vary']), (self.css, 'Accept-Encoding'))
+
+    def test_cache_headers_and_revalidation(self):
+        _, hashed, _ = self.get('/static/app.1a2b3c4d.css')
+        _, plain, _ = self.get('/static/robots.txt')
+        self.assertEqual((hashed['Cache-Control'], plain['Cache-Control']), (IMMUTABLE_CACHE, SHORT_CACHE))
+        self.assertEqual(plain['Content-Type'], 'text/plain; charset=utf-8')
+        status, headers, body = self.get('/static/robots.txt', HTTP_IF_NONE_MATCH=plain['ETag'])
+        self.assertEqual((status, body), ('304 Not Modified', b''))
+        # anything not collected goes on to Django
+        self.assertEqual(self.get('/static/missing.css')[2], b'django')
+
+
+@override_settings(REPLICA_DATABASE=None)
+class HotQueryIndexTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        vendor = make_customer('Mill', 'Business', 'Iringa')
+        product = make_product('default', vendor=vendor)
+        Inventory.objects.create(product=product, quantity_available=20, reorder_level=5, uom='pcs')
+        order = Order.objects.create(order_id=uuid.uuid4(), customer=vendor, delivery_option='pickup',
+                                     payment_status='paid', order_status='processing', description='')
+        OrderItem.objects.create(order=order, product=product, quantity=1, unit_price='12.50', subtotal='12.50')
+
+        out = io.StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(all(line.startswith('INDEX ') for line in lines), out.getvalue())
+
+
+@override_settings(REPLICA_DATABASE=None)
+class BenchmarkSmokeTests(TestCase):
+    def test_seed_then_benchmark_every_url(self):
+        call_command('seed_benchmark', customers=20, vendors=3, products=30, suppliers=4, orders=40, logs=30,
+                     users_per_type=1, stdout=io.StringIO())
+        self.assertEqual((Customer.objects.count(), Product.objects.count(), Order.objects.count()), (23, 30, 40))
+        self.assertEqual(Inventory.objects.count(), 30)
+        self.assertTrue(CheapestSupplier.objects.exists())
+
+        with tempfile.TemporaryDirectory() as out:
+            call_command('run_benchmark', iterations=1, warmup=0, json_path=f'{out}/results.json', stdout=io.StringIO())
+            results = json.loads(Path(f'{out}/results.json').read_text())
+        self.assertEqual({row['identity'] for row in results}, set(run_benchmark.IDENTITIES))
+        self.assertEqual([row['url'] for row in results if row['status'] >= 500], [])
+
+
+def load_prod_settings(**env):
+    """A fresh import of masadaback.settings.prod with env added to os.environ"""
+    sys.modules.pop('masadaback.settings.prod', None)
+    with mock.patch.dict(os.environ, env):
+        try:
+            return importlib.import_module('masadaback.settings.prod')
+        finally:
+            sys.modules.pop('masadaback.settings.prod', None)
+
+
+class TemplateWarmupTests(SimpleTestCase):
+    def test_every_frontend_template_compiles_under_the_prod_loaders(self):
+        names = template_cache.frontend_template_names()
+        self.assertIn('frontend/base.html', names)
+        prod = load_prod_settings(DJANGO_SECRET_KEY='warm-up-test-key')
+        with override_settings(TEMPLATES=prod.TEMPLATES), self.assertNoLogs('backend.template_cache', 'WARNING'):
+            self.assertEqual(template_cache.warm_templates(), len(names))
+            loader = engines['django'].engine.template_loaders[0]
+            self.assertIsInstance(loader, cached.Loader)
+            self.assertTrue(set(names) <= set(loader.get_template_cache))
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def environ(self, **values):
+        """Patch os.environ to just the DB_* values given"""
+        patcher = mock.patch.dict(os.environ, values)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in [name for name in os.environ if name.startswith('DB_') and name not in values]:
+            del os.environ[name]
+
+    def test_profile_defaults_and_env_overrides(self):
+        self.environ()
+        database = base_settings.database_from_env(conn_max_age=60, health_checks=True)
+        self.assertEqual((database['ENGINE'], database['NAME'], database['HOST'], database['PORT']),
+                         ('django.db.backends.postgresql', 'masada', 'localhost', '5432'))
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertNotIn('OPTIONS', database)
+
+        self.environ(DB_NAME='shop', DB_HOST='db.internal', DB_CONN_MAX_AGE='5', DB_CONN_HEALTH_CHECKS='off')
+        database = base_settings.database_from_env(conn_max_age=60, health_checks=True)
+        self.assertEqual((database['NAME'], database['HOST']), ('shop', 'db.internal'))
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (5, False))
+
+    def test_pool_replaces_persistent_connections_when_available(self):
+        self.environ(DB_POOL_MAX_SIZE='20')
+        with mock.patch.object(base_settings, 'pool_available', return_value=True):
+            database = base_settings.database_from_env(conn_max_age=60, health_checks=True, pool=True)
+        self.assertEqual(database['OPTIONS'], {'pool': {'min_size': 2, 'max_size': 20, 'timeout': 10}})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+        with mock.patch.object(base_settings, 'pool_available', return_value=False):
+            database = base_settings.database_from_env(conn_max_age=60, pool=True)
+        self.assertNotIn('OPTIONS', database)
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+
+        self.environ(DB_POOL='0')
+        with mock.patch.object(base_settings, 'pool_available', return_value=True):
+            self.assertNotIn('OPTIONS', base_settings.database_from_env(pool=True))
+        self.assertFalse(base_settings.pool_available('django.db.backends.sqlite3'))
+
+    def test_replica_copies_the_primary_and_mirrors_it_in_tests(self):
+        self.environ()
+        self.assertEqual(list(base_settings.databases_from_env()), ['default'])
+
+        self.environ(DB_USER='app', DB_REPLICA_HOST='replica.internal')
+        databases = base_settings.databases_from_env(health_checks=True)
+        replica = databases['replica']
+        self.assertEqual((replica['HOST'], replica['USER'], replica['NAME']), ('replica.internal', 'app', 'masada'))
+        self.assertTrue(replica['CONN_HEALTH_CHECKS'])
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+        self.assertNotIn('TEST', databases['default'])
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def test_production_refuses_the_committed_secret_key(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DJANGO_SECRET_KEY', None)
+            with self.assertRaisesMessage(ImproperlyConfigured, 'DJANGO_SECRET_KEY'):
+                load_prod_settings()
+        with self.assertRaisesMessage(ImproperlyConfigured, 'DJANGO_SECRET_KEY'):
+            load_prod_settings(DJANGO_SECRET_KEY='django-insecure-copied-from-dev')
+        self.assertEqual(load_prod_settings(DJANGO_SECRET_KEY='a-private-key').SECRET_KEY, 'a-private-key')
+
+class LayoutTests(SimpleTestCase):
+    def test_the_app_next_to_manage_py_is_the_only_copy(self):
+        layout.ensure_single_backend()
+        self.assertEqual(layout.backend_copies(), [Path(settings.BASE_DIR).resolve() / 'backend'])
+
+    def test_a_second_copy_on_sys_path_refuses_to_start(self):
+        with tempfile.TemporaryDirectory() as stray:
+            (Path(stray) / 'backend').mkdir()
+            (Path(stray) / 'backend' / '__init__.py').touch()
+            with mock.patch.object(sys, 'path', [*sys.path, stray]):
+                with self.assertRaisesMessage(ImproperlyConfigured, f"other copies: {Path(stray).resolve() / 'backend'}"):
+                    layout.ensure_single_backend()
+
+    def test_a_package_project_directory_refuses_to_start(self):
+        with tempfile.TemporaryDirectory() as project, override_settings(BASE_DIR=Path(project)):
+            (Path(project) / '__init__.py').touch()
+            with self.assertRaisesMessage(ImproperlyConfigured, 'turns the project directory into a package'):
+                layout.ensure_single_backend()
+
+
+class ColdStartTests(SimpleTestCase):
+    def test_worker_boot_leaves_heavy_imports_for_first_use(self):
+        probe = (
+            "import gc, json, mimetypes, sys, masadaback.wsgi, masadaback.urls\n"
+            "print(json.dumps({'modules': [name for name in ('PIL', 'brotli', 'backend.images') if name in sys.modules],"
+            " 'mime_types_read': mimetypes.inited, 'gc_enabled': gc.isenabled(), 'frozen': gc.get_freeze_count()}))\n"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'masadaback.settings.test'}
+        result = subprocess.run([sys.executable, '-c', probe], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+        boot = json.loads(result.stdout.splitlines()[-1])
+        self.assertEqual(boot['modules'], [])
+        self.assertFalse(boot['mime_types_read'])
+        self.assertTrue(boot['gc_enabled'])
+        self.assertGreater(boot['frozen'], 0)
+
+
+@override_settings(REPLICA_DATABASE=None)
+class CartCountTests(TestCase):
+    def test_badge_shows_the_session_quantity_on_every_page(self):
+        oak, pine = make_product('default', name='Oak'), make_product('default', name='Pine')
+        session = self.client.session
+        session['cart'] = {
+            str(oak.pk): {'name': 'Oak', 'price': 12.5, 'quantity': 3, 'product_type': 'Hardwood'},
+            str(pine.pk): {'name': 'Pine', 'price': 4.0, 'quantity': 2, 'product_type': 'Softwood'},
+        }
+        session.save()
+
+        for url in (reverse('home'), reverse('shop'), reverse('cart')):
+            response = self.client.get(url)
+            self.assertContains(response, '<span id="cart-count" class="cart-count">5</span>', html=True)
+            # rendered server-side: the refresh helper is defined but nothing calls it on load
+            self.assertEqual(response.content.decode().count('updateCartCount('), 1)
+        self.assertContains(response, '2 products in your cart.')
@@ -1,7 +1,7 @@
 # from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
 from django.urls import path, include
-from .views import (ProductViewSet, CustomerViewSet, OrderItemViewSet, OrderViewSet, InventoryViewSet, InventoryLogViewSet, SupplierViewSet, DeliveryViewSet)
+from .views import (ProductViewSet, CustomerViewSet, OrderItemViewSet, OrderViewSet, InventoryViewSet, InventoryLogViewSet, SupplierViewSet, DeliveryViewSet, margin_report, profiling_report)
 
 router = routers.DefaultRouter()
 router.register(r'products', ProductViewSet, basename='products')
@@ -24,6 +24,8 @@ order_router = routers.NestedDefaultRouter(router, 'order', lookup='order')
 order_router.register('items', OrderItemViewSet, basename='order-item')
 
 urlpatterns = [
+    path('profiling/', profiling_report, name='profiling-report'),
+    path('reports/margins/', margin_report, name='margin-report'),
     path('', include(router.urls)),
     path('', include(supplier_router.urls)),
     path('', include(order_router.urls)),
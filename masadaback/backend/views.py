@@ -1,22 +1,43 @@
 # from django.shortcuts import render
-from django.shortcuts import render
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets
 from rest_framework.response import Response
-from rest_framework.decorators import action
-from .models import (Product, Customer, Order, OrderItem, Inventory, InventoryLog, Delivery)
-from .serializers import (ProductSerializer, CustomerSerializer, OrderSerializer, OrderItemSerializer, InventorySerializer, InventoryLogSerializer, SupplierSerializer, DeliverySerializer)
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from . import db_routers, delivery_status, margins, metrics, order_detail, order_history, profiling, reorders, reservations, stock, supplier_catalog
+from .idempotency import idempotent
+from .models import (Product, Customer, Order, OrderItem, Inventory, InventoryLog, Delivery, Supplier)
+from .serializers import (ProductSerializer, CustomerSerializer, OrderSerializer, OrderItemSerializer, OrderLineSerializer, InventorySerializer, InventoryLogSerializer, StockAdjustmentSerializer, SupplierSerializer, SupplierPriceSerializer, DeliverySerializer, DeliveryStatusSerializer)
 
 # Custom 404 view
 def custom_404_view(request, exception=None):
     return render(request, 'frontend/404.html', status=404)
 
+class ReplicaReadMixin:
+    """ViewSet mixin: replica_actions read from the replica database, every other action stays on primary"""
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.action_map.get(request.method.lower()) in self.replica_actions:
+            with db_routers.use_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
 # Create your views here.
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    replica_actions = ('list', 'retrieve', 'inventory')
     
     @action(detail=True, methods=['get'])
-    def inventory(self, request, pk=None):
+    def inventory(self, request, pk=None, **kwargs):
         product = self.get_object()
         try:
             inventory = Inventory.objects.get(product=product)
@@ -24,49 +45,289 @@ class ProductViewSet(viewsets.ModelViewSet):
         except Inventory.DoesNotExist:
             return Response({"detail": "No inventory found"}, status=404)
         
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    pagination_class = order_history.OrderKeysetPagination
     
-    @action(detail=True, methods=['get'])
+    def get_queryset(self):
+        if self.action in ('retrieve', 'items', 'delivery_status'):
+            # items, products, stock and delivery ride along with the lookup: two queries per order
+            return order_detail.detail_queryset()
+        return super().get_queryset()
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+        if params.get('customer'):
+            try:
+                queryset = queryset.filter(customer_id=uuid.UUID(params['customer']))
+            except ValueError:
+                raise order_history.InvalidFilter("customer must be a customer_id")
+        return order_history.filter_orders(queryset, params).prefetch_related('items')
+    
+    def list(self, request, *args, **kwargs):
+        """?status=&payment_status=&delivery_option=&date_from=&date_to=&customer= with keyset paging"""
+        try:
+            return super().list(request, *args, **kwargs)
+        except order_history.InvalidFilter as exc:
+            return Response({"detail": str(exc)}, status=400)
+    
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        # order_id has no default; without one every POST failed on the primary key
+        serializer.save(order_id=uuid.uuid4())
+    
+    @action(detail=True, methods=['get', 'post'])
+    @idempotent
     def items(self, request, pk=None):
         order = self.get_object()
-        items = OrderItem.objects.filter(order=order)
-        return Response(OrderItemSerializer(items, many=True).data)
+        if request.method == 'POST':
+            # this route shadows the nested order -> items router, so adding a line lands here
+            serializer = OrderItemSerializer(data={**request.data, 'order': order.pk})
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return Response(serializer.data, status=201)
+        return Response(OrderLineSerializer(order.items.all(), many=True).data)
     
     @action(detail=True, methods=['get'])
     def delivery_status(self, request, pk=None):
         order = self.get_object()
-        if not hasattr(order, 'delivery'):
+        delivery = order_detail.delivery_of(order)
+        if delivery is None:
             return Response({"message": 'Delivery not yet assigned'})
-        return Response(DeliverySerializer(order.delivery).data)
+        return Response(DeliverySerializer(delivery).data)
+    
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def checkout(self, request):
+        """Create a pending order and hold its stock until the payment outcome arrives"""
+        customer = get_object_or_404(Customer, customer_id=request.data.get('customer'))
+        try:
+            lines = [(line['product'], int(line.get('quantity', 1))) for line in request.data.get('items') or []]
+            if not lines:
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            return Response({"detail": 'items must be a non-empty list of {"product": <id>, "quantity": <int>}'}, status=400)
+        try:
+            order = reservations.checkout(
+                customer, lines,
+                delivery_option=request.data.get('delivery_option', 'delivery'),
+                description=request.data.get('description', ''),
+            )
+        except reservations.InsufficientStock as exc:
+            return Response({"detail": str(exc), "product": exc.product_id, "available": exc.available}, status=409)
+        except ValueError as exc:  # the service's line rules, e.g. a quantity under 1
+            return Response({"detail": str(exc)}, status=400)
+        data = OrderSerializer(order).data
+        data['reserved_until'] = order.reservations.values_list('expires_at', flat=True).first()
+        return Response(data, status=201)
+    
+    @action(detail=True, methods=['post'])
+    def payment(self, request, pk=None):
+        """Payment outcome: "paid" commits the held stock, "failed" puts it back on sale"""
+        order = self.get_object()
+        outcome = request.data.get('status')
+        if outcome not in ('paid', 'failed'):
+            return Response({"detail": 'status must be "paid" or "failed"'}, status=400)
+        try:
+            if outcome == 'paid':
+                reservations.commit(order)
+            else:
+                reservations.release(order)
+        except reservations.ReservationClosed as exc:
+            order.refresh_from_db()
+            return Response({"detail": str(exc), "payment_status": order.payment_status}, status=409)
+        return Response(OrderSerializer(order).data)
 
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
     
-class InventoryViewSet(viewsets.ModelViewSet):
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+    
+class InventoryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
+    replica_actions = ('list', 'retrieve', 'reorders')
     
-class InventoryLogViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def reorders(self, request):
+        """What the nightly reorder run would draft now, per cheapest supplier"""
+        by_supplier, unsourced = reorders.suggest()
+        return Response({
+            'suppliers': [
+                {'supplier': supplier_id,
+                 'lines': [{'product': product_id, 'quantity': quantity, 'unit_cost': unit_cost}
+                           for product_id, quantity, unit_cost in rows]}
+                for supplier_id, rows in by_supplier.items()
+            ],
+            'unsourced': unsourced,
+        })
+    
+class InventoryLogViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = InventoryLog.objects.all()
     serializer_class = InventoryLogSerializer
     
-class SupplierViewSet(viewsets.ModelViewSet):
-    queryset = InventoryLog.objects.all()
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Apply a batch of {product, action, quantity} stock adjustments in one transaction, all or nothing"""
+        lines = request.data if isinstance(request.data, list) else request.data.get('adjustments')
+        if not isinstance(lines, list) or not 0 < len(lines) <= stock.MAX_BATCH:
+            return Response({"detail": f"Send a list of 1 to {stock.MAX_BATCH} adjustments"}, status=400)
+        serializer = StockAdjustmentSerializer(data=lines, many=True)
+        if not serializer.is_valid():
+            return Response({"detail": "Invalid adjustments", "errors": serializer.errors}, status=400)
+        adjustments = serializer.validated_data
+
+        wanted = {line['product'] for line in adjustments}
+        unknown = wanted - set(Product.objects.filter(product_id__in=wanted).values_list('product_id', flat=True))
+        if unknown:
+            return Response({"detail": "Unknown products", "products": sorted(map(str, unknown))}, status=400)
+        try:
+            inventory = stock.adjust(adjustments, updated_by=getattr(request.user, 'customer', None))
+        except stock.NegativeStock as exc:
+            return Response({"detail": str(exc), "shortfalls": exc.shortfalls}, status=409)
+        return Response({"applied": len(adjustments), "inventory": InventorySerializer(inventory, many=True).data})
+    
+class SupplierViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
+    replica_actions = ('list', 'retrieve', 'products', 'cheapest')
+    
+    def perform_create(self, serializer):
+        # supplier_id has no default, as with orders
+        serializer.save(supplier_id=uuid.uuid4())
     
     @action(detail=True, methods=['get'])
-    def products(self, rewuest, pk=None):
-        supplier=self.get_object()
-        products=supplier.products.all()
-        return Response(ProductSerializer(products, many=True).data)
+    def products(self, request, pk=None):
+        """What this supplier sells at which price, next to the cheapest price on file for each product"""
+        supplier = self.get_object()
+        return Response([
+            {'product': row['product_id'], 'name': row['product__ProductName'], 'price': row['supply_price'],
+             'supply_date': row['supply_date'], 'cheapest_price': row['product__cheapest_supplier__supply_price'],
+             'is_cheapest': row['product__cheapest_supplier__supplier_id'] == supplier.pk,
+             'suppliers': row['product__cheapest_supplier__offers']}
+            for row in supplier_catalog.listings(supplier)
+        ])
+    
+    @action(detail=True, methods=['post'])
+    def prices(self, request, pk=None):
+        """Upload a price list [{product, price}]: new offers are added, changed prices replaced, all or nothing"""
+        supplier = self.get_object()
+        lines = request.data if isinstance(request.data, list) else request.data.get('prices')
+        if not isinstance(lines, list) or not 0 < len(lines) <= supplier_catalog.MAX_PRICE_LINES:
+            return Response({"detail": f"Send a list of 1 to {supplier_catalog.MAX_PRICE_LINES} prices"}, status=400)
+        serializer = SupplierPriceSerializer(data=lines, many=True)
+        if not serializer.is_valid():
+            return Response({"detail": "Invalid prices", "errors": serializer.errors}, status=400)
+        prices = serializer.validated_data
+
+        wanted = {line['product'] for line in prices}
+        unknown = wanted - set(Product.objects.filter(product_id__in=wanted).values_list('product_id', flat=True))
+        if unknown:
+            return Response({"detail": "Unknown products", "products": sorted(map(str, unknown))}, status=400)
+        created, updated, unchanged = supplier_catalog.upload_prices(supplier, prices)
+        return Response({"created": created, "updated": updated, "unchanged": unchanged})
     
-class DeliveryViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def cheapest(self, request):
+        """?product=<id>&product=...: the cheapest supplier and price for each product"""
+        try:
+            product_ids = [uuid.UUID(value) for value in request.query_params.getlist('product')]
+        except ValueError:
+            return Response({"detail": "product must be a product_id"}, status=400)
+        if not 0 < len(product_ids) <= supplier_catalog.MAX_PRICE_LINES:
+            return Response({"detail": f"Give 1 to {supplier_catalog.MAX_PRICE_LINES} product parameters"}, status=400)
+        rows = supplier_catalog.cheapest(product_ids)
+        return Response([
+            {'product': product_id, 'supplier': row.supplier_id, 'supplier_name': row.supplier.name,
+             'price': row.supply_price, 'suppliers': row.offers}
+            for product_id, row in rows.items()
+        ])
+    
+class DeliveryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Delivery.objects.all()
-    serializer_class = DeliverySerializer
\ No newline at end of file
+    serializer_class = DeliverySerializer
+    replica_actions = ('list', 'retrieve', 'manifest')
+    
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Move a batch of deliveries to one status and settle their orders, all or nothing"""
+        serializer = DeliveryStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"detail": "Invalid status change", "errors": serializer.errors}, status=400)
+        status = serializer.validated_data['status']
+        try:
+            changed = delivery_status.transition(serializer.validated_data['deliveries'], status)
+        except delivery_status.InvalidTransition as exc:
+            return Response({"detail": str(exc), "refused": exc.refused}, status=409)
+        return Response({"status": status, "changed": changed})
+    
+    @action(detail=False, methods=['get'])
+    def manifest(self, request):
+        """?driver=&date=&status=: the driver's stops for the day (default today)"""
+        driver = request.query_params.get('driver')
+        day = parse_date(request.query_params.get('date') or '') if request.query_params.get('date') else timezone.localdate()
+        if not driver or day is None:
+            return Response({"detail": "driver is required and date must be YYYY-MM-DD"}, status=400)
+        stops = delivery_status.manifest(driver, day, request.query_params.get('status'))
+        return Response({"driver": driver, "date": day, "stops": stops})
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def profiling_report(request):
+    """Per-view request profile (ProfilingMiddleware), merged across worker dumps; DELETE resets it"""
+    dump_dir = getattr(settings, 'PROFILING_DUMP_DIR', None)
+    if request.method == 'DELETE':
+        profiling.clear_profiles(dump_dir)
+        return Response(status=204)
+
+    profiles = profiling.collect_profiles(dump_dir, getattr(settings, 'PROFILING_DUMP_TTL', None))
+    return Response({
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+        'views': {name: profile.summary() for name, profile in sorted(profiles.items())},
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@db_routers.replica_reads
+def margin_report(request):
+    """?group=total|product|category|vendor&month=YYYY-MM[&vendor=&limit=], or ?group=period&months=N for a trend"""
+    params = request.query_params
+    group = params.get('group') or 'total'
+    try:
+        month = datetime.strptime(params['month'], '%Y-%m').date() if params.get('month') else timezone.localdate()
+        vendor = uuid.UUID(params['vendor']) if params.get('vendor') else None
+        limit = max(1, min(int(params.get('limit') or 100), 1000))
+        months = max(1, min(int(params.get('months') or 12), margins.MAX_MONTHS))
+    except ValueError:
+        return Response({"detail": "month must be YYYY-MM, vendor a customer_id, limit and months numbers"}, status=400)
+    if group == 'period':
+        return Response({"group": group, "rows": margins.trend(month, months, vendor=vendor)})
+    if group not in margins.GROUPINGS:
+        return Response({"detail": f"group must be one of period, {', '.join(margins.GROUPINGS)}"}, status=400)
+    report = margins.get(month)
+    return Response({
+        "group": group,
+        "month": f"{margins.month_start(month):%Y-%m}",
+        "computed_at": report and report.computed_at,
+        "stale": report is None or not margins.is_fresh(report),
+        "rows": [margins.as_dict(row) for row in margins.rows(report, group, vendor=vendor, limit=limit)],
+    })
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (text exposition format), merged across worker processes"""
+    registry = metrics.collect(getattr(settings, 'METRICS_DUMP_DIR', None), getattr(settings, 'METRICS_DUMP_TTL', None))
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
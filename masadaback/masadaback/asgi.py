@@ -7,10 +7,19 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
+import gc
 import os
 
+# no collections while the app is built; see wsgi.py
+gc.disable()
+
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'masadaback.settings')
 
-application = get_asgi_application()
+from backend.staticfiles import ASGIStaticFilesMiddleware
+
+application = ASGIStaticFilesMiddleware(get_asgi_application())
+
+gc.freeze()
+gc.enable()
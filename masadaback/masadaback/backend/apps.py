@@ -1,9 +0,0 @@
-from django.apps import AppConfig
-
-
-class BackendConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'backend'
-    
-    def ready(self):
-        import backend.signals
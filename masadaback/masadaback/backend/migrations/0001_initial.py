@@ -1,132 +0,0 @@
-# Generated by Django 5.2.7 on 2025-12-03 11:26
-
-import django.db.models.deletion
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    initial = True
-
-    dependencies = [
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='admin',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('email', models.EmailField(max_length=120)),
-                ('password', models.CharField(max_length=120)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Customer',
-            fields=[
-                ('fullname', models.TextField(max_length=120)),
-                ('email', models.EmailField(max_length=120)),
-                ('password', models.CharField(max_length=8)),
-                ('customer_type', models.CharField(max_length=120)),
-                ('customer_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
-                ('location', models.CharField(max_length=120)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Product',
-            fields=[
-                ('product_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
-                ('ProductName', models.TextField(max_length=120)),
-                ('Price_per_unit', models.DecimalField(decimal_places=2, max_digits=10)),
-                ('grade', models.CharField(max_length=50)),
-                ('ProductType', models.CharField(max_length=120)),
-                ('Category', models.CharField(max_length=120)),
-                ('Dimensions', models.CharField(max_length=120)),
-                ('stock_quantity', models.PositiveIntegerField(max_length=0)),
-                ('description', models.TextField(max_length=250)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Supplier',
-            fields=[
-                ('name', models.CharField(max_length=120)),
-                ('contacts', models.CharField(max_length=120)),
-                ('email', models.EmailField(max_length=120)),
-                ('address', models.CharField(max_length=250)),
-                ('supplier_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Order',
-            fields=[
-                ('order_date', models.DateTimeField(auto_now_add=True)),
-                ('delivery_option', models.CharField(max_length=50)),
-                ('payment_status', models.CharField(max_length=50)),
-                ('order_status', models.CharField(max_length=50)),
-                ('order_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
-                ('description', models.TextField(max_length=120)),
-                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='backend.customer')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Delivery',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('delivery_date', models.DateField()),
-                ('delivery_address', models.CharField(max_length=255)),
-                ('driver_name', models.CharField(max_length=255)),
-                ('transport_cost', models.DecimalField(decimal_places=2, max_digits=10)),
-                ('delivery_status', models.CharField(max_length=50)),
-                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='backend.order')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='OrderItem',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('quantity', models.PositiveIntegerField()),
-                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
-                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12)),
-                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='backend.order')),
-                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='backend.product')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='InventoryLog',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('action', models.CharField(choices=[('IN', 'Stock In'), ('OUT', 'Stock Out'), ('DAMAGED', 'Damaged Adjustment'), ('RESERVED', 'Reserved for Order'), ('RELEASED', 'Released from reservation')], max_length=20)),
-                ('quantity', models.PositiveIntegerField()),
-                ('timestamp', models.DateTimeField(auto_now_add=True)),
-                ('note', models.TextField(blank=True)),
-                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='backend.customer')),
-                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='backend.product')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Inventory',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('quantity_available', models.PositiveIntegerField(default=0)),
-                ('quantity_reserved', models.PositiveIntegerField(default=0)),
-                ('quantity_damaged', models.PositiveIntegerField(default=0)),
-                ('reorder_level', models.PositiveIntegerField(default=10)),
-                ('reorder_quantity', models.PositiveIntegerField(default=20)),
-                ('uom', models.CharField(max_length=50)),
-                ('warehouse_location', models.CharField(blank=True, max_length=255)),
-                ('last_updated', models.DateTimeField(auto_now=True)),
-                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='backend.product')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='ProductSupplier',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('supply_price', models.DecimalField(decimal_places=2, max_digits=10)),
-                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='backend.product')),
-                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='backend.supplier')),
-            ],
-            options={
-                'unique_together': {('product', 'supplier')},
-            },
-        ),
-    ]
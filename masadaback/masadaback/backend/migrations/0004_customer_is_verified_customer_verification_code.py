@@ -1,23 +0,0 @@
-# Generated by Django 4.2.7 on 2026-01-12 15:24
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('backend', '0003_product_vendor_staff'),
-    ]
-
-    operations = [
-        migrations.AddField(
-            model_name='customer',
-            name='is_verified',
-            field=models.BooleanField(default=False),
-        ),
-        migrations.AddField(
-            model_name='customer',
-            name='verification_code',
-            field=models.CharField(blank=True, max_length=6, null=True),
-        ),
-    ]
@@ -1,55 +0,0 @@
-from rest_framework import serializers
-from .models import (Product, Customer, Order, OrderItem, Inventory, InventoryLog, Delivery, Supplier)
-
-#product
-class ProductSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Product
-        fields = "__all__"
-    
-#customer    
-class CustomerSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Customer
-        fields = "__all__"
-
-#order
-class OrderItemSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = OrderItem
-        fields = "__all__"
-                
-class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True)
-    
-    class Meta:
-        model = Order
-        fields = "__all__"
-
-#inventory   
-class InventorySerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Inventory
-        fields = "__all__"
-        
-class InventoryLogSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = InventoryLog
-        fields = "__all__"
-
-#supplier
-class SupplierSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Supplier
-        fields = "__all__"
-        
-#delivery     
-class DeliverySerializer(serializers.ModelSerializer):
-    supplier = SupplierSerializer(read_only=True)
-    supplier_id = serializers.PrimaryKeyRelatedField(queryset=Supplier.objects.all(),source="supplier",write_only=True)
-    
-    class Meta:
-        model = Delivery
-        fields = [
-            'id', 'product', 'supplier', 'supplier_id', 'quantity_received', 'delivery_date', 'notes'
-        ]
\ No newline at end of file
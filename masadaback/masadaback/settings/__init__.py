@@ -0,0 +1,18 @@
+"""
+Settings package for masadaback.
+
+DJANGO_SETTINGS_MODULE=masadaback.settings picks the profile named by DJANGO_ENV
+("development" by default, "production" or "test"); masadaback.settings.dev,
+masadaback.settings.prod and masadaback.settings.test can also be used directly.
+"""
+
+import os
+
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'development').lower()
+
+if DJANGO_ENV in ('prod', 'production'):
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
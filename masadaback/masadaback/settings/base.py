@@ -0,0 +1,249 @@
+"""
+Django settings for masadaback project: shared base for the dev and prod profiles.
+
+Generated by 'django-admin startproject' using Django 5.2.7.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+import copy
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def env_bool(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-0^ymh*8!%)$yo14g4lx+1yeh&urw$k76(6^izf368@pg-@!@2^')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env_bool('DJANGO_DEBUG', True)
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', '*').split(',')
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework',
+    # 'backend',
+    'backend.apps.BackendConfig',
+]
+
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES':[
+        'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
+    ]
+}
+
+MIDDLEWARE = [
+    'backend.middleware.MetricsMiddleware',
+    'backend.middleware.ProfilingMiddleware',  # no-op unless PROFILING_ENABLED
+    'django.middleware.security.SecurityMiddleware',
+    'backend.middleware.ReplicaPinningMiddleware',  # no-op without a replica database
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'masadaback.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'backend.context_processors.cart_count',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'masadaback.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+
+def pool_available(engine):
+    """psycopg3's pool (OPTIONS['pool'], Django 5.1+) needs the postgresql backend plus psycopg and psycopg_pool"""
+    if 'postgresql' not in engine:
+        return False
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def database_from_env(conn_max_age=0, health_checks=False, pool=False):
+    """DATABASES['default'] from DB_* environment variables; the arguments are the profile's defaults"""
+    database = {
+        'ENGINE': os.environ.get('DB_ENGINE', 'django.db.backends.postgresql'),
+        'NAME': os.environ.get('DB_NAME', 'masada'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # seconds to keep a connection open between requests (0 = close after every request)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', conn_max_age)),
+        # ping a reused connection before the first query of a request instead of failing on a dead one
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', health_checks),
+    }
+    if env_bool('DB_POOL', pool) and pool_available(database['ENGINE']):
+        database['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            },
+        }
+        # the pool owns connection reuse; Django refuses persistent connections on top of it
+        database['CONN_MAX_AGE'] = 0
+    return database
+
+
+def databases_from_env(**defaults):
+    """DATABASES with the primary, plus a read replica when DB_REPLICA_HOST or DB_REPLICA_NAME is set"""
+    primary = database_from_env(**defaults)
+    databases = {'default': primary}
+    if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+        replica = copy.deepcopy(primary)
+        for key in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT'):
+            replica[key] = os.environ.get(f'DB_REPLICA_{key}', primary[key])
+        # tests run against the primary's test database instead of creating one on the replica
+        replica['TEST'] = {'MIRROR': 'default'}
+        databases['replica'] = replica
+    return databases
+
+
+DATABASES = databases_from_env()
+
+# Catalog, DRF list/retrieve and reporting reads go to the replica (see backend/db_routers.py)
+DATABASE_ROUTERS = ['backend.db_routers.PrimaryReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# how long a browser keeps reading from primary after one of its requests wrote
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 15))
+
+LOGIN_URL = 'login'
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# backend/static is found by the app directories finder; listing it here too made collectstatic scan it twice
+
+# collectstatic writes content-hashed copies plus .gz/.br siblings (brotli optional);
+# wsgi.py/asgi.py serve them with far-future immutable caching regardless of DEBUG.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'backend.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Uploaded product images and their generated variants
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Email Settings for Development
+# This will print emails to the console instead of sending them.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Request profiling (opt-in)
+# Per-view SQL count/time, latency, template time and response size; see /api/profiling/
+# and `manage.py profiling_report`. Each worker dumps its stats to PROFILING_DUMP_DIR; dumps
+# are kept after the worker exits, for reports after a load test, until PROFILING_DUMP_TTL.
+PROFILING_ENABLED = os.environ.get('MASADA_PROFILING', '') == '1'
+PROFILING_DUMP_DIR = os.environ.get('MASADA_PROFILING_DIR', str(BASE_DIR / 'profiling'))
+PROFILING_FLUSH_INTERVAL = 10  # seconds
+PROFILING_DUMP_TTL = 24 * 60 * 60  # seconds
+
+# Prometheus metrics at /metrics; every worker dumps its counters to METRICS_DUMP_DIR
+# and the scraped worker merges them, so totals cover all processes. A worker deletes its
+# dump on exit; dumps not rewritten for METRICS_DUMP_TTL (killed or long-idle workers) are dropped.
+METRICS_ENABLED = True
+METRICS_DUMP_DIR = os.environ.get('MASADA_METRICS_DIR', str(BASE_DIR / 'metrics'))
+METRICS_FLUSH_INTERVAL = 5  # seconds
+METRICS_DUMP_TTL = 60 * 60  # seconds
+
+# Checkout holds stock for this long while payment completes; `manage.py expire_reservations`
+# (run every minute or so) returns abandoned holds to available stock.
+RESERVATION_TTL_SECONDS = int(os.environ.get('MASADA_RESERVATION_TTL', 15 * 60))
+
+# Order writes sent with an Idempotency-Key header replay their first response for this long, so a
+# client retrying over a flaky connection can't create the order twice; `manage.py purge_idempotency_keys`
+# deletes expired keys.
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('MASADA_IDEMPOTENCY_TTL', 24 * 60 * 60))
+
+# Margin reports are stored per calendar month and only computed by `manage.py build_margin_reports`;
+# requests read the stored report whatever its age. A current-month report older than this is
+# flagged stale in the API, so schedule the command at least this often.
+MARGIN_REPORT_TTL_SECONDS = int(os.environ.get('MASADA_MARGIN_REPORT_TTL', 15 * 60))
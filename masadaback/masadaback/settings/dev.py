@@ -0,0 +1,7 @@
+"""
+Development settings profile for masadaback.
+
+Use with DJANGO_SETTINGS_MODULE=masadaback.settings.dev (the default for masadaback.settings).
+"""
+
+from .base import *  # noqa: F401,F403
@@ -0,0 +1,38 @@
+"""
+Production settings profile for masadaback.
+
+Use with DJANGO_SETTINGS_MODULE=masadaback.settings.prod (or DJANGO_ENV=production).
+"""
+
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import TEMPLATES as BASE_TEMPLATES
+from .base import databases_from_env, env_bool
+
+DEBUG = env_bool('DJANGO_DEBUG', False)
+
+# base.py falls back to a key committed to the repo; that's for dev and test only
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', '')
+if not SECRET_KEY or SECRET_KEY.startswith('django-insecure-'):
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY to a private key in production")
+
+# Reuse connections across requests: psycopg3's pool where installed, otherwise
+# persistent connections kept for a minute and health-checked before reuse
+DATABASES = databases_from_env(conn_max_age=60, health_checks=True, pool=True)
+
+# Parse every template once per process and keep the compiled tree in memory
+TEMPLATES = copy.deepcopy(BASE_TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Compile all frontend/*.html templates while the worker boots (BackendConfig.ready)
+TEMPLATE_WARMUP = True
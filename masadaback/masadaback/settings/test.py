@@ -0,0 +1,29 @@
+"""
+Test settings profile for masadaback.
+
+Use with DJANGO_SETTINGS_MODULE=masadaback.settings.test (or DJANGO_ENV=test), e.g.
+python manage.py test --settings=masadaback.settings.test. Runs on two local SQLite
+databases so replica routing is exercised against a genuinely separate database.
+"""
+
+from .base import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-primary.sqlite3',  # noqa: F405
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',  # noqa: F405
+    },
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# keep test runs from leaving dumps behind
+METRICS_DUMP_DIR = None
+PROFILING_DUMP_DIR = None
+
+# covering-index INCLUDE columns are a PostgreSQL feature; SQLite just builds the plain index
+SILENCED_SYSTEM_CHECKS = ['models.W040']
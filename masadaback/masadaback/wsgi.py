@@ -7,10 +7,22 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
+# Boot allocates tens of thousands of long-lived objects (modules, models, app registry, templates);
+# collecting while they are created only rescans them. Collection resumes once the app is built.
+gc.disable()
+
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'masadaback.settings')
 
-application = get_wsgi_application()
+from backend.staticfiles import StaticFilesMiddleware
+
+application = StaticFilesMiddleware(get_wsgi_application())
+
+# Boot-time objects live for the whole process: keep them out of future collections (which also keeps
+# their memory pages shared between workers forked from a preloaded master).
+gc.freeze()
+gc.enable()